@@ -3,41 +3,119 @@ Heart Disease Prediction Flask Application
 This is the main Flask app that serves the web interface and provides prediction API
 """
 
-from flask import Flask, render_template, request, jsonify
+import time
+# Start of the startup clock: everything below (imports, model load, warmup)
+# counts against STARTUP_BUDGET_SECONDS
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, g, has_request_context, render_template, request, jsonify, stream_with_context
 try:
     from flask_cors import CORS
 except Exception:
     CORS = None
-import pickle
 import numpy as np
 import os
-from pathlib import Path
+import uuid
+from config import config
+from registry import ModelRegistry
+from schema import FEATURE_NAMES, schema
+from streaming import iter_record_chunks, format_rows
+from prediction_cache import PredictionCache
+import encoders
+import metrics
+from metrics import StageTimer
 
 app = Flask(__name__)
+app.config.from_object(config[os.environ.get('FLASK_ENV', 'production')])
 CORS and CORS(app)  # Enable CORS for all routes if installed
+# orjson-backed jsonify()/get_json() when orjson is installed
+app.json = encoders.FastJSONProvider(app)
 
-# Load the trained model, scaler, and feature names
-MODEL_PATH = 'models/heart_disease_model.pkl'
-SCALER_PATH = 'models/scaler.pkl'
-FEATURES_PATH = 'models/feature_names.pkl'
+# Cache of /predict results keyed on the parsed feature vector
+prediction_cache = PredictionCache(app.config['PREDICTION_CACHE_SIZE'], app.config['PREDICTION_CACHE_TTL'])
 
-# Check if model files exist
-if not os.path.exists(MODEL_PATH):
-    print(f"Error: Model file not found at {MODEL_PATH}")
-    print("Please run train_model.py first to train the model")
+# Load the trained model artifact written by train_model.py. The registry
+# memory-maps models/heart_disease_model.hdp (falling back to the legacy
+# pickles) and can swap in a retrained model without a restart.
+MODELS_DIR = 'models'
+registry = ModelRegistry(MODELS_DIR)
+registry.on_swap(lambda artifact: prediction_cache.bind_model(artifact.version))
 
-# Load model and preprocessing objects
+startup = {'import_seconds': time.perf_counter() - _import_started}
+_load_started = time.perf_counter()
 try:
-    model = pickle.load(open(MODEL_PATH, 'rb'))
-    scaler = pickle.load(open(SCALER_PATH, 'rb'))
-    with open(FEATURES_PATH, 'rb') as f:
-        feature_names = pickle.load(f)
-    print("Model loaded successfully!")
+    registry.reload()
+    print(f"Model loaded successfully! (version {registry.current.version})")
 except Exception as e:
     print(f"Error loading model: {e}")
-    model = None
-    scaler = None
-    feature_names = None
+    print("Please run train_model.py first to train the model")
+
+# Watch models/ for retrained artifacts (MODEL_RELOAD_INTERVAL=0 disables)
+registry.start_watcher(app.config['MODEL_RELOAD_INTERVAL'])
+
+startup['load_seconds'] = time.perf_counter() - _load_started
+
+# Opt-in per-request profiling; nothing is imported or hooked in unless enabled
+if app.config['PROFILING_ENABLED']:
+    from profiling import RequestProfiler
+    RequestProfiler.from_config(app.config).init_app(app)
+
+# Opt-in incremental learning from labeled /feedback records
+learner = None
+if app.config['ONLINE_LEARNING_ENABLED']:
+    from online_learning import OnlineLearner
+    learner = OnlineLearner(
+        registry,
+        MODELS_DIR,
+        batch_size=app.config['FEEDBACK_BATCH_SIZE'],
+        buffer_size=app.config['FEEDBACK_BUFFER_SIZE'],
+        holdout_fraction=app.config['FEEDBACK_HOLDOUT_FRACTION'],
+        min_holdout=app.config['FEEDBACK_MIN_HOLDOUT'],
+        max_accuracy_drop=app.config['FEEDBACK_MAX_ACCURACY_DROP'],
+        learning_rate=app.config['ONLINE_LEARNING_RATE'],
+    )
+    learner.start(app.config['ONLINE_LEARNING_INTERVAL'])
+
+# Opt-in audit log of every prediction, written off the request path
+audit_log = None
+if app.config['AUDIT_LOG_ENABLED']:
+    from audit import AuditLog
+    audit_log = AuditLog.from_config(app.config)
+
+# Running feature statistics of scored rows vs the training distribution
+drift_monitor = None
+if app.config['DRIFT_MONITOR_ENABLED']:
+    from drift import DriftMonitor
+    drift_monitor = DriftMonitor(MODELS_DIR, min_rows=app.config['DRIFT_MIN_ROWS'],
+                                 psi_warn=app.config['DRIFT_PSI_WARN'], psi_alert=app.config['DRIFT_PSI_ALERT'])
+    drift_monitor.load()
+    registry.on_swap(lambda artifact: drift_monitor.load())
+
+# Opt-in shadow models, scored on live traffic off the request path
+shadow_scorer = None
+if app.config['SHADOW_MODELS']:
+    from shadow import ShadowScorer
+    shadow_scorer = ShadowScorer.from_config(app.config)
+    registry.on_swap(lambda artifact: shadow_scorer.reset())
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Count every request and record its latency by endpoint"""
+    endpoint = request.endpoint or 'unknown'
+    metrics.REQUESTS.inc(endpoint, str(response.status_code))
+    if response.status_code >= 500:
+        metrics.ERRORS.inc(endpoint)
+    start = g.get('request_start')
+    if start is not None:
+        # For streamed responses this covers setup only, not the body
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+    return response
 
 
 @app.route('/')
@@ -66,60 +144,66 @@ def predict():
     - thal: int (thalassemia: 0-3)
     """
     
-    if model is None:
+    # Pin the model for the whole request so a hot reload cannot swap it mid-way
+    current = registry.current
+    if current is None:
         return jsonify({
             'success': False,
             'error': 'Model not loaded. Please ensure the model file exists.'
         }), 500
     
     try:
+        timer = StageTimer('predict')
+        
         # Get JSON data from request
         data = request.get_json()
+        timer.mark('parse_json')
         
-        # Extract features in the correct order
-        features = [
-            float(data.get('age', 0)),
-            float(data.get('sex', 0)),
-            float(data.get('cp', 0)),
-            float(data.get('trestbps', 0)),
-            float(data.get('chol', 0)),
-            float(data.get('fbs', 0)),
-            float(data.get('restecg', 0)),
-            float(data.get('thalach', 0)),
-            float(data.get('exang', 0)),
-            float(data.get('oldpeak', 0)),
-            float(data.get('slope', 0)),
-            float(data.get('ca', 0)),
-            float(data.get('thal', 0))
-        ]
-        
-        # Validate input ranges
-        validation = validate_inputs(data)
-        if not validation['valid']:
+        # Parse all 13 fields once, in schema order, and validate them
+        features, errors = schema.parse_records([data])
+        timer.mark('extract')
+        message = schema.validate(features, errors)[0]
+        timer.mark('validate')
+        if message is not None:
+            metrics.VALIDATION_FAILURES.inc('predict')
+            if audit_log is not None:
+                audit_log.record('predict', current.version, features, [None], [None], [message],
+                                 request_id=audit_request_id())
             return jsonify({
                 'success': False,
-                'error': validation['message']
+                'error': message
             }), 400
         
-        # Convert to numpy array and scale
-        features_array = np.array(features).reshape(1, -1)
-        features_scaled = scaler.transform(features_array)
+        # Identical forms are common, so check the cache before scoring
+        explain, top = explain_options()
+        key = prediction_cache.make_key(features, current.version + (f':explain{top}' if explain else ''))
+        result = prediction_cache.get(key) if prediction_cache.enabled else None
+        timer.mark('cache')
+        if result is None:
+            # Scale and score in a single pass
+            if explain:
+                predictions, probabilities, contributions = current.scorer.score_explained(features)
+                result = build_result(predictions[0], probabilities[0])
+                result.update(explain_rows(contributions, current.scorer.baseline, top)[0])
+            else:
+                predictions, probabilities = current.scorer.score(features)
+                result = build_result(predictions[0], probabilities[0])
+            result['model_version'] = current.version
+            metrics.ROWS_SCORED.inc('predict')
+            timer.mark('score')
+            prediction_cache.put(key, result)
+        if drift_monitor is not None:
+            drift_monitor.update(features)
+        if shadow_scorer is not None:
+            shadow_scorer.submit(features, [result['prediction']], [result['disease_probability']])
+        if audit_log is not None:
+            # Cache hits are predictions too, so they are audited as well
+            audit_log.record('predict', current.version, features, [result['prediction']],
+                             [result['disease_probability']], [None], request_id=audit_request_id())
         
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0]
-        
-        # Prepare response
-        result = {
-            'success': True,
-            'prediction': int(prediction),
-            'disease_probability': float(probability[1]) * 100,
-            'no_disease_probability': float(probability[0]) * 100,
-            'diagnosis': 'Heart Disease Detected' if prediction == 1 else 'No Heart Disease',
-            'confidence': float(max(probability)) * 100
-        }
-        
-        return jsonify(result)
+        response = jsonify(result)
+        timer.mark('serialize')
+        return response, 200, {'X-Model-Version': current.version}
     
     except Exception as e:
         return jsonify({
@@ -128,57 +212,605 @@ def predict():
         }), 500
 
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    API endpoint for scoring many patients in one request
+    Expects a list of records (same fields as /predict), an object with the
+    list under 'records', or column-oriented input {"columns": {name: [...]}}.
+    Bodies can be JSON, MessagePack or Arrow IPC in the stream or file format
+    (by Content-Type), and the response format is negotiated from Accept. Validation and the
+    fused scorer run once over the whole (N, 13) matrix; invalid rows are
+    reported individually without failing the rest of the batch.
+
+    Results come back as a list of per-row objects ('records', the JSON
+    default) or as one array per field under 'columns' (?orient=columns, the
+    default for MessagePack and the only layout for Arrow).
+    """
+
+    current = registry.current
+    if current is None:
+        return jsonify({
+            'success': False,
+            'error': 'Model not loaded. Please ensure the model file exists.'
+        }), 500
+
+    timer = StageTimer('predict_batch')
+    fmt = encoders.request_format(request.mimetype)
+    if fmt is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unsupported Content-Type {request.mimetype}; '
+                     f'supported: {", ".join(encoders.available_formats())}'
+        }), 415
+    try:
+        layout, data = encoders.decode_body(request.get_data(cache=False), fmt, app.json)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    timer.mark('parse_json')
+    if layout == 'records':
+        well_formed = isinstance(data, list)
+    else:
+        well_formed = bool(data) and all(isinstance(v, (list, np.ndarray)) for v in data.values())
+    if not well_formed:
+        return jsonify({
+            'success': False,
+            'error': 'Expected a list of records, {"records": [...]} or {"columns": {"age": [...], ...}}'
+        }), 400
+
+    if layout == 'columns':
+        try:
+            features, errors = schema.parse_columns(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        timer.mark('extract')
+    count = len(data) if layout == 'records' else len(features)
+
+    max_batch = app.config['MAX_BATCH_SIZE']
+    if count > max_batch:
+        return jsonify({
+            'success': False,
+            'error': f'Batch too large: {count} records (limit {max_batch})'
+        }), 413
+
+    out = encoders.negotiate(request.accept_mimetypes)
+    orient = request.args.get('orient') or ('records' if out == encoders.JSON else 'columns')
+    if out in encoders.ARROW_FORMATS:
+        orient = 'columns'
+
+    try:
+        explain, top = explain_options()
+        payload = {
+            'success': True,
+            'model_version': current.version,
+            'count': count,
+        }
+        if orient == 'columns':
+            if layout == 'records':
+                features, errors = schema.parse_records(data)
+                timer.mark('extract')
+            columns = score_columns(features, errors, current, timer=timer, explain=explain)
+            valid_count = int(columns['success'].sum())
+            if explain:
+                payload['baseline_logit'] = current.scorer.baseline
+            payload['columns'] = columns
+        else:
+            if layout == 'records':
+                results = score_records(data, current, timer=timer, explain=explain, top=top)
+            else:
+                results = score_features(features, errors, current, timer=timer, explain=explain, top=top)
+            valid_count = sum(1 for r in results if r['success'])
+            payload['results'] = results
+        payload['valid_count'] = valid_count
+        payload['invalid_count'] = count - valid_count
+
+        if out == encoders.JSON and orient == 'records':
+            response = jsonify(payload)
+        else:
+            response = Response(encoders.encode(payload, out, app.json), mimetype=out)
+        timer.mark('serialize')
+        return response, 200, {'X-Model-Version': current.version}
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error making batch prediction: {str(e)}'
+        }), 500
+
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """
+    API endpoint for scoring very large NDJSON or CSV uploads
+    The body is read incrementally in STREAM_CHUNK_BYTES pieces, scored in
+    chunks of STREAM_CHUNK_ROWS records with the vectorized path, and the
+    results are streamed back in the same format (NDJSON or CSV with a
+    header row). Memory use is bounded by the chunk sizes, not the upload.
+    The whole stream is scored by the model version in X-Model-Version.
+    ?explain=1 adds per-feature contributions to NDJSON results (CSV rows
+    keep their fixed columns).
+    """
+
+    current = registry.current
+    if current is None:
+        return jsonify({
+            'success': False,
+            'error': 'Model not loaded. Please ensure the model file exists.'
+        }), 500
+
+    fmt = 'csv' if request.mimetype in ('text/csv', 'application/csv') else 'ndjson'
+    chunk_bytes = app.config['STREAM_CHUNK_BYTES']
+    chunk_rows = app.config['STREAM_CHUNK_ROWS']
+    stream = request.stream
+    explain, top = explain_options()
+    explain = explain and fmt != 'csv'
+
+    def generate():
+        offset = 0
+        if fmt == 'csv':
+            yield format_rows([], fmt, header=True)
+        for records, bad_rows in iter_record_chunks(stream, fmt, chunk_bytes, chunk_rows):
+            timer = StageTimer('predict_stream')
+            results = score_records(records, current, offset=offset, bad_rows=bad_rows, timer=timer,
+                                    explain=explain, top=top)
+            offset += len(records)
+            chunk = format_rows(results, fmt)
+            timer.mark('serialize')
+            yield chunk
+
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={'X-Model-Version': current.version})
+
+
 @app.route('/api/info')
 def info():
     """Return information about the model"""
+    current = registry.current
+    feature_names = current.feature_names if current else []
     return jsonify({
         'model_name': 'Heart Disease Prediction',
         'algorithm': 'Logistic Regression',
-        'features_count': len(feature_names) if feature_names else 0,
-        'features': feature_names if feature_names else []
+        'features_count': len(feature_names),
+        'features': feature_names,
+        'schema': schema.describe(),
+        **(current.info() if current else {}),
+        **registry.status(),
+        'online_learning': learner.stats() if learner else None,
+        'audit': audit_log.stats() if audit_log else None,
+        'shadow': shadow_scorer.stats() if shadow_scorer else None
+    })
+
+
+@app.route('/feedback', methods=['POST'])
+def feedback():
+    """
+    Accept confirmed diagnoses for online learning
+    Expects one record or a JSON list of records (or {"records": [...]}) with
+    the /predict fields plus 'target' (1 = disease, 0 = no disease). Valid
+    rows are buffered for the background learner; invalid rows are reported
+    individually. Requires X-Admin-Token like /admin/reload, since feedback
+    changes the served model.
+    """
+    if learner is None:
+        return jsonify({'success': False, 'error': 'Online learning is disabled'}), 503
+
+    token = app.config['ADMIN_TOKEN']
+    if not token or request.headers.get('X-Admin-Token') != token:
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+
+    data = request.get_json(silent=True)
+    records = data.get('records', [data]) if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        return jsonify({
+            'success': False,
+            'error': 'Expected a JSON record, a list of records or {"records": [...]}'
+        }), 400
+
+    max_batch = app.config['MAX_BATCH_SIZE']
+    if len(records) > max_batch:
+        return jsonify({
+            'success': False,
+            'error': f'Batch too large: {len(records)} records (limit {max_batch})'
+        }), 413
+
+    features, errors = schema.parse_records(records)
+    messages = schema.validate(features, errors)
+    labels = np.zeros(len(records), dtype=int)
+    for i, record in enumerate(records):
+        label = record.get('target') if isinstance(record, dict) else None
+        if label in (0, 1):
+            labels[i] = int(label)
+        elif messages[i] is None:
+            messages[i] = 'target must be 0 or 1'
+
+    valid = np.array([m is None for m in messages], dtype=bool)
+    learner.submit(features[valid], labels[valid])
+    metrics.VALIDATION_FAILURES.inc('feedback', amount=int((~valid).sum()))
+
+    return jsonify({
+        'success': True,
+        'accepted': int(valid.sum()),
+        'rejected': int((~valid).sum()),
+        'errors': [{'index': int(i), 'error': messages[i]} for i in np.flatnonzero(~valid)],
+        'model_version': registry.current.version if registry.current else None
+    }), 202
+
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Load, verify and swap in the model currently in models/.
+    Requires the X-Admin-Token header to match ADMIN_TOKEN; disabled when
+    ADMIN_TOKEN is not set.
+    """
+    token = app.config['ADMIN_TOKEN']
+    if not token or request.headers.get('X-Admin-Token') != token:
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+
+    previous = registry.current.version if registry.current else None
+    try:
+        swapped = registry.reload(force=request.args.get('force') == '1')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Reload failed, still serving {previous}: {str(e)}'
+        }), 500
+
+    return jsonify({
+        'success': True,
+        'reloaded': swapped,
+        'previous_version': previous,
+        'model_version': registry.current.version
     })
 
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text-format counters and per-stage latency histograms"""
+    return Response(metrics_text(), mimetype=metrics.CONTENT_TYPE)
+
+
+def metrics_text():
+    """The /metrics exposition, shared by the Flask and ASGI apps"""
+    stats = prediction_cache.stats()
+    current = registry.current
+    extra = [
+        '# HELP heart_prediction_cache_events_total Prediction cache lookups and removals',
+        '# TYPE heart_prediction_cache_events_total counter',
+    ]
+    for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+        extra.append(f'heart_prediction_cache_events_total{{event="{event}"}} {stats[event]}')
+    extra += [
+        '# HELP heart_prediction_cache_entries Entries currently cached',
+        '# TYPE heart_prediction_cache_entries gauge',
+        f'heart_prediction_cache_entries {stats["size"]}',
+        '# HELP heart_model_info Model version currently serving',
+        '# TYPE heart_model_info gauge',
+        f'heart_model_info{{version="{current.version if current else ""}"}} 1',
+        '# HELP heart_model_reloads_total Successful model hot reloads',
+        '# TYPE heart_model_reloads_total counter',
+        f'heart_model_reloads_total {registry.reload_count}',
+    ]
+    if drift_monitor is not None:
+        report = drift_monitor.report()
+        if report['available']:
+            extra += [
+                '# HELP heart_feature_drift_psi Population stability index of each feature vs training data',
+                '# TYPE heart_feature_drift_psi gauge',
+            ]
+            for name, feature in report['features'].items():
+                extra.append(f'heart_feature_drift_psi{{feature="{name}"}} {feature["psi"]}')
+    if shadow_scorer is not None:
+        shadow = shadow_scorer.stats()
+        extra += [
+            '# HELP heart_shadow_rows_total Rows handed to shadow models, by outcome',
+            '# TYPE heart_shadow_rows_total counter',
+        ]
+        for event in ('submitted', 'scored', 'shed'):
+            extra.append(f'heart_shadow_rows_total{{event="{event}"}} {shadow[event + "_rows"]}')
+        extra += [
+            '# HELP heart_shadow_agreement_ratio Share of rows where a shadow model predicts the served class',
+            '# TYPE heart_shadow_agreement_ratio gauge',
+        ]
+        for model in shadow['shadows']:
+            if model['agreement_rate'] is not None:
+                extra.append(f'heart_shadow_agreement_ratio{{model="{model["model_version"]}"}} '
+                             f'{model["agreement_rate"]}')
+    if audit_log is not None:
+        audit = audit_log.stats()
+        extra += [
+            '# HELP heart_audit_records_total Prediction rows by audit log outcome',
+            '# TYPE heart_audit_records_total counter',
+        ]
+        for event in ('accepted', 'written', 'dropped', 'failed'):
+            extra.append(f'heart_audit_records_total{{event="{event}"}} {audit[event]}')
+        extra += [
+            '# HELP heart_audit_queue_rows Prediction rows waiting to be written',
+            '# TYPE heart_audit_queue_rows gauge',
+            f'heart_audit_queue_rows {audit["queued"]}',
+        ]
+    return metrics.render(extra)
+
+
+@app.route('/api/drift')
+def drift_report():
+    """
+    Per-feature drift of scored traffic against the training data: PSI, a
+    binned KS statistic and the mean shift in reference standard deviations,
+    with a warn/alert status per feature and overall
+    """
+    if drift_monitor is None:
+        return jsonify({'available': False, 'error': 'Drift monitoring is disabled'}), 503
+    report = drift_monitor.report()
+    report['model_version'] = registry.current.version if registry.current else None
+    return jsonify(report), 200 if report['available'] else 503
+
+
+@app.route('/api/shadow')
+def shadow_report():
+    """
+    How the shadow models compare with the served model on live traffic:
+    agreement, probability differences, positive rates and latency per
+    shadow, plus the pool's pending and shed row counts
+    """
+    if shadow_scorer is None:
+        return jsonify({'success': False, 'error': 'No shadow models configured (set SHADOW_MODELS)'}), 503
+    return jsonify(dict(shadow_scorer.stats(), model_version=registry.current.version if registry.current else None))
+
+
+@app.route('/api/cache')
+def cache_stats():
+    """Return prediction cache hit, miss and eviction counters"""
+    return jsonify(prediction_cache.stats())
+
+
 def validate_inputs(data):
-    """Validate input parameters"""
+    """Validate input parameters against the feature schema"""
+    features, errors = schema.parse_records([data])
+    message = schema.validate(features, errors)[0]
+    if message is not None:
+        return {'valid': False, 'message': message}
+    return {'valid': True}
+
+
+def score_records(records, current=None, offset=0, bad_rows=None, timer=None, explain=False, top=None, record=True):
+    """
+    Parse, validate and score a list of records in one vectorized pass.
+    Returns one result dict per record, tagged with its index (shifted by
+    `offset`); rows listed in `bad_rows` get that message as their error.
+    `current` is the model to use (defaults to the registry's current one);
+    stage latencies are recorded on `timer` when given. With `explain`,
+    each result also carries its per-feature logit contributions. Rows are
+    recorded in the audit log and drift monitor and sent to the shadow
+    models (when enabled) unless `record` is False.
+    """
+    timer = timer or StageTimer('records')
+    features, errors = schema.parse_records(records)
+    for i, message in (bad_rows or {}).items():
+        errors[i] = message
+    timer.mark('extract')
+    return score_features(features, errors, current, offset, timer, explain, top, record)
+
+
+def _score_valid(features, errors, current, timer, explain):
+    """Validate a parsed matrix and score its valid rows; shared by the row and column paths"""
+    current = current or registry.current
+    errors = schema.validate(features, errors)
+    valid = errors == None  # noqa: E711 - elementwise check on object array
+    n_valid = int(valid.sum())
+    metrics.VALIDATION_FAILURES.inc(timer.endpoint, amount=len(features) - n_valid)
+    timer.mark('validate')
+
+    scored = None
+    if n_valid:
+        if explain:
+            scored = current.scorer.score_explained(features[valid])
+        else:
+            scored = current.scorer.score(features[valid])
+        metrics.ROWS_SCORED.inc(timer.endpoint, amount=n_valid)
+        timer.mark('score')
+    return errors, valid, scored
+
+
+def score_features(features, errors, current=None, offset=0, timer=None, explain=False, top=None, record=True):
+    """score_records for an already parsed (N, 13) matrix and its parse errors"""
+    current = current or registry.current
+    timer = timer or StageTimer('records')
+    errors, valid, scored = _score_valid(features, errors, current, timer, explain)
+    if record:
+        _audit(timer.endpoint, current, features, errors, valid, scored, offset)
+        if drift_monitor is not None:
+            drift_monitor.update(features[valid])
+        if shadow_scorer is not None and scored is not None:
+            shadow_scorer.submit(features[valid], scored[0], scored[1][:, 1] * 100)
+
+    results = [None] * len(features)
+    if scored is not None:
+        predictions, probabilities = scored[0], scored[1]
+        for i, prediction, probability in zip(np.flatnonzero(valid), predictions, probabilities):
+            results[i] = dict(index=int(i) + offset, **build_result(prediction, probability))
+        if explain:
+            for i, explanation in zip(np.flatnonzero(valid), explain_rows(scored[2], current.scorer.baseline, top)):
+                results[i].update(explanation)
+    for i in np.flatnonzero(~valid):
+        results[i] = {'index': int(i) + offset, 'success': False, 'error': errors[i]}
+    timer.mark('build_results')
+    return results
+
+
+def _audit(endpoint, current, features, errors, valid, scored, offset=0):
+    """Queue one scored batch in the audit log (probabilities in percent, as returned)"""
+    if audit_log is None:
+        return
+    predictions = np.full(len(features), -1, dtype=np.int64)
+    probabilities = np.full(len(features), np.nan)
+    if scored is not None:
+        predictions[valid] = scored[0]
+        probabilities[valid] = scored[1][:, 1] * 100
+    audit_log.record(endpoint, current.version, features, predictions, probabilities, errors,
+                     offset=offset, request_id=audit_request_id())
+
+
+def audit_request_id():
+    """
+    The client's X-Request-ID, or one generated per request, so every audit
+    row of a request (including all chunks of a stream) shares the same id
+    """
+    if not has_request_context():
+        return None
+    if 'audit_request_id' not in g:
+        g.audit_request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    return g.audit_request_id
+
+
+def score_columns(features, errors, current=None, timer=None, explain=False):
+    """
+    Column-oriented results for a parsed (N, 13) matrix: one NumPy array per
+    result field instead of a dict per row, so binary encoders can write them
+    directly. Invalid rows get prediction -1, NaN probabilities and their
+    error message; with `explain`, one contribution_<feature> column per
+    feature (the baseline logit goes in the response metadata).
+    """
+    current = current or registry.current
+    timer = timer or StageTimer('records')
+    errors, valid, scored = _score_valid(features, errors, current, timer, explain)
+
+    n = len(features)
+    prediction = np.full(n, -1, dtype=np.int64)
+    probabilities = np.full((n, 2), np.nan)
+    if scored is not None:
+        prediction[valid] = scored[0]
+        probabilities[valid] = scored[1]
+    if audit_log is not None:
+        audit_log.record(timer.endpoint, current.version, features, prediction, probabilities[:, 1] * 100,
+                         errors, request_id=audit_request_id())
+    if drift_monitor is not None:
+        drift_monitor.update(features[valid])
+    if shadow_scorer is not None:
+        shadow_scorer.submit(features[valid], prediction[valid], probabilities[valid, 1] * 100)
+    diagnosis = np.where(prediction == 1, 'Heart Disease Detected', 'No Heart Disease').astype(object)
+    diagnosis[~valid] = None
+    columns = {
+        'index': np.arange(n),
+        'success': valid,
+        'prediction': prediction,
+        'disease_probability': probabilities[:, 1] * 100,
+        'no_disease_probability': probabilities[:, 0] * 100,
+        'diagnosis': diagnosis,
+        'confidence': probabilities.max(axis=1) * 100,
+        'error': errors,
+    }
+    if explain:
+        contributions = np.full((n, len(FEATURE_NAMES)), np.nan)
+        if scored is not None:
+            contributions[valid] = scored[2]
+        for j, name in enumerate(FEATURE_NAMES):
+            columns[f'contribution_{name}'] = contributions[:, j]
+    timer.mark('build_results')
+    return columns
+
+
+def explain_options():
+    """(explain, top) from the ?explain=1 and optional ?top=N query parameters"""
+    explain = request.args.get('explain', '').lower() in ('1', 'true', 'yes')
+    top = request.args.get('top', type=int)
+    return explain, (top if top and top > 0 else None)
+
+
+def explain_rows(contributions, baseline, top=None):
+    """
+    Per-row explanation dicts from an (N, 13) contribution matrix: the
+    baseline logit (average patient) and [feature, contribution] pairs
+    sorted by absolute contribution, largest first, keeping at most `top`.
+    The logit is baseline_logit plus the sum of all 13 contributions.
+    Sorting and gathering are vectorized over the whole batch.
+    """
+    order = np.argsort(-np.abs(contributions), axis=1, kind='stable')[:, :top]
+    values = np.take_along_axis(contributions, order, axis=1).tolist()
+    names = np.asarray(FEATURE_NAMES)[order].tolist()
+    return [
+        {'baseline_logit': baseline, 'contributions': list(zip(row_names, row_values))}
+        for row_names, row_values in zip(names, values)
+    ]
+
+
+def build_result(prediction, probability):
+    """Build the JSON result for a single scored patient"""
+    return {
+        'success': True,
+        'prediction': int(prediction),
+        'disease_probability': float(probability[1]) * 100,
+        'no_disease_probability': float(probability[0]) * 100,
+        'diagnosis': 'Heart Disease Detected' if prediction == 1 else 'No Heart Disease',
+        'confidence': float(max(probability)) * 100
+    }
+
+
+def warmup():
+    """
+    Run one prediction through the serving path (request context, validation,
+    scoring, JSON encoding) so the first real request does not pay for lazy
+    initialisation. Runs at startup and again whenever a new model is swapped
+    in. Returns True once the current model has answered.
+    """
+    current = registry.current
+    if current is None:
+        return False
+    record = dict(zip(FEATURE_NAMES, schema.defaults.tolist()))
+    with app.test_request_context('/predict', method='POST', json=record):
+        result = score_records([record], current, timer=StageTimer('warmup'), record=False)[0]
+        jsonify(result)
+    if not result['success']:
+        raise RuntimeError(f"Warmup prediction failed: {result['error']}")
+    startup['warmed_version'] = current.version
+    return True
+
+
+def _warm_swapped():
     try:
-        age = float(data.get('age', 0))
-        sex = float(data.get('sex', 0))
-        cp = float(data.get('cp', 0))
-        trestbps = float(data.get('trestbps', 0))
-        chol = float(data.get('chol', 0))
-        thalach = float(data.get('thalach', 0))
-        ca = float(data.get('ca', 0))
-        thal = float(data.get('thal', 0))
-        
-        if not (20 <= age <= 100):
-            return {'valid': False, 'message': 'Age must be between 20 and 100'}
-        
-        if sex not in [0, 1]:
-            return {'valid': False, 'message': 'Sex must be 0 (Female) or 1 (Male)'}
-        
-        if cp not in [0, 1, 2, 3]:
-            return {'valid': False, 'message': 'Chest pain type must be 0-3'}
-        
-        if not (80 <= trestbps <= 200):
-            return {'valid': False, 'message': 'Resting blood pressure must be between 80 and 200'}
-        
-        if not (100 <= chol <= 600):
-            return {'valid': False, 'message': 'Cholesterol must be between 100 and 600'}
-        
-        if not (60 <= thalach <= 220):
-            return {'valid': False, 'message': 'Max heart rate must be between 60 and 220'}
-        
-        if ca not in [0, 1, 2, 3, 4]:
-            return {'valid': False, 'message': 'Major vessels must be 0-4'}
-        
-        if thal not in [0, 1, 2, 3]:
-            return {'valid': False, 'message': 'Thalassemia type must be 0-3'}
-        
-        return {'valid': True}
-    
-    except ValueError:
-        return {'valid': False, 'message': 'Invalid input format'}
+        warmup()
+    except Exception as e:
+        print(f"Warmup of swapped-in model failed: {e}")
+
+
+def readiness():
+    """(ready, details) for /readyz: a model is loaded and has served a warmup prediction"""
+    current = registry.current
+    ready = current is not None and startup.get('warmed_version') is not None
+    return ready, {
+        'ready': ready,
+        'model_version': current.version if current else None,
+        'startup': startup,
+    }
+
+
+def shutdown():
+    """
+    Stop background work and write what is queued: the model watcher, the
+    online learner, the audit log and the shadow pool. Called on worker exit
+    by gunicorn.conf.py and on lifespan shutdown by asgi_app.py.
+    """
+    registry.stop_watcher()
+    if learner is not None:
+        learner.stop()
+    if audit_log is not None:
+        audit_log.close()
+    if shadow_scorer is not None:
+        shadow_scorer.close()
+
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving HTTP"""
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: 200 once a warmed-up model can serve predictions, 503 before"""
+    ready, details = readiness()
+    return jsonify(details), 200 if ready else 503
 
 
 @app.errorhandler(404)
@@ -193,5 +825,21 @@ def server_error(error):
     return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
 
+# Warm up before the worker starts accepting requests, and after every swap
+_warmup_started = time.perf_counter()
+try:
+    warmup()
+except Exception as e:
+    print(f"Warmup failed: {e}")
+registry.on_swap(lambda artifact: _warm_swapped())
+startup['warmup_seconds'] = time.perf_counter() - _warmup_started
+startup['total_seconds'] = time.perf_counter() - _import_started
+startup['budget_seconds'] = app.config['STARTUP_BUDGET_SECONDS']
+startup['within_budget'] = not startup['budget_seconds'] or startup['total_seconds'] <= startup['budget_seconds']
+if not startup['within_budget']:
+    print(f"Startup took {startup['total_seconds']:.3f}s, over the "
+          f"STARTUP_BUDGET_SECONDS budget of {startup['budget_seconds']}s")
+
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,275 @@
+"""
+Heart Disease Prediction ASGI Application
+Async serving mode for the prediction API. Concurrent /predict requests are
+parsed and validated individually, then queued on a MicroBatcher that scores
+them together in one vectorized call. Requests with ?explain=1 go to a
+second batcher that also computes per-feature contributions. Model loading,
+hot reload, validation, the response format, metrics, audit request ids and
+shutdown are shared with the Flask app.
+
+Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+import time
+import uuid
+from functools import partial
+from urllib.parse import parse_qs
+
+import encoders
+import metrics
+from app import (app as flask_app, audit_log, drift_monitor, shadow_scorer, registry, build_result, explain_rows,
+                 metrics_text, readiness, shutdown)
+from batching import MicroBatcher
+from metrics import StageTimer
+from schema import schema
+
+MAX_BODY_BYTES = 65536
+
+batcher = None
+explained_batcher = None
+
+
+class RequestTooLarge(Exception):
+    """The request body exceeded MAX_BODY_BYTES"""
+
+
+def score_batch(features, explain=False):
+    """
+    Score a coalesced (N, 13) matrix with the model current at flush time.
+    With `explain`, every result also carries its baseline logit and all
+    13 contributions, largest first (callers trim them to ?top).
+    """
+    current = registry.current
+    if current is None:
+        raise RuntimeError('Model not loaded. Please ensure the model file exists.')
+    if explain:
+        predictions, probabilities, contributions = current.scorer.score_explained(features)
+        explanations = explain_rows(contributions, current.scorer.baseline)
+    else:
+        predictions, probabilities = current.scorer.score(features)
+    metrics.ROWS_SCORED.inc('predict', amount=len(features))
+    if shadow_scorer is not None:
+        # The whole micro-batch goes to the shadows as one task
+        shadow_scorer.submit(features, predictions, probabilities[:, 1] * 100)
+    results = []
+    for i, (prediction, probability) in enumerate(zip(predictions, probabilities)):
+        result = build_result(prediction, probability)
+        if explain:
+            result.update(explanations[i])
+        result['model_version'] = current.version
+        results.append(result)
+    return results
+
+
+def get_batcher(explain=False):
+    """Create the batchers lazily so they belong to the serving event loop"""
+    global batcher, explained_batcher
+    if (explained_batcher if explain else batcher) is None:
+        created = MicroBatcher(
+            partial(score_batch, explain=True) if explain else score_batch,
+            max_batch_size=flask_app.config['MICROBATCH_MAX_SIZE'],
+            max_wait_us=flask_app.config['MICROBATCH_MAX_WAIT_US'],
+        )
+        if explain:
+            explained_batcher = created
+        else:
+            batcher = created
+    return explained_batcher if explain else batcher
+
+
+def explain_options(scope):
+    """(explain, top) from the query string, parsed like app.explain_options"""
+    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    explain = args.get('explain', [''])[0].lower() in ('1', 'true', 'yes')
+    try:
+        top = int(args.get('top', [''])[0])
+    except ValueError:
+        top = None
+    return explain, (top if top and top > 0 else None)
+
+
+def audit_request_id(scope):
+    """The client's X-Request-ID or a new id, as app.audit_request_id"""
+    for name, value in scope.get('headers', ()):
+        if name == b'x-request-id':
+            return value.decode('latin-1')
+    return uuid.uuid4().hex
+
+
+async def read_body(receive):
+    body = b''
+    more = True
+    while more:
+        message = await receive()
+        body += message.get('body', b'')
+        more = message.get('more_body', False)
+        if len(body) > MAX_BODY_BYTES:
+            raise RequestTooLarge(f'Request body too large (limit {MAX_BODY_BYTES} bytes)')
+    return body
+
+
+async def send_json(send, status, payload, headers=None):
+    await send_body(send, status, encoders.dumps(payload), 'application/json', headers)
+
+
+async def send_body(send, status, body, content_type, headers=None):
+    raw_headers = [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode())]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), str(value).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def predict(scope, receive, send):
+    """Async equivalent of the Flask /predict endpoint, including ?explain and ?top"""
+    if registry.current is None:
+        return await send_json(send, 500, {
+            'success': False,
+            'error': 'Model not loaded. Please ensure the model file exists.'
+        })
+
+    timer = StageTimer('predict')
+    try:
+        body = await read_body(receive)
+    except RequestTooLarge as e:
+        return await send_json(send, 413, {'success': False, 'error': str(e)})
+    try:
+        data = encoders.loads(body or b'null')
+    except ValueError:
+        return await send_json(send, 400, {'success': False, 'error': 'Invalid JSON'})
+    timer.mark('parse_json')
+
+    features, errors = schema.parse_records([data])
+    timer.mark('extract')
+    message = schema.validate(features, errors)[0]
+    timer.mark('validate')
+    if message is not None:
+        metrics.VALIDATION_FAILURES.inc('predict')
+        if audit_log is not None:
+            audit_log.record('predict', registry.current.version, features, [None], [None], [message],
+                             request_id=audit_request_id(scope))
+        return await send_json(send, 400, {'success': False, 'error': message})
+
+    explain, top = explain_options(scope)
+    try:
+        result = await get_batcher(explain).submit(features[0])
+        if explain and top is not None:
+            result = dict(result, contributions=result['contributions'][:top])
+    except Exception as e:
+        return await send_json(send, 500, {
+            'success': False,
+            'error': f'Error making prediction: {str(e)}'
+        })
+    # Includes the wait for the micro-batch to fill or time out
+    timer.mark('score')
+    if drift_monitor is not None:
+        drift_monitor.update(features)
+    if audit_log is not None:
+        audit_log.record('predict', result['model_version'], features, [result['prediction']],
+                         [result['disease_probability']], [None], request_id=audit_request_id(scope))
+    body = encoders.dumps(result)
+    timer.mark('serialize')
+    await send_body(send, 200, body, 'application/json', {'X-Model-Version': result['model_version']})
+
+
+async def info(send):
+    current = registry.current
+    await send_json(send, 200, {
+        'model_name': 'Heart Disease Prediction',
+        'algorithm': 'Logistic Regression',
+        'features_count': len(current.feature_names) if current else 0,
+        'features': current.feature_names if current else [],
+        'schema': schema.describe(),
+        **(current.info() if current else {}),
+        **registry.status(),
+        'batching': get_batcher().stats(),
+    })
+
+
+async def drift(send):
+    if drift_monitor is None:
+        return await send_json(send, 503, {'available': False, 'error': 'Drift monitoring is disabled'})
+    report = drift_monitor.report()
+    report['model_version'] = registry.current.version if registry.current else None
+    await send_json(send, 200 if report['available'] else 503, report)
+
+
+async def shadow(send):
+    if shadow_scorer is None:
+        return await send_json(send, 503, {
+            'success': False,
+            'error': 'No shadow models configured (set SHADOW_MODELS)'
+        })
+    current = registry.current
+    await send_json(send, 200, dict(shadow_scorer.stats(), model_version=current.version if current else None))
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            get_batcher()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def route(scope, receive, send):
+    """Answer one HTTP request; returns its endpoint name as Flask names it (for metrics)"""
+    path, method = scope['path'], scope['method']
+    if path == '/predict' and method == 'POST':
+        await predict(scope, receive, send)
+        return 'predict'
+    if path == '/api/info' and method == 'GET':
+        await info(send)
+        return 'info'
+    if path == '/api/drift' and method == 'GET':
+        await drift(send)
+        return 'drift_report'
+    if path == '/api/shadow' and method == 'GET':
+        await shadow(send)
+        return 'shadow_report'
+    if path == '/metrics' and method == 'GET':
+        await send_body(send, 200, metrics_text().encode('utf-8'), metrics.CONTENT_TYPE)
+        return 'metrics_endpoint'
+    if path == '/healthz' and method == 'GET':
+        await send_json(send, 200, {'status': 'ok'})
+        return 'healthz'
+    if path == '/readyz' and method == 'GET':
+        ready, details = readiness()
+        await send_json(send, 200 if ready else 503, details)
+        return 'readyz'
+    if path in ('/predict', '/api/info', '/api/drift', '/api/shadow', '/metrics', '/healthz', '/readyz'):
+        await send_json(send, 405, {'success': False, 'error': 'Method not allowed'})
+    else:
+        await send_json(send, 404, {'success': False, 'error': 'Page not found'})
+    return 'unknown'
+
+
+async def app(scope, receive, send):
+    """ASGI entry point; counts every request and records its latency like the Flask app"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    start = time.perf_counter()
+    status = []
+
+    async def send_and_record(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        await send(message)
+
+    endpoint = 'unknown'
+    try:
+        endpoint = await route(scope, receive, send_and_record)
+    finally:
+        code = status[0] if status else 500
+        metrics.REQUESTS.inc(endpoint, str(code))
+        if code >= 500:
+            metrics.ERRORS.inc(endpoint)
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
@@ -0,0 +1,338 @@
+"""
+Prediction Audit Log
+Records every prediction's inputs, outputs and model version without putting
+disk I/O on the request path. Endpoints call AuditLog.record(), which only
+appends references to the request's arrays to an in-memory queue; a
+background thread turns them into rows and writes them in batches, either as
+appended lines of a size-rotated JSONL file or as one SQLite transaction per
+batch. Each process writes its own JSONL file, with its pid inserted before
+the extension (predictions.jsonl -> predictions.<pid>.jsonl), so gunicorn
+workers never rotate a file another worker is appending to. SQLite files are
+shared; the database serialises the writers.
+
+The queue is bounded by rows. When it is full the overflow policy decides:
+
+- block:       wait up to block_timeout seconds for the writer, then drop the new rows
+- drop_newest: drop the new rows immediately
+- drop_oldest: drop the oldest queued rows to make room
+
+Dropped rows are counted (and exported at /metrics). close() drains the queue
+and is registered with atexit, so rows queued before shutdown are written.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+import encoders
+from schema import FEATURE_NAMES
+
+BACKENDS = ('jsonl', 'sqlite')
+OVERFLOW_POLICIES = ('block', 'drop_newest', 'drop_oldest')
+
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    request_id TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    model_version TEXT,
+    row INTEGER NOT NULL,
+    inputs TEXT NOT NULL,
+    prediction INTEGER,
+    disease_probability REAL,
+    error TEXT
+)
+'''
+SQLITE_INSERT = '''
+INSERT INTO predictions
+    (ts, request_id, endpoint, model_version, row, inputs, prediction, disease_probability, error)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def process_path(path, pid=None):
+    """`path` with the process id inserted before its extension"""
+    root, ext = os.path.splitext(path)
+    return f'{root}.{pid or os.getpid()}{ext}'
+
+
+class JSONLWriter:
+    """Appends rows as JSON lines, rotating path -> path.1 ... path.N past max_bytes"""
+
+    def __init__(self, path, max_bytes=100 * 1024 * 1024, backup_count=10):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab')
+
+    def write(self, rows):
+        self._file.write(b''.join(encoders.dumps(row) + b'\n' for row in rows))
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f'{self.path}.{i}'):
+                    os.replace(f'{self.path}.{i}', f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        self._file.close()
+
+
+class SQLiteWriter:
+    """Inserts each batch of rows in a single transaction"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(SQLITE_SCHEMA)
+        self._db.commit()
+
+    def write(self, rows):
+        with self._db:
+            self._db.executemany(SQLITE_INSERT, [
+                (r['ts'], r['request_id'], r['endpoint'], r['model_version'], r['row'],
+                 encoders.dumps(r['inputs']).decode('utf-8'), r['prediction'],
+                 r['disease_probability'], r['error'])
+                for r in rows
+            ])
+
+    def close(self):
+        self._db.close()
+
+
+def expand(event):
+    """One queued record() call -> one audit row per prediction"""
+    ts, request_id, endpoint, model_version, offset, features, predictions, probabilities, errors = event
+    names = FEATURE_NAMES
+    return [
+        {
+            'ts': ts,
+            'request_id': request_id,
+            'endpoint': endpoint,
+            'model_version': model_version,
+            'row': offset + i,
+            'inputs': dict(zip(names, values)),
+            'prediction': prediction if error is None else None,
+            'disease_probability': probability if error is None else None,
+            'error': error,
+        }
+        for i, (values, prediction, probability, error) in enumerate(zip(
+            features.tolist(), np.asarray(predictions).tolist(),
+            np.asarray(probabilities).tolist(), list(errors)))
+    ]
+
+
+class AuditLog:
+    """Bounded in-memory queue of prediction records drained by a writer thread"""
+
+    def __init__(self, path, backend='jsonl', queue_size=100000, overflow='block', block_timeout=0.1,
+                 batch_size=1000, flush_interval=1.0, max_bytes=100 * 1024 * 1024, backup_count=10):
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown audit backend {backend!r}; expected one of {BACKENDS}')
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy {overflow!r}; expected one of {OVERFLOW_POLICIES}')
+        self.path = process_path(path) if backend == 'jsonl' else path
+        self.backend = backend
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._events = deque()
+        self._queued_rows = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+        self._closed = False
+        # Set by flush() and blocked producers so the writer drains before its interval
+        self._drain_requested = False
+
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_error = None
+        self._in_flight = 0
+
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, endpoint, model_version, features, predictions, probabilities, errors, offset=0,
+               request_id=None):
+        """
+        Queue one request's predictions: an (N, 13) feature matrix and, per
+        row, the predicted class, the disease probability in percent (as the
+        API returns it) and the error message (None for scored rows;
+        prediction and probability are ignored for rows with an error). Rows
+        are numbered from `offset` within the request, which is identified by
+        `request_id` (a new UUID if not given). The arrays are not copied, so
+        callers must not modify them afterwards.
+        Returns False if the rows were dropped.
+        """
+        n = len(features)
+        if not n:
+            return True
+        event = (time.time(), request_id or uuid.uuid4().hex, endpoint, model_version, offset,
+                 features, predictions, probabilities, errors)
+        with self._lock:
+            if self._closed:
+                self.dropped += n
+                return False
+            if self._queued_rows + n > self.queue_size:
+                if not self._make_room(n):
+                    self.dropped += n
+                    return False
+            self._events.append(event)
+            self._queued_rows += n
+            self.accepted += n
+            if self._queued_rows >= self.batch_size:
+                self._not_empty.notify()
+        return True
+
+    def _make_room(self, n):
+        """Apply the overflow policy with the lock held; True if `n` rows now fit"""
+        if n > self.queue_size or self.overflow == 'drop_newest':
+            return False
+        if self.overflow == 'drop_oldest':
+            while self._events and self._queued_rows + n > self.queue_size:
+                oldest = self._events.popleft()
+                self._queued_rows -= len(oldest[5])
+                self.dropped += len(oldest[5])
+            return True
+        self._drain_requested = True
+        self._not_empty.notify()
+        deadline = time.monotonic() + self.block_timeout
+        while self._queued_rows + n > self.queue_size and not self._closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._not_full.wait(remaining)
+        return not self._closed
+
+    def _take(self):
+        """Wait for a full batch, the flush interval or close(); returns queued events"""
+        with self._lock:
+            self._not_empty.wait_for(
+                lambda: self._closed or self._drain_requested or self._queued_rows >= self.batch_size,
+                self.flush_interval,
+            )
+            self._drain_requested = False
+            events = list(self._events)
+            self._events.clear()
+            self._in_flight = self._queued_rows
+            self._queued_rows = 0
+            self._not_full.notify_all()
+            return events
+
+    def _run(self):
+        writer = None
+        try:
+            writer = (SQLiteWriter(self.path) if self.backend == 'sqlite'
+                      else JSONLWriter(self.path, self.max_bytes, self.backup_count))
+        except Exception as e:
+            self.last_error = f'Could not open audit log {self.path}: {e}'
+            print(self.last_error)
+
+        while True:
+            events = self._take()
+            if events:
+                rows = [row for event in events for row in expand(event)]
+                try:
+                    if writer is None:
+                        raise RuntimeError(self.last_error)
+                    for start in range(0, len(rows), self.batch_size):
+                        writer.write(rows[start:start + self.batch_size])
+                        self.batches += 1
+                    self.written += len(rows)
+                except Exception as e:
+                    self.failed += len(rows)
+                    self.last_error = str(e)
+                    print(f"Audit log write failed ({len(rows)} rows lost): {e}")
+            with self._lock:
+                self._in_flight = 0
+                self._flushed.notify_all()
+                if self._closed and not self._events:
+                    break
+        if writer is not None:
+            writer.close()
+
+    def flush(self, timeout=10):
+        """Block until everything queued so far has been written (or failed)"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._events or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._drain_requested = True
+                self._not_empty.notify()
+                self._flushed.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Stop accepting records, write everything queued and stop the writer"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._not_empty.notify()
+            self._not_full.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        """JSON-serialisable counters for /api/info and /metrics"""
+        return {
+            'backend': self.backend,
+            'path': self.path,
+            'overflow': self.overflow,
+            'queue_size': self.queue_size,
+            'queued': self._queued_rows,
+            'accepted': self.accepted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_error': self.last_error,
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['AUDIT_LOG_PATH'],
+            backend=config['AUDIT_LOG_BACKEND'],
+            queue_size=config['AUDIT_QUEUE_SIZE'],
+            overflow=config['AUDIT_OVERFLOW'],
+            block_timeout=config['AUDIT_BLOCK_TIMEOUT'],
+            batch_size=config['AUDIT_BATCH_SIZE'],
+            flush_interval=config['AUDIT_FLUSH_INTERVAL'],
+            max_bytes=config['AUDIT_MAX_BYTES'],
+            backup_count=config['AUDIT_BACKUP_COUNT'],
+        )
@@ -0,0 +1,71 @@
+"""
+Dynamic Micro-Batching
+Coalesces concurrent single-record scoring requests into one vectorized call.
+Callers await `submit(row)`; rows are queued until either `max_batch_size`
+rows are waiting or the oldest row has waited `max_wait_us` microseconds, then
+the whole batch is scored at once and each caller receives its own result.
+"""
+
+import asyncio
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Batch rows submitted from one asyncio event loop"""
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_us=500):
+        # score_batch(matrix) -> sequence with one result per row
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self._pending = []
+        self._timer = None
+        self.batches = 0
+        self.rows = 0
+        self.full_flushes = 0
+
+    async def submit(self, row):
+        """Queue one (13,) or (1, 13) feature row and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.full_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_us / 1e6, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        try:
+            results = self.score_batch(np.vstack([row for row, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # A caller may have gone away (cancelled) while it was queued
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_us': self.max_wait_us,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'full_flushes': self.full_flushes,
+            'queued': len(self._pending),
+        }
@@ -0,0 +1,211 @@
+"""
+Heart Disease Prediction Benchmarks
+Reproducible performance checks for inference and training. Everything runs
+on synthetic data with fixed seeds, in a temporary directory, so the real
+models/ folder is never touched:
+
+- train:        train_model.py end to end (load, clean, fit, save) on a synthetic heart.csv
+- artifact_load: loading the model artifact train_model.py wrote
+- startup:      app.py import + model load + warmup in a fresh interpreter
+- predict:      single-row POST /predict through the Flask test client
+- batch_N:      POST /predict/batch with N records
+- score_N:      schema validation + fused scoring of an (N, 13) matrix
+
+Results are medians in seconds. They can be saved as a JSON baseline and later
+runs fail when any benchmark is slower than baseline * (1 + threshold).
+
+Usage:
+    python benchmarks.py --save-baseline
+    python benchmarks.py --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from schema import FEATURE_NAMES, FEATURE_SCHEMA, schema
+
+BASELINE_PATH = 'benchmark_baseline.json'
+SEED = 42
+BATCH_SIZES = (1, 100, 1000, 10000)
+SCORE_SIZES = (1000, 100000, 1000000)
+
+
+def synthetic_features(n, seed=SEED):
+    """Valid (n, 13) feature matrix drawn from the schema ranges"""
+    rng = np.random.default_rng(seed)
+    columns = []
+    for feature in FEATURE_SCHEMA:
+        if feature['dtype'] == 'category':
+            columns.append(rng.choice(list(feature['choices']), n))
+        elif feature['dtype'] == 'float':
+            columns.append(np.round(rng.uniform(feature['min'], feature['max'], n), 1))
+        else:
+            columns.append(rng.integers(feature['min'], feature['max'] + 1, n))
+    return np.column_stack(columns).astype(float)
+
+
+def synthetic_records(n, seed=SEED):
+    return [dict(zip(FEATURE_NAMES, row)) for row in synthetic_features(n, seed).tolist()]
+
+
+def write_training_csv(path, n=2000, seed=SEED):
+    """Synthetic heart.csv with a target that depends on the features"""
+    rng = np.random.default_rng(seed)
+    features = synthetic_features(n, seed)
+    logits = (features - features.mean(axis=0)) / features.std(axis=0) @ rng.normal(size=features.shape[1])
+    target = (logits + rng.normal(size=n) > 0).astype(int)
+    with open(path, 'w') as f:
+        f.write(','.join(FEATURE_NAMES + ['target']) + '\n')
+        for row, label in zip(features.tolist(), target):
+            f.write(','.join(repr(v) for v in row) + f',{label}\n')
+
+
+def measure(func, repeat, warmup=1):
+    """Median wall time of func() over `repeat` runs after `warmup` runs"""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(quick=False):
+    """Run every benchmark and return {name: median seconds}"""
+    results = {}
+    repeat = 3 if quick else 10
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(here, 'train_model.py')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_training_csv(os.path.join(workdir, 'heart.csv'))
+
+        def train():
+            subprocess.run([sys.executable, script, '--no-cache'], cwd=workdir, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        results['train'] = measure(train, repeat=1 if quick else 3, warmup=0)
+        models_dir = os.path.join(workdir, 'models')
+
+        from model_artifact import load_model
+        results['artifact_load'] = measure(lambda: load_model(models_dir), repeat * 10)
+
+        # Fresh interpreters serving the freshly trained model; app.startup
+        # times everything from its first import to the end of warmup
+        probe = f'import json, os, sys; os.chdir({workdir!r}); sys.path.insert(0, {here!r}); ' \
+                'import app; print(json.dumps(app.startup))'
+        startups = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True)
+            startups.append(json.loads(output.stdout.strip().splitlines()[-1])['total_seconds'])
+        results['startup'] = statistics.median(startups)
+
+        # Serve the freshly trained model through the real Flask app
+        import app as app_module
+        app_module.registry.models_dir = models_dir
+        app_module.registry.reload(force=True)
+        app_module.prediction_cache.maxsize = 0  # measure scoring, not cache hits
+        client = app_module.app.test_client()
+
+        records = synthetic_records(1000)
+        position = iter(range(10 ** 9))
+
+        def predict():
+            response = client.post('/predict', json=records[next(position) % len(records)])
+            assert response.status_code == 200, response.data
+
+        results['predict'] = measure(lambda: [predict() for _ in range(100)], repeat) / 100
+
+        for n in BATCH_SIZES:
+            if quick and n > 1000:
+                continue
+            batch = synthetic_records(n)
+            results[f'batch_{n}'] = measure(lambda: client.post('/predict/batch', json=batch), repeat)
+
+        scorer = app_module.registry.current.scorer
+        for n in SCORE_SIZES:
+            if quick and n > 100000:
+                continue
+            features = synthetic_features(n)
+
+            def score():
+                valid = schema.validate(features) == None  # noqa: E711
+                scorer.score(features[valid])
+
+            results[f'score_{n}'] = measure(score, repeat)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (name, current, baseline, ratio) regressions"""
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference and seconds > reference * (1 + threshold):
+            regressions.append((name, seconds, reference, seconds / reference))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run inference and training benchmarks')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=float(os.environ.get('BENCHMARK_THRESHOLD', 0.25)),
+                        help='allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--output', help='also write this run to a JSON file')
+    parser.add_argument('--quick', action='store_true', help='fewer repeats and smaller sizes')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(quick=args.quick)
+    record = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'seconds': results,
+    }
+
+    print(f"{'benchmark':<16}{'median':>14}")
+    for name, seconds in results.items():
+        print(f"{name:<16}{seconds * 1000:>11.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(record, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['seconds']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n✗ Performance regressions (threshold {args.threshold:.0%}):")
+        for name, seconds, reference, ratio in regressions:
+            print(f"  {name}: {seconds * 1000:.3f} ms vs baseline {reference * 1000:.3f} ms ({ratio:.2f}x)")
+        return 1
+    print(f"\n✓ No regressions beyond {args.threshold:.0%} of baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Heart Disease Bulk Scoring CLI
+Scores a large CSV extract offline with the artifacts written by
+train_model.py. The input is read in chunks with pandas, chunks are fanned out
+over a process pool, and predictions are written to CSV or Parquet in input
+order. Parsing and validation follow the same rules as the Flask app, so
+offline and online scores match exactly.
+
+Usage:
+    python bulk_score.py patients.csv predictions.csv
+    python bulk_score.py patients.csv predictions.parquet --workers 8 --chunk-size 200000
+    python bulk_score.py patients.csv predictions.csv --explain   # adds contribution_<feature> columns
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+from schema import FEATURE_NAMES, schema
+from model_artifact import load_model
+
+RESULT_COLUMNS = [
+    'index', 'success', 'prediction', 'disease_probability',
+    'no_disease_probability', 'confidence', 'error'
+]
+# With --explain: each feature's contribution to the logit, in feature order
+CONTRIBUTION_COLUMNS = [f'contribution_{name}' for name in FEATURE_NAMES]
+
+# Worker-process scorer, set by _init_worker
+_scorer = None
+
+
+def load_scorer(models_dir='models'):
+    """Load the model artifact train_model.py wrote and return its fused scorer"""
+    return load_model(models_dir).scorer
+
+
+def frame_to_features(frame):
+    """
+    Convert a chunk read with dtype=str into an (N, 13) matrix.
+    Mirrors schema.parse_records: missing columns default to 0 and any cell
+    that float() rejects marks the whole row 'Invalid input format'.
+    """
+    features = np.zeros((len(frame), len(FEATURE_NAMES)))
+    errors = np.full(len(frame), None, dtype=object)
+    for j, name in enumerate(FEATURE_NAMES):
+        if name not in frame.columns:
+            continue
+        column = frame[name].to_numpy(dtype=object)
+        try:
+            # object -> float64 calls float() per cell, so it accepts exactly what the app accepts
+            features[:, j] = column.astype(np.float64)
+        except (TypeError, ValueError):
+            for i, value in enumerate(column):
+                try:
+                    features[i, j] = float(value)
+                except (TypeError, ValueError):
+                    errors[i] = 'Invalid input format'
+    return features, errors
+
+
+def score_frame(frame, scorer, explain=False):
+    """
+    Validate and score one chunk, returning a results DataFrame. With
+    `explain`, per-feature logit contributions are added as columns
+    (NaN for invalid rows).
+    """
+    features, errors = frame_to_features(frame)
+    errors = schema.validate(features, errors)
+    valid = errors == None  # noqa: E711 - elementwise check on object array
+
+    labels = np.full(len(frame), -1)
+    probabilities = np.full((len(frame), 2), np.nan)
+    contributions = np.full(features.shape, np.nan)
+    if valid.any():
+        if explain:
+            labels[valid], probabilities[valid], contributions[valid] = scorer.score_explained(features[valid])
+        else:
+            labels[valid], probabilities[valid] = scorer.score(features[valid])
+
+    results = pd.DataFrame({
+        'index': frame.index.to_numpy(),
+        'success': valid,
+        'prediction': pd.array(np.where(valid, labels, 0), dtype='Int64'),
+        'disease_probability': probabilities[:, 1] * 100,
+        'no_disease_probability': probabilities[:, 0] * 100,
+        'confidence': probabilities.max(axis=1) * 100,
+        'error': errors,
+    })
+    results.loc[~valid, 'prediction'] = pd.NA
+    if explain:
+        results[CONTRIBUTION_COLUMNS] = contributions
+    return results
+
+
+def _init_worker(models_dir):
+    global _scorer
+    _scorer = load_scorer(models_dir)
+
+
+def _score_chunk(frame, parquet, explain=False):
+    results = score_frame(frame, _scorer, explain)
+    # CSV text is rendered in the worker so the parent only appends bytes
+    return results if parquet else results.to_csv(header=False, index=False)
+
+
+def parquet_schema(columns):
+    """Arrow schema of the result columns (every field nullable)"""
+    types = {'index': pa.int64(), 'success': pa.bool_(), 'prediction': pa.int64(), 'error': pa.string()}
+    return pa.schema([(name, types.get(name, pa.float64())) for name in columns])
+
+
+class ResultWriter:
+    """Append result chunks (DataFrames or pre-rendered CSV text) to a CSV or Parquet file"""
+
+    def __init__(self, path, columns=RESULT_COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and pq is None:
+            raise RuntimeError('Writing Parquet requires pyarrow (pip install pyarrow)')
+        self.schema = parquet_schema(columns) if self.parquet else None
+        self._writer = None
+        self._file = None
+
+    def write(self, results):
+        if self.parquet:
+            # Explicit schema: a chunk without invalid rows would otherwise
+            # infer a null-typed error column that later chunks cannot match
+            table = pa.Table.from_pandas(results, schema=self.schema, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+            return
+        if self._file is None:
+            self._file = open(self.path, 'w', newline='')
+            self._file.write(','.join(self.columns) + '\n')
+        if not isinstance(results, str):
+            results = results.to_csv(header=False, index=False)
+        self._file.write(results)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def run(input_path, output_path, models_dir='models', workers=None, chunk_size=100000, explain=False):
+    """Score input_path into output_path and return (rows, seconds)"""
+    workers = workers or os.cpu_count() or 1
+    reader = pd.read_csv(input_path, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                         skipinitialspace=True)
+    writer = ResultWriter(output_path, RESULT_COLUMNS + (CONTRIBUTION_COLUMNS if explain else []))
+    rows = 0
+    start = time.perf_counter()
+
+    try:
+        if workers == 1:
+            scorer = load_scorer(models_dir)
+            for frame in reader:
+                results = score_frame(frame, scorer, explain)
+                writer.write(results)
+                rows += len(results)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(models_dir,)) as pool:
+                # Keep a bounded number of chunks in flight and write in input order
+                pending = deque()
+                for frame in reader:
+                    pending.append((len(frame), pool.submit(_score_chunk, frame, writer.parquet, explain)))
+                    if len(pending) >= 2 * workers:
+                        count, future = pending.popleft()
+                        writer.write(future.result())
+                        rows += count
+                while pending:
+                    count, future = pending.popleft()
+                    writer.write(future.result())
+                    rows += count
+    finally:
+        writer.close()
+
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a CSV of patients with the trained heart disease model')
+    parser.add_argument('input', help='input CSV with a header row of feature names')
+    parser.add_argument('output', help='output file (.csv or .parquet)')
+    parser.add_argument('--models-dir', default='models', help='directory written by train_model.py')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='rows per chunk')
+    parser.add_argument('--explain', action='store_true', help='add per-feature logit contribution columns')
+    args = parser.parse_args(argv)
+
+    try:
+        rows, seconds = run(args.input, args.output, args.models_dir, args.workers, args.chunk_size, args.explain)
+    except Exception as e:
+        print(f"Error scoring {args.input}: {e}")
+        return 1
+
+    print(f"Scored {rows} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,103 @@ class Config:
     DEBUG = False
     TESTING = False
     JSON_SORT_KEYS = False
+    # Maximum number of records accepted by /predict/batch
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 50000))
+    # /predict/stream reads the body in chunks of this many bytes and scores
+    # this many records at a time
+    STREAM_CHUNK_BYTES = int(os.environ.get('STREAM_CHUNK_BYTES', 65536))
+    STREAM_CHUNK_ROWS = int(os.environ.get('STREAM_CHUNK_ROWS', 1000))
+    # /predict result cache: maximum entries (0 disables) and optional TTL in seconds
+    PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+    PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 0))
+    # Seconds between checks of models/ for a retrained artifact (0 disables)
+    MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 10))
+    # Token required by POST /admin/reload; the endpoint is disabled when unset
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    # Async serving mode (asgi_app.py): concurrent /predict requests are
+    # scored together once this many are queued or the oldest has waited
+    # this many microseconds
+    MICROBATCH_MAX_SIZE = int(os.environ.get('MICROBATCH_MAX_SIZE', 64))
+    MICROBATCH_MAX_WAIT_US = int(os.environ.get('MICROBATCH_MAX_WAIT_US', 500))
+    # On-demand request profiling (cProfile + tracemalloc). When enabled, a
+    # request is profiled if it sends PROFILING_HEADER: 1 with X-Admin-Token
+    # (ignored when ADMIN_TOKEN is unset) or is sampled at
+    # PROFILING_SAMPLE_RATE; at most PROFILING_MAX_FILES dumps are kept
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+    PROFILING_DIR = os.environ.get('PROFILING_DIR', 'profiles')
+    PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', 50))
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_HEADER = os.environ.get('PROFILING_HEADER', 'X-Profile')
+    # Online learning from POST /feedback. Labeled records are buffered (at
+    # most FEEDBACK_BUFFER_SIZE), every 1/FEEDBACK_HOLDOUT_FRACTION-th is held
+    # out, and the rest update a candidate model in FEEDBACK_BATCH_SIZE steps.
+    # The candidate replaces the served model once at least
+    # FEEDBACK_MIN_HOLDOUT holdout rows show lower log loss and an accuracy
+    # drop of at most FEEDBACK_MAX_ACCURACY_DROP
+    ONLINE_LEARNING_ENABLED = os.environ.get('ONLINE_LEARNING_ENABLED', '').lower() in ('1', 'true', 'yes')
+    ONLINE_LEARNING_INTERVAL = float(os.environ.get('ONLINE_LEARNING_INTERVAL', 30))
+    ONLINE_LEARNING_RATE = float(os.environ.get('ONLINE_LEARNING_RATE', 0.01))
+    FEEDBACK_BUFFER_SIZE = int(os.environ.get('FEEDBACK_BUFFER_SIZE', 10000))
+    FEEDBACK_BATCH_SIZE = int(os.environ.get('FEEDBACK_BATCH_SIZE', 64))
+    FEEDBACK_HOLDOUT_FRACTION = float(os.environ.get('FEEDBACK_HOLDOUT_FRACTION', 0.2))
+    FEEDBACK_MIN_HOLDOUT = int(os.environ.get('FEEDBACK_MIN_HOLDOUT', 50))
+    FEEDBACK_MAX_ACCURACY_DROP = float(os.environ.get('FEEDBACK_MAX_ACCURACY_DROP', 0))
+
+    # Import + model load + warmup time allowed for app.py; exceeding it is
+    # logged, reported by /readyz and fails the startup check in
+    # test_project.py (0 disables)
+    STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', 3))
+
+    # Audit log of every prediction (inputs, outputs, model version). Records
+    # are queued in memory (at most AUDIT_QUEUE_SIZE rows) and written by a
+    # background thread in batches to a rotating JSONL file or SQLite. With
+    # JSONL every process (gunicorn worker) writes AUDIT_LOG_PATH with its pid
+    # before the extension, e.g. audit/predictions.<pid>.jsonl.
+    # AUDIT_OVERFLOW is block (wait up to AUDIT_BLOCK_TIMEOUT seconds),
+    # drop_newest or drop_oldest; dropped rows are counted at /metrics
+    AUDIT_LOG_ENABLED = os.environ.get('AUDIT_LOG_ENABLED', '').lower() in ('1', 'true', 'yes')
+    AUDIT_LOG_BACKEND = os.environ.get('AUDIT_LOG_BACKEND', 'jsonl')
+    AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', os.path.join('audit', 'predictions.jsonl'))
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 100000))
+    AUDIT_OVERFLOW = os.environ.get('AUDIT_OVERFLOW', 'block')
+    AUDIT_BLOCK_TIMEOUT = float(os.environ.get('AUDIT_BLOCK_TIMEOUT', 0.1))
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 1000))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+    AUDIT_MAX_BYTES = int(os.environ.get('AUDIT_MAX_BYTES', 100 * 1024 * 1024))
+    AUDIT_BACKUP_COUNT = int(os.environ.get('AUDIT_BACKUP_COUNT', 10))
+
+    # Feature drift monitoring: every validated row that is scored updates
+    # running per-feature statistics, compared at /api/drift with the
+    # training distribution saved by train_model.py. Features need
+    # DRIFT_MIN_ROWS rows before they are judged; PSI at or above
+    # DRIFT_PSI_WARN / DRIFT_PSI_ALERT marks them warn / alert
+    DRIFT_MONITOR_ENABLED = os.environ.get('DRIFT_MONITOR_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    DRIFT_MIN_ROWS = int(os.environ.get('DRIFT_MIN_ROWS', 100))
+    DRIFT_PSI_WARN = float(os.environ.get('DRIFT_PSI_WARN', 0.1))
+    DRIFT_PSI_ALERT = float(os.environ.get('DRIFT_PSI_ALERT', 0.25))
+
+    # Shadow models: comma-separated .hdp artifacts or model directories scored
+    # on live traffic next to the served model. Only the served model's answer
+    # is returned; shadows run on SHADOW_WORKERS background threads and rows
+    # beyond SHADOW_MAX_PENDING_ROWS waiting for them are shed. Agreement and
+    # latency are reported at /api/shadow
+    SHADOW_MODELS = [p.strip() for p in os.environ.get('SHADOW_MODELS', '').split(',') if p.strip()]
+    SHADOW_WORKERS = int(os.environ.get('SHADOW_WORKERS', 1))
+    SHADOW_MAX_PENDING_ROWS = int(os.environ.get('SHADOW_MAX_PENDING_ROWS', 10000))
+
+    # gunicorn topology, applied by gunicorn.conf.py. SERVER_WORKER_CLASS is
+    # sync, gthread (uses SERVER_THREADS) or uvicorn (serves asgi_app.py).
+    # loadtest.py measures the alternatives and writes its recommendation to
+    # SERVER_ENV_FILE, which gunicorn.conf.py loads before reading these.
+    # Workers default to 4, as the Docker image always ran, or to the
+    # platform's WEB_CONCURRENCY (e.g. Heroku), which gunicorn itself honours.
+    # os.cpu_count() is not used: in a container it reports the host's CPUs
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:' + os.environ.get('PORT', '5000'))
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', os.environ.get('WEB_CONCURRENCY', 4)))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 1))
+    SERVER_WORKER_CLASS = os.environ.get('SERVER_WORKER_CLASS', 'sync')
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 30))
+    SERVER_ENV_FILE = os.environ.get('SERVER_ENV_FILE', 'server.env')
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -23,6 +120,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     DEBUG = True
     TESTING = True
+    MODEL_RELOAD_INTERVAL = 0
 
 # Configuration dictionary
 config = {
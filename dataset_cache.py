@@ -0,0 +1,124 @@
+"""
+Cleaned Dataset Cache
+Stores the cleaned training frame in a columnar binary file so re-runs and
+CV experiments skip CSV parsing and cleaning. Entries are keyed by a hash of
+the source file's bytes plus the source code of the cleaning function, so
+editing either the data or the cleaning logic invalidates the cache.
+
+Parquet is used when pyarrow is installed; otherwise each column is stored as
+a NumPy array in an uncompressed .npz file.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET = True
+except ImportError:
+    PARQUET = False
+
+CACHE_DIR = '.dataset_cache'
+INDEX_FILE = 'index.json'
+KEEP_ENTRIES = 8
+
+
+def _read_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(cache_dir, index):
+    path = os.path.join(cache_dir, INDEX_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def file_digest(path, cache_dir=CACHE_DIR):
+    """
+    SHA-256 of a file's bytes. The digest is remembered against the file's
+    size and mtime, so an untouched source is not re-hashed on every run.
+    """
+    stat = os.stat(path)
+    index = _read_index(cache_dir)
+    entry = index.get('sources', {}).get(os.path.abspath(path))
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+
+    if os.path.isdir(cache_dir):
+        index.setdefault('sources', {})[os.path.abspath(path)] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256,
+        }
+        _write_index(cache_dir, index)
+    return sha256
+
+
+def cache_key(path, clean_func, cache_dir=CACHE_DIR):
+    """Key for the cleaned version of `path` produced by `clean_func`"""
+    logic = hashlib.sha256(inspect.getsource(clean_func).encode('utf-8')).hexdigest()
+    combined = f'{file_digest(path, cache_dir)}:{logic}:{pd.__version__}'
+    return hashlib.sha256(combined.encode('utf-8')).hexdigest()[:24]
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, key + ('.parquet' if PARQUET else '.npz'))
+
+
+def load(key, cache_dir=CACHE_DIR):
+    """Return the cached frame for `key`, or None on a miss"""
+    path = _entry_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        if PARQUET:
+            return pd.read_parquet(path)
+        with np.load(path, allow_pickle=False) as data:
+            columns = [str(c) for c in data['__columns__']]
+            return pd.DataFrame({name: data[f'c{i}'] for i, name in enumerate(columns)})
+    except Exception:
+        # A truncated or unreadable entry is just a miss
+        return None
+
+
+def save(key, df, cache_dir=CACHE_DIR):
+    """Write `df` under `key` atomically and prune old entries"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(key, cache_dir)
+    tmp = path + '.tmp'
+    df = df.reset_index(drop=True)
+    if PARQUET:
+        df.to_parquet(tmp, index=False)
+    else:
+        arrays = {f'c{i}': df[name].to_numpy() for i, name in enumerate(df.columns)}
+        with open(tmp, 'wb') as f:
+            np.savez(f, __columns__=np.array([str(c) for c in df.columns]), **arrays)
+    os.replace(tmp, path)
+    prune(cache_dir)
+    return path
+
+
+def prune(cache_dir=CACHE_DIR, keep=KEEP_ENTRIES):
+    """Delete all but the `keep` most recently written entries"""
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+               if name.endswith('.parquet') or name.endswith('.npz')]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,250 @@
+"""
+Feature Drift Monitoring
+Compares the patients the app scores with the data the model was trained on.
+
+train_model.py builds a FeatureProfile of the training rows and saves it as
+models/drift_reference.json next to the model. The app keeps a live
+FeatureProfile of every valid row it scores. A profile holds, per feature, a
+running count, mean and variance (Welford/Chan batch updates) and counts over
+fixed bins: ten equal-width bins across the schema range for numeric
+features, one bin per category code for categorical ones. Updating it costs a
+few vectorized operations per request, whatever the number of rows seen.
+
+/api/drift compares the two per feature with:
+- psi:        population stability index over the bins
+- ks:         largest gap between the binned cumulative distributions
+- mean_shift: live mean minus reference mean, in reference standard deviations
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from schema import FEATURE_SCHEMA
+
+REFERENCE_PATH = os.path.join('models', 'drift_reference.json')
+NUMERIC_BINS = 10
+# Added to every bin share so empty bins do not make PSI infinite
+EPSILON = 1e-4
+
+
+def bin_edges(schema=FEATURE_SCHEMA, bins=NUMERIC_BINS):
+    """Interior bin edges per feature: equal-width over [min, max], or between category codes"""
+    edges = []
+    for feature in schema:
+        if feature['dtype'] == 'category':
+            codes = sorted(feature['choices'])
+            edges.append([(a + b) / 2 for a, b in zip(codes, codes[1:])])
+        else:
+            edges.append(np.linspace(feature['min'], feature['max'], bins + 1)[1:-1].tolist())
+    return edges
+
+
+class FeatureProfile:
+    """Running per-feature moments and fixed-bin counts of an (N, n_features) stream"""
+
+    def __init__(self, schema=FEATURE_SCHEMA, bins=NUMERIC_BINS):
+        self.names = [f['name'] for f in schema]
+        self.edges = bin_edges(schema, bins)
+        self.n_bins = np.array([len(e) + 1 for e in self.edges])
+        # Edges padded with +inf to one (n_features, max_edges) matrix, so a
+        # row's bins for every feature come from a single comparison
+        width = max(len(e) for e in self.edges)
+        self._edges = np.full((len(self.edges), width), np.inf)
+        for j, e in enumerate(self.edges):
+            self._edges[j, :len(e)] = e
+        self._offsets = np.arange(len(self.edges)) * (width + 1)
+
+        self.count = 0
+        self.mean = np.zeros(len(self.names))
+        self.m2 = np.zeros(len(self.names))
+        self.counts = np.zeros((len(self.names), width + 1), dtype=np.int64)
+
+    def update(self, features):
+        """Add a batch of rows: Chan's parallel update of the moments plus bin counts"""
+        features = np.asarray(features, dtype=np.float64)
+        k = len(features)
+        if not k:
+            return
+        total = self.count + k
+        if k == 1:
+            # Single /predict rows: plain Welford step, no batch reductions
+            delta = features[0] - self.mean
+            self.mean += delta / total
+            self.m2 += delta * (features[0] - self.mean)
+        else:
+            batch_mean = features.mean(axis=0)
+            batch_m2 = ((features - batch_mean) ** 2).sum(axis=0)
+            delta = batch_mean - self.mean
+            self.mean += delta * (k / total)
+            self.m2 += batch_m2 + delta ** 2 * (self.count * k / total)
+        self.count = total
+
+        bins = (features[:, :, None] >= self._edges).sum(axis=2) + self._offsets
+        flat = self.counts.reshape(-1)
+        if k == 1:
+            # One bin per feature, so the indices are distinct
+            flat[bins[0]] += 1
+        else:
+            flat += np.bincount(bins.ravel(), minlength=flat.size)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros(len(self.names))
+
+    def distribution(self, j):
+        """Smoothed bin shares of feature j"""
+        counts = self.counts[j, :self.n_bins[j]]
+        return (counts + EPSILON) / (counts.sum() + EPSILON * len(counts))
+
+    def to_dict(self):
+        return {
+            'count': int(self.count),
+            'features': {
+                name: {
+                    'mean': float(self.mean[j]),
+                    'std': float(self.std[j]),
+                    'edges': self.edges[j],
+                    'counts': self.counts[j, :self.n_bins[j]].tolist(),
+                }
+                for j, name in enumerate(self.names)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data, schema=FEATURE_SCHEMA):
+        profile = cls(schema)
+        for j, name in enumerate(profile.names):
+            feature = data['features'][name]
+            if feature['edges'] != profile.edges[j]:
+                raise ValueError(f'Reference bins for {name} do not match the schema')
+            profile.mean[j] = feature['mean']
+            profile.m2[j] = feature['std'] ** 2 * data['count']
+            profile.counts[j, :len(feature['counts'])] = feature['counts']
+        profile.count = data['count']
+        return profile
+
+
+def save_reference(profile, path=REFERENCE_PATH, metadata=None):
+    """Write a training profile as the drift reference"""
+    data = dict(profile.to_dict(), created=time.strftime('%Y-%m-%dT%H:%M:%S'), **(metadata or {}))
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+    return data
+
+
+def load_reference(path=REFERENCE_PATH):
+    """(FeatureProfile, metadata with a content id) or (None, None) without a reference file"""
+    if not os.path.exists(path):
+        return None, None
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+    metadata = {k: v for k, v in data.items() if k not in ('count', 'features')}
+    metadata['id'] = hashlib.sha256(raw).hexdigest()[:16]
+    return FeatureProfile.from_dict(data), metadata
+
+
+def psi(live, reference):
+    return float(np.sum((live - reference) * np.log(live / reference)))
+
+
+def ks(live, reference):
+    return float(np.max(np.abs(np.cumsum(live) - np.cumsum(reference))))
+
+
+class DriftMonitor:
+    """Live FeatureProfile of scored rows, compared against the training reference"""
+
+    def __init__(self, models_dir='models', min_rows=100, psi_warn=0.1, psi_alert=0.25):
+        self.path = os.path.join(models_dir, os.path.basename(REFERENCE_PATH))
+        self.min_rows = min_rows
+        self.psi_warn = psi_warn
+        self.psi_alert = psi_alert
+        self.reference = None
+        self.reference_info = None
+        self.live = FeatureProfile()
+        self.since = time.time()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        (Re)load the reference. Live statistics restart only when the
+        reference itself changed (a retrain), not when the same training data
+        backs a new model version (e.g. an online-learning promotion).
+        """
+        reference, info = load_reference(self.path)
+        with self._lock:
+            changed = (info or {}).get('id') != (self.reference_info or {}).get('id')
+            self.reference, self.reference_info = reference, info
+            if changed:
+                self.live = FeatureProfile()
+                self.since = time.time()
+        return reference is not None
+
+    def update(self, features):
+        """Add validated (N, 13) rows that were scored"""
+        with self._lock:
+            self.live.update(features)
+
+    def reset(self):
+        with self._lock:
+            self.live = FeatureProfile()
+            self.since = time.time()
+
+    def report(self):
+        """Per-feature drift scores against the reference (JSON-serialisable)"""
+        with self._lock:
+            reference, live = self.reference, self.live
+            if reference is None:
+                return {'available': False, 'error': f'No drift reference at {self.path}; retrain the model'}
+            live_mean, live_std = live.mean.copy(), live.std
+            live_shares = [live.distribution(j) for j in range(len(live.names))]
+            rows = live.count
+
+        features = {}
+        for j, name in enumerate(reference.names):
+            expected = reference.distribution(j)
+            score = psi(live_shares[j], expected)
+            ref_std = reference.std[j]
+            features[name] = {
+                'psi': score,
+                'ks': ks(live_shares[j], expected),
+                'mean': float(live_mean[j]),
+                'std': float(live_std[j]),
+                'reference_mean': float(reference.mean[j]),
+                'reference_std': float(ref_std),
+                'mean_shift': float((live_mean[j] - reference.mean[j]) / ref_std) if ref_std > 0 else 0.0,
+                'status': self._status(score, rows),
+            }
+
+        drifting = sorted((n for n, f in features.items() if f['status'] in ('warn', 'alert')),
+                          key=lambda n: -features[n]['psi'])
+        statuses = {f['status'] for f in features.values()}
+        overall = next((s for s in ('insufficient_data', 'alert', 'warn') if s in statuses), 'ok')
+        return {
+            'available': True,
+            'status': overall,
+            'rows': int(rows),
+            'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.since)),
+            'min_rows': self.min_rows,
+            'thresholds': {'psi_warn': self.psi_warn, 'psi_alert': self.psi_alert},
+            'reference': dict(self.reference_info, rows=int(reference.count)),
+            'drifting_features': drifting,
+            'features': features,
+        }
+
+    def _status(self, score, rows):
+        if rows < self.min_rows:
+            return 'insufficient_data'
+        if score >= self.psi_alert:
+            return 'alert'
+        if score >= self.psi_warn:
+            return 'warn'
+        return 'ok'
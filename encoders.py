@@ -0,0 +1,184 @@
+"""
+Response Encoders
+Pluggable request/response encodings for the prediction API.
+
+- FastJSONProvider replaces Flask's JSON provider with orjson when it is
+  installed, so every jsonify() and request.get_json() call uses it.
+- Batch clients can negotiate MessagePack or Arrow IPC (stream or file
+  format) with the Accept header and send their records in the same formats. Results can be returned
+  column-oriented (one array per field), which the binary formats encode
+  straight from NumPy arrays instead of building a Python dict per row.
+
+msgpack and pyarrow are optional; a format is only offered when its library
+is installed. Both are imported on first use, not at startup, since only
+batch requests in those formats need them.
+"""
+
+import importlib.util
+import json
+
+from flask.json.provider import DefaultJSONProvider
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_MSGPACK = importlib.util.find_spec('msgpack') is not None
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+ARROW_FILE = 'application/vnd.apache.arrow.file'
+ARROW_FORMATS = (ARROW, ARROW_FILE)
+
+# Alternative spellings clients send for the same formats
+ALIASES = {
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.msgpack': MSGPACK,
+}
+
+
+def available_formats():
+    """Mimetypes this process can encode and decode, JSON first"""
+    formats = [JSON]
+    if HAS_MSGPACK:
+        formats.append(MSGPACK)
+    if HAS_PYARROW:
+        formats.extend(ARROW_FORMATS)
+    return formats
+
+
+def _msgpack():
+    import msgpack
+    return msgpack
+
+
+def _pyarrow():
+    import pyarrow
+    return pyarrow
+
+
+def dumps(obj):
+    """Compact JSON bytes, via orjson when installed (for code outside Flask)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def loads(s):
+    """Parse JSON from str or bytes, via orjson when installed"""
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (falls back to the stdlib without it)"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj, indent=kwargs.get('indent')).decode('utf-8')
+
+    def _dumps_bytes(self, obj, indent=None):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def negotiate(accept_mimetypes):
+    """Best response format for a request's Accept header (JSON by default)"""
+    formats = available_formats()
+    best = accept_mimetypes.best_match(formats + list(ALIASES), default=JSON)
+    best = ALIASES.get(best, best)
+    return best if best in formats else JSON
+
+
+def request_format(mimetype):
+    """Format of a request body from its Content-Type, or None if unsupported"""
+    mimetype = ALIASES.get(mimetype, mimetype)
+    if mimetype in ('', JSON):
+        return JSON
+    return mimetype if mimetype in available_formats() else None
+
+
+def decode_body(body, fmt, json_provider):
+    """
+    Decode a batch request body. Returns ('records', list) for row-oriented
+    payloads (a list, or {"records": [...]}) and ('columns', dict) for
+    column-oriented ones ({"columns": {name: [values]}} or an Arrow table).
+    Raises ValueError if the body is not valid `fmt`.
+    """
+    try:
+        if fmt in ARROW_FORMATS:
+            pa = _pyarrow()
+            reader = pa.ipc.open_stream(body) if fmt == ARROW else pa.ipc.open_file(pa.py_buffer(body))
+            table = reader.read_all()
+            return 'columns', {name: table.column(name).to_numpy(zero_copy_only=False)
+                               for name in table.column_names}
+        data = _msgpack().unpackb(body) if fmt == MSGPACK else json_provider.loads(body)
+    except Exception as e:
+        raise ValueError(f'Could not decode {fmt} body: {e}') from e
+
+    if isinstance(data, dict) and isinstance(data.get('columns'), dict):
+        return 'columns', data['columns']
+    records = data.get('records') if isinstance(data, dict) else data
+    return 'records', records
+
+
+def _plain(value, nan_to_null=False):
+    """NumPy arrays to lists for encoders without NumPy support"""
+    if isinstance(value, np.ndarray):
+        if nan_to_null and value.dtype.kind == 'f':
+            return [None if v != v else v for v in value.tolist()]
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _plain(v, nan_to_null) for k, v in value.items()}
+    return value
+
+
+def encode(payload, fmt, json_provider):
+    """
+    Encode a response payload (which may hold NumPy arrays under 'columns')
+    as bytes in `fmt`. Arrow carries 'columns' as the table and every other
+    key as schema metadata.
+    """
+    if fmt in ARROW_FORMATS:
+        pa = _pyarrow()
+        columns = payload.get('columns', {})
+        metadata = {key: json_provider.dumps(value) for key, value in payload.items() if key != 'columns'}
+        table = pa.table({name: pa.array(values) for name, values in columns.items()}, metadata=metadata)
+        sink = pa.BufferOutputStream()
+        new_writer = pa.ipc.new_stream if fmt == ARROW else pa.ipc.new_file
+        with new_writer(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if fmt == MSGPACK:
+        return _msgpack().packb(_plain(payload))
+    if orjson is not None and isinstance(json_provider, FastJSONProvider):
+        # orjson writes numeric/bool arrays natively (NaN as null); only
+        # object arrays such as the message columns need converting
+        columns = payload.get('columns')
+        if columns is not None:
+            payload = dict(payload, columns={
+                name: values.tolist() if getattr(values, 'dtype', None) == object else values
+                for name, values in columns.items()
+            })
+        return json_provider._dumps_bytes(payload)
+    return json_provider.dumps(_plain(payload, nan_to_null=True)).encode('utf-8')
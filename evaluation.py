@@ -0,0 +1,143 @@
+"""
+Bootstrap Model Evaluation
+Confidence intervals for the test-set metrics reported by train_model.py.
+
+A single accuracy from a test split of a few dozen patients says little on
+its own, so the test rows are resampled with replacement thousands of times
+and accuracy, ROC-AUC, precision and recall are recomputed on every
+resample. The interval is the percentile range of those values.
+
+Resamples are drawn as (resamples, n_test) index matrices and all metrics
+of a block are computed at once with NumPy: confusion counts by summing
+along rows, and ROC-AUC from the Mann-Whitney rank sum, with per-resample
+counts of each distinct score obtained from a single bincount. Blocks are
+sized so an index matrix stays around MAX_BLOCK_ELEMENTS entries. Resamples
+are split into shards of SHARD_RESAMPLES with their own seeds, which can be
+scored in parallel processes (n_jobs) and give the same result for any
+number of jobs.
+"""
+
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+EVALUATION_PATH = os.path.join('models', 'evaluation_report.json')
+METRICS = ('accuracy', 'roc_auc', 'precision', 'recall')
+SHARD_RESAMPLES = 500
+MAX_BLOCK_ELEMENTS = 4 * 1024 * 1024
+
+
+def batch_metrics(y_true, y_pred, ranks, n_ranks, idx):
+    """
+    (B, 4) array of METRICS for each row of a (B, n) index matrix into the
+    test set. `ranks` are the dense ranks of the test scores (0..n_ranks-1).
+    Metrics that are undefined for a resample (e.g. AUC without both
+    classes) are NaN.
+    """
+    blocks, n = idx.shape
+    truth = y_true[idx]
+    predicted = y_pred[idx]
+    positives = truth.sum(axis=1)
+    predicted_positives = predicted.sum(axis=1)
+    true_positives = (truth & predicted).sum(axis=1)
+    correct = (truth == predicted).sum(axis=1)
+
+    # Rows per (resample, distinct score), and how many of them are positive
+    cells = (np.arange(blocks)[:, None] * n_ranks + ranks[idx]).ravel()
+    counts = np.bincount(cells, minlength=blocks * n_ranks).reshape(blocks, n_ranks)
+    positive_counts = np.bincount(cells, weights=truth.ravel(),
+                                  minlength=blocks * n_ranks).reshape(blocks, n_ranks)
+    # Tied scores share the mean of the ranks they occupy
+    midranks = np.cumsum(counts, axis=1) - (counts - 1) / 2
+    rank_sum = (positive_counts * midranks).sum(axis=1)
+    pairs = positives * (n - positives)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        auc = np.where(pairs > 0, (rank_sum - positives * (positives + 1) / 2) / pairs, np.nan)
+        precision = np.where(predicted_positives > 0, true_positives / predicted_positives, np.nan)
+        recall = np.where(positives > 0, true_positives / positives, np.nan)
+    return np.column_stack([correct / n, auc, precision, recall])
+
+
+def _bootstrap_shard(y_true, y_pred, ranks, n_ranks, n_resamples, seed):
+    """Metrics of `n_resamples` resamples drawn from `seed`, one index block at a time"""
+    rng = np.random.default_rng(seed)
+    n = len(y_true)
+    block = max(1, MAX_BLOCK_ELEMENTS // n)
+    results = []
+    for start in range(0, n_resamples, block):
+        idx = rng.integers(0, n, size=(min(block, n_resamples - start), n))
+        results.append(batch_metrics(y_true, y_pred, ranks, n_ranks, idx))
+    return np.concatenate(results)
+
+
+def _finite(value):
+    """float, or None for NaN/inf so reports stay valid JSON"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def bootstrap(y_true, y_score, threshold=0.5, n_resamples=2000, confidence=0.95, seed=42, n_jobs=1):
+    """
+    Point estimates and percentile bootstrap intervals of METRICS for
+    binary labels and disease probabilities (class 1 when score >= threshold).
+    Returns a JSON-serialisable report; values that are undefined (e.g. AUC
+    of a one-class test set) are None.
+    """
+    start = time.perf_counter()
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    y_pred = y_score >= threshold
+    n = len(y_true)
+    _, ranks = np.unique(y_score, return_inverse=True)
+    n_ranks = int(ranks.max()) + 1 if n else 0
+
+    estimates = batch_metrics(y_true, y_pred, ranks, n_ranks, np.arange(n)[None])[0]
+
+    shard_sizes = [min(SHARD_RESAMPLES, n_resamples - s) for s in range(0, n_resamples, SHARD_RESAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+    if n_jobs == 1 or len(shard_sizes) == 1:
+        shards = [_bootstrap_shard(y_true, y_pred, ranks, n_ranks, size, s) for size, s in zip(shard_sizes, seeds)]
+    else:
+        shards = Parallel(n_jobs=n_jobs)(
+            delayed(_bootstrap_shard)(y_true, y_pred, ranks, n_ranks, size, s)
+            for size, s in zip(shard_sizes, seeds)
+        )
+    samples = np.concatenate(shards) if shards else np.empty((0, len(METRICS)))
+
+    tail = (1 - confidence) / 2 * 100
+    metrics = {}
+    for j, name in enumerate(METRICS):
+        values = samples[:, j][~np.isnan(samples[:, j])]
+        lower, upper = np.percentile(values, [tail, 100 - tail]) if len(values) else (np.nan, np.nan)
+        metrics[name] = {
+            'estimate': _finite(estimates[j]),
+            'lower': _finite(lower),
+            'upper': _finite(upper),
+            'std': _finite(values.std()) if len(values) else None,
+            'undefined_resamples': int(len(samples) - len(values)),
+        }
+    return {
+        'method': 'percentile bootstrap',
+        'n_test': int(n),
+        'n_resamples': int(n_resamples),
+        'confidence': confidence,
+        'threshold': threshold,
+        'seed': seed,
+        'metrics': metrics,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def format_report(report):
+    """Printable table of a bootstrap() report"""
+    level = f"{report['confidence']:.0%} CI"
+    lines = [f"{'metric':<11}{'estimate':>10}   {level}"]
+    for name, m in report['metrics'].items():
+        estimate, lower, upper = (f'{m[k]:.4f}' if m[k] is not None else 'n/a' for k in ('estimate', 'lower', 'upper'))
+        lines.append(f"{name:<11}{estimate:>10}   [{lower}, {upper}]")
+    lines.append(f"({report['n_resamples']} resamples of {report['n_test']} test rows, "
+                 f"{report['seconds']:.2f}s)")
+    return '\n'.join(lines)
@@ -0,0 +1,44 @@
+"""
+Gunicorn Server Configuration
+Picked up automatically by `gunicorn` from the working directory. Worker
+count, threads, worker class, bind address and timeout come from the
+SERVER_* settings in config.py, so they can be changed with environment
+variables or with the server.env file written by `python loadtest.py
+--write-env` (variables already set in the environment take precedence).
+"""
+
+import os
+import sys
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+ENV_FILE = os.environ.get('SERVER_ENV_FILE', 'server.env')
+if ENV_FILE and os.path.exists(ENV_FILE):
+    if load_dotenv is not None:
+        load_dotenv(ENV_FILE, override=False)
+    else:
+        print(f"python-dotenv not installed; ignoring {ENV_FILE}")
+
+from config import Config  # noqa: E402 - must see the variables loaded above
+
+WORKER_CLASSES = {
+    'sync': ('sync', 'app:app'),
+    'gthread': ('gthread', 'app:app'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'asgi_app:app'),
+}
+
+worker_class, wsgi_app = WORKER_CLASSES[Config.SERVER_WORKER_CLASS]
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS
+threads = Config.SERVER_THREADS if Config.SERVER_WORKER_CLASS == 'gthread' else 1
+timeout = Config.SERVER_TIMEOUT
+
+
+def worker_exit(server, worker):
+    """Write queued audit rows and stop background threads before the worker exits"""
+    app_module = sys.modules.get('app')
+    if app_module is not None and hasattr(app_module, 'shutdown'):
+        app_module.shutdown()
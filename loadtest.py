@@ -0,0 +1,303 @@
+"""
+Heart Disease Prediction Load Test
+Measures which gunicorn topology this app needs. For every combination of
+worker class, worker count and thread count it launches the app on a local
+port through gunicorn.conf.py, waits for /readyz, then drives each endpoint
+with concurrent keep-alive clients for a fixed time:
+
+- predict:    single-record POST /predict, cycling through distinct synthetic patients
+- batch_N:    POST /predict/batch with N records (not served by the uvicorn
+              worker, which only runs asgi_app.py's /predict)
+
+It prints throughput and p50/p95/p99 latency per topology and endpoint,
+recommends the topology with the highest /predict throughput whose p99 stays
+within --max-p99-ms (fewest workers and threads on ties) among those that
+served every endpoint, and can write that recommendation as SERVER_*
+variables for gunicorn.conf.py. Sweep only `--classes uvicorn` to choose a
+setting for the async /predict-only deployment.
+
+The prediction cache is disabled in the launched servers so every request is
+scored. The load generator runs on the same machine and competes with the
+server for CPU, so compare topologies with each other rather than reading
+the numbers as capacity figures.
+
+Usage:
+    python loadtest.py
+    python loadtest.py --workers 1 2 4 --threads 1 4 8 --classes sync gthread uvicorn
+    python loadtest.py --duration 20 --concurrency 32 --write-env server.env
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks import synthetic_records
+
+DEFAULT_WORKERS = sorted({1, 2, os.cpu_count() or 1, 2 * (os.cpu_count() or 1) + 1})
+DEFAULT_THREADS = (1, 4)
+DEFAULT_CLASSES = ('sync', 'gthread', 'uvicorn')
+BATCH_SIZE = 100
+READY_TIMEOUT = 60
+
+
+def topologies(worker_counts, thread_counts, worker_classes):
+    """(worker_class, workers, threads) combinations; threads only vary for gthread"""
+    combos = []
+    for worker_class, workers in itertools.product(worker_classes, worker_counts):
+        for threads in (thread_counts if worker_class == 'gthread' else (1,)):
+            combos.append((worker_class, workers, threads))
+    return combos
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def launch(worker_class, workers, threads, port):
+    """Start gunicorn with this topology and wait until /readyz answers 200"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(
+        os.environ,
+        SERVER_WORKER_CLASS=worker_class,
+        SERVER_WORKERS=str(workers),
+        SERVER_THREADS=str(threads),
+        SERVER_BIND=f'127.0.0.1:{port}',
+        SERVER_ENV_FILE='',  # measure exactly this topology, not a saved one
+        PREDICTION_CACHE_SIZE='0',
+        FLASK_ENV='production',
+    )
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+                              cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with code {server.returncode}')
+        try:
+            status, _ = request(port, 'GET', '/readyz')
+            if status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    stop(server)
+    raise RuntimeError(f'server not ready after {READY_TIMEOUT}s')
+
+
+def stop(server):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def request(port, method, path, body=None, connection=None):
+    """One HTTP request; returns (status, body bytes)"""
+    conn = connection or http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    if connection is None:
+        conn.close()
+    return response.status, data
+
+
+def drive(port, path, bodies, concurrency, duration, rows_per_request=1):
+    """
+    Send POSTs to `path` from `concurrency` threads for `duration` seconds,
+    each thread reusing one connection and cycling through `bodies`.
+    Returns requests, errors, throughput and latency percentiles.
+    """
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def client(k):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        position = k
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            body = bodies[position % len(bodies)]
+            position += concurrency
+            started = time.perf_counter()
+            try:
+                status, _ = request(port, 'POST', path, body, connection=conn)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status = None
+            elapsed = time.perf_counter() - started
+            if status == 200:
+                latencies[k].append(elapsed)
+            else:
+                errors[k] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,), daemon=True) for k in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.perf_counter() + duration
+    started = time.perf_counter()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    samples = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    completed = len(samples)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if completed else (np.nan,) * 3
+    return {
+        'requests': completed,
+        'errors': sum(errors),
+        'requests_per_second': completed / wall,
+        'rows_per_second': completed * rows_per_request / wall,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+    }
+
+
+def run_sweep(combos, duration=10, concurrency=16, batch_size=BATCH_SIZE, verbose=True):
+    """Launch each topology and load-test its endpoints; returns one row per (topology, endpoint)"""
+    records = synthetic_records(5000)
+    single = [json.dumps(record).encode('utf-8') for record in records]
+    batches = [json.dumps(records[i:i + batch_size]).encode('utf-8')
+               for i in range(0, len(records), batch_size)]
+
+    rows = []
+    for worker_class, workers, threads in combos:
+        topology = {'worker_class': worker_class, 'workers': workers, 'threads': threads}
+        if verbose:
+            print(f"Testing {worker_class} workers={workers} threads={threads}...", flush=True)
+        port = free_port()
+        try:
+            server = launch(worker_class, workers, threads, port)
+        except RuntimeError as e:
+            print(f"  skipped: {e}")
+            continue
+        try:
+            endpoints = [('predict', '/predict', single, 1)]
+            if worker_class != 'uvicorn':
+                endpoints.append((f'batch_{batch_size}', '/predict/batch', batches, batch_size))
+            for name, path, bodies, rows_per_request in endpoints:
+                # Short unrecorded run so lazy initialisation and connection setup are excluded
+                drive(port, path, bodies, concurrency, min(1.0, duration / 5), rows_per_request)
+                result = drive(port, path, bodies, concurrency, duration, rows_per_request)
+                rows.append(dict(topology, endpoint=name, **result))
+        finally:
+            stop(server)
+    return rows
+
+
+def recommend(rows, max_p99_ms=None, endpoint='predict'):
+    """
+    Topology with the highest `endpoint` throughput whose p99 is within
+    budget. Only topologies that served every endpoint in the sweep are
+    eligible, so the /predict-only uvicorn worker is not recommended when
+    the Flask endpoints were tested too.
+    """
+    def key(r):
+        return r['worker_class'], r['workers'], r['threads']
+
+    endpoints = {r['endpoint'] for r in rows}
+    served = {}
+    for r in rows:
+        served.setdefault(key(r), set()).add(r['endpoint'])
+    candidates = [r for r in rows if r['endpoint'] == endpoint and r['requests'] and not r['errors']
+                  and served[key(r)] == endpoints]
+    if max_p99_ms is not None:
+        within = [r for r in candidates if r['p99_ms'] <= max_p99_ms]
+        candidates = within or candidates
+    if not candidates:
+        return None
+    return max(candidates, key=lambda r: (r['requests_per_second'], -r['workers'], -r['threads']))
+
+
+def format_table(rows):
+    lines = [f"{'class':<9}{'workers':>8}{'threads':>8}  {'endpoint':<11}{'req/s':>9}{'rows/s':>10}"
+             f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"]
+    for r in rows:
+        lines.append(f"{r['worker_class']:<9}{r['workers']:>8}{r['threads']:>8}  {r['endpoint']:<11}"
+                     f"{r['requests_per_second']:>9.0f}{r['rows_per_second']:>10.0f}"
+                     f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['errors']:>8}")
+    return '\n'.join(lines)
+
+
+def env_lines(best):
+    return [
+        f"SERVER_WORKER_CLASS={best['worker_class']}",
+        f"SERVER_WORKERS={best['workers']}",
+        f"SERVER_THREADS={best['threads']}",
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test gunicorn worker/thread topologies')
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS, help='worker counts to try')
+    parser.add_argument('--threads', type=int, nargs='+', default=DEFAULT_THREADS, help='thread counts for gthread')
+    parser.add_argument('--classes', nargs='+', default=DEFAULT_CLASSES, choices=DEFAULT_CLASSES,
+                        help='worker classes to try')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per endpoint per topology')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent client connections')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='records per /predict/batch request')
+    parser.add_argument('--max-p99-ms', type=float, help='only recommend topologies with /predict p99 under this')
+    parser.add_argument('--output', help='also write the results to a JSON file')
+    parser.add_argument('--write-env', metavar='PATH', nargs='?', const='server.env',
+                        help='write the recommended SERVER_* settings for gunicorn.conf.py (default server.env)')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join('models', 'heart_disease_model.hdp')) and \
+            not os.path.exists(os.path.join('models', 'heart_disease_model.pkl')):
+        print("No trained model in models/; run python train_model.py first")
+        return 1
+
+    combos = topologies(args.workers, args.threads, args.classes)
+    rows = run_sweep(combos, args.duration, args.concurrency, args.batch_size)
+    print()
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'cpus': os.cpu_count(),
+                'duration': args.duration,
+                'concurrency': args.concurrency,
+                'results': rows,
+            }, f, indent=2)
+
+    best = recommend(rows, args.max_p99_ms)
+    if best is None:
+        print("\nNo topology completed without errors; nothing to recommend")
+        return 1
+    print(f"\nRecommended: {best['worker_class']} workers={best['workers']} threads={best['threads']} "
+          f"({best['requests_per_second']:.0f} req/s, p99 {best['p99_ms']:.2f} ms on /predict)")
+    if args.max_p99_ms is not None and best['p99_ms'] > args.max_p99_ms:
+        print(f"Note: no topology met p99 <= {args.max_p99_ms} ms; this is the fastest overall")
+
+    if args.write_env:
+        with open(args.write_env, 'w') as f:
+            f.write(f"# Written by loadtest.py on {time.strftime('%Y-%m-%d')} "
+                    f"({os.cpu_count()} CPUs, concurrency {args.concurrency})\n")
+            f.write('\n'.join(env_lines(best)) + '\n')
+        print(f"Wrote {args.write_env}; gunicorn.conf.py applies it on the next start")
+    else:
+        print('Set with: ' + ' '.join(env_lines(best)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
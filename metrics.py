@@ -0,0 +1,139 @@
+"""
+Prediction Metrics
+Lightweight in-process counters and latency histograms for the serving hot
+path, rendered in the Prometheus text exposition format at /metrics. A timed
+stage costs two perf_counter() calls, a bisect and a locked increment, so the
+instrumentation is cheap enough to leave on in production.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds; serving stages are typically microseconds
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+
+def _format_labels(labelnames, labelvalues, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, labelvalues)} {value}')
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labelvalues -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labelvalues):
+        series = self._series.get(labelvalues)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labelvalues, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    labels = _format_labels(self.labelnames, labelvalues, f'le="{le}"')
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f'{self.name}_sum{labels} {total}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request:
+
+        timer = StageTimer('predict')
+        ...parse...
+        timer.mark('parse')
+        ...validate...
+        timer.mark('validate')
+
+    Each mark() records the time since the previous mark (or creation).
+    """
+
+    __slots__ = ('endpoint', '_last')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self._last, self.endpoint, stage)
+        self._last = now
+
+
+REQUESTS = Counter('heart_requests_total', 'HTTP requests handled', ('endpoint', 'status'))
+ERRORS = Counter('heart_request_errors_total', 'Requests that failed with a server error', ('endpoint',))
+VALIDATION_FAILURES = Counter('heart_validation_failures_total', 'Rows rejected by input validation', ('endpoint',))
+ROWS_SCORED = Counter('heart_rows_scored_total', 'Patient rows scored by the model', ('endpoint',))
+REQUEST_SECONDS = Histogram('heart_request_duration_seconds', 'End-to-end request latency', ('endpoint',))
+STAGE_SECONDS = Histogram('heart_stage_duration_seconds', 'Latency of each prediction stage', ('endpoint', 'stage'))
+SHADOW_SCORE_SECONDS = Histogram('heart_shadow_score_duration_seconds', 'Shadow model latency per scored batch',
+                                 ('model',))
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+ALL_METRICS = [REQUESTS, ERRORS, VALIDATION_FAILURES, ROWS_SCORED, REQUEST_SECONDS, STAGE_SECONDS, SHADOW_SCORE_SECONDS]
+
+
+def render(extra_lines=()):
+    """Prometheus text exposition of every metric"""
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
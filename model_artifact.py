@@ -0,0 +1,189 @@
+"""
+Heart Disease Model Artifact
+One versioned binary file replacing the three pickles for serving. The file
+holds a JSON header (format version, model version, feature order, schema
+hash, training metadata, array layout, checksum) followed by the numeric
+parameters as flat, 64-byte aligned float64 arrays. Loading memory-maps the
+array block, so no sklearn objects are unpickled and every worker process
+shares the same page-cache pages.
+
+Layout:
+    8 bytes   magic  b'HDPMODEL'
+    4 bytes   format version (uint32, little endian)
+    4 bytes   header length  (uint32, little endian)
+    N bytes   header JSON (utf-8)
+    padding   up to the next 64-byte boundary
+    arrays    float64 arrays at the offsets recorded in the header
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import struct
+import time
+
+import numpy as np
+
+from schema import FEATURE_NAMES, schema_hash
+from scorer import LinearScorer
+
+ARTIFACT_PATH = 'models/heart_disease_model.hdp'
+MAGIC = b'HDPMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Legacy pickles written by earlier versions of train_model.py
+MODEL_PATH = 'models/heart_disease_model.pkl'
+SCALER_PATH = 'models/scaler.pkl'
+FEATURES_PATH = 'models/feature_names.pkl'
+
+
+class ModelArtifact:
+    """A loaded model: the fused scorer plus its header information"""
+
+    def __init__(self, scorer, feature_names, version, metadata=None, arrays=None, path=None):
+        self.scorer = scorer
+        self.feature_names = list(feature_names)
+        self.version = version
+        self.metadata = metadata or {}
+        self.arrays = arrays or {}
+        self.path = path
+
+    def info(self):
+        """JSON-serialisable summary for /api/info"""
+        return {
+            'model_version': self.version,
+            'artifact': self.path,
+            'metadata': self.metadata,
+        }
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_artifact(path, model, scaler, feature_names, metadata=None):
+    """
+    Write a fitted StandardScaler + LogisticRegression as a model artifact.
+    The fused scorer is checked against sklearn before anything is written,
+    and the file is written to a temporary name and renamed into place so
+    readers never see a partial artifact. Returns the model version string.
+    """
+    scorer = LinearScorer.from_sklearn(model, scaler)
+    scorer.verify(model, scaler)
+
+    n_features = len(feature_names)
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    arrays = {
+        'coef': np.asarray(model.coef_, dtype=np.float64).reshape(-1),
+        'intercept': np.asarray(model.intercept_, dtype=np.float64).reshape(-1),
+        'mean': np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64),
+        'scale': np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64),
+        'classes': np.asarray(model.classes_, dtype=np.float64),
+        # Fused parameters, so the loader can score straight from the mapping
+        'weights': scorer.weights,
+        'bias': np.array([scorer.bias]),
+    }
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = {'offset': offset, 'shape': list(array.shape)}
+        offset += array.nbytes
+    block = bytearray(_align(offset))
+    for name, array in arrays.items():
+        start = layout[name]['offset']
+        block[start:start + array.nbytes] = array.tobytes()
+
+    version = time.strftime('%Y%m%d%H%M%S') + '-' + scorer.fingerprint()
+    header = {
+        'format_version': FORMAT_VERSION,
+        'model_version': version,
+        'model_type': 'standard_scaler+logistic_regression',
+        'feature_names': list(feature_names),
+        'schema_hash': schema_hash(),
+        'metadata': metadata or {},
+        'arrays': layout,
+        'data_bytes': len(block),
+        'checksum': hashlib.sha256(block).hexdigest(),
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    prefix = MAGIC + struct.pack('<II', FORMAT_VERSION, len(header_bytes)) + header_bytes
+    padding = b'\0' * (_align(len(prefix)) - len(prefix))
+
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix + padding)
+        f.write(block)
+    os.replace(tmp_path, path)
+    return version
+
+
+def read_header(path):
+    """Read and check an artifact header; returns (header, data_offset)"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a heart disease model artifact')
+        format_version, header_len = struct.unpack('<II', f.read(8))
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported artifact format version {format_version} (expected {FORMAT_VERSION})')
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    return header, _align(len(MAGIC) + 8 + header_len)
+
+
+def load_artifact(path=ARTIFACT_PATH, verify_checksum=True):
+    """
+    Memory-map a model artifact and validate it against the current schema.
+    Raises ValueError if the file is corrupt or was trained for a different
+    feature layout.
+    """
+    header, data_offset = read_header(path)
+
+    if header['schema_hash'] != schema_hash() or header['feature_names'] != FEATURE_NAMES:
+        raise ValueError(f'Model artifact {path} was trained for a different feature schema')
+
+    data = np.memmap(path, dtype=np.uint8, mode='r', offset=data_offset, shape=(header['data_bytes'],))
+    if verify_checksum and hashlib.sha256(data).hexdigest() != header['checksum']:
+        raise ValueError(f'Model artifact {path} failed its checksum')
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        count = int(np.prod(spec['shape']))
+        arrays[name] = np.frombuffer(data, dtype=np.float64, count=count,
+                                     offset=spec['offset']).reshape(spec['shape'])
+
+    scorer = LinearScorer(arrays['weights'], arrays['bias'][0], arrays['classes'].astype(int), center=arrays['mean'])
+    return ModelArtifact(scorer, header['feature_names'], header['model_version'],
+                         header['metadata'], arrays, path)
+
+
+def load_pickles(model_path=MODEL_PATH, scaler_path=SCALER_PATH, features_path=FEATURES_PATH):
+    """Compile the legacy pickled scaler and model into a ModelArtifact"""
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    with open(scaler_path, 'rb') as f:
+        scaler = pickle.load(f)
+    with open(features_path, 'rb') as f:
+        feature_names = pickle.load(f)
+    scorer = LinearScorer.from_sklearn(model, scaler)
+    scorer.verify(model, scaler)
+    return ModelArtifact(scorer, feature_names, 'pickle-' + scorer.fingerprint(), path=model_path)
+
+
+def load_model(models_dir='models'):
+    """
+    Load the serving model from models_dir: the artifact if present,
+    otherwise the legacy pickles (for models trained before the artifact).
+    """
+    artifact_path = os.path.join(models_dir, os.path.basename(ARTIFACT_PATH))
+    if os.path.exists(artifact_path):
+        return load_artifact(artifact_path)
+    return load_pickles(
+        os.path.join(models_dir, os.path.basename(MODEL_PATH)),
+        os.path.join(models_dir, os.path.basename(SCALER_PATH)),
+        os.path.join(models_dir, os.path.basename(FEATURES_PATH)),
+    )
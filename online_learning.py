@@ -0,0 +1,308 @@
+"""
+Online Learning From Feedback
+Labeled records posted to /feedback are buffered and used to update a
+candidate model incrementally, without a full retrain. The candidate starts
+from the model being served: a StandardScaler and an SGD logistic regression
+initialised with the served mean, scale and coefficients, both updated with
+partial_fit in small batches.
+
+A fixed share of the feedback is held out and never trained on. After each
+round of updates the candidate and the served model are scored on that
+holdout, and the candidate is only promoted (written as a new model artifact
+and swapped in through the registry) if its log loss is lower and its
+accuracy has not dropped by more than the configured tolerance.
+"""
+
+import os
+import threading
+import time
+import warnings
+from collections import deque
+
+import numpy as np
+
+from model_artifact import ARTIFACT_PATH, read_header, save_artifact
+from schema import FEATURE_NAMES
+from scorer import LinearScorer
+
+EPSILON = 1e-12
+
+
+def log_loss(labels, probabilities):
+    p = np.clip(probabilities, EPSILON, 1 - EPSILON)
+    return float(-np.mean(labels * np.log(p) + (1 - labels) * np.log(1 - p)))
+
+
+class OnlineLearner:
+    """Feedback buffer, incremental candidate model and holdout-gated promotion"""
+
+    def __init__(self, registry, models_dir='models', batch_size=64, buffer_size=10000,
+                 holdout_fraction=0.2, holdout_size=2000, min_holdout=50,
+                 max_accuracy_drop=0.0, learning_rate=0.01, alpha=0.0001, prior_samples=1000):
+        self.registry = registry
+        self.models_dir = models_dir
+        self.batch_size = batch_size
+        self.holdout_fraction = holdout_fraction
+        self.min_holdout = min_holdout
+        self.max_accuracy_drop = max_accuracy_drop
+        self.learning_rate = learning_rate
+        self.alpha = alpha
+        self.prior_samples = prior_samples
+
+        self._pending = deque(maxlen=buffer_size)
+        self._holdout = deque(maxlen=holdout_size)
+        self._buffer_lock = threading.Lock()
+        # Never taken by the registry's swap callback: promoting holds it while
+        # reloading, and the watcher runs callbacks holding the reload lock
+        self._train_lock = threading.Lock()
+        # Set when another model is swapped in; step() then restarts the candidate
+        self._base_replaced = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.scaler = None
+        self.model = None
+        self.base_version = None
+        self.promoted_version = None
+
+        self.received = 0
+        self.dropped = 0
+        self.trained_rows = 0
+        self.rows_since_promotion = 0
+        self.batches = 0
+        self.promotions = 0
+        self.rejections = 0
+        self.last_check = None
+        self.last_error = None
+
+        registry.on_swap(self._on_swap)
+
+    def submit(self, features, labels):
+        """
+        Buffer validated (N, 13) features with their 0/1 labels. Every
+        1/holdout_fraction-th record goes to the holdout set instead of the
+        training buffer. When the training buffer is full the oldest records
+        are dropped and counted.
+        """
+        with self._buffer_lock:
+            for row, label in zip(np.asarray(features, dtype=np.float64), labels):
+                self.received += 1
+                if int(self.received * self.holdout_fraction) > int((self.received - 1) * self.holdout_fraction):
+                    self._holdout.append((row, int(label)))
+                    continue
+                if len(self._pending) == self._pending.maxlen:
+                    self.dropped += 1
+                self._pending.append((row, int(label)))
+            ready = len(self._pending) >= self.batch_size
+        if ready:
+            self._wake.set()
+
+    def _drain(self):
+        with self._buffer_lock:
+            rows = list(self._pending)
+            self._pending.clear()
+        return rows
+
+    def _on_swap(self, artifact):
+        """A model we did not promote (e.g. a full retrain) replaces the candidate's base"""
+        if artifact.version != self.promoted_version:
+            self._base_replaced = True
+
+    def _start_candidate(self):
+        """Initialise scaler + SGD model from the model being served"""
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        current = self.registry.current
+        if current is None:
+            raise RuntimeError('No model loaded to learn from')
+        arrays = current.arrays
+        if 'coef' in arrays:
+            mean, scale = np.array(arrays['mean']), np.array(arrays['scale'])
+            coef, intercept = np.array(arrays['coef']), float(arrays['intercept'][0])
+        else:
+            # Legacy pickles only expose the fused raw-space weights
+            mean, scale = np.zeros(len(FEATURE_NAMES)), np.ones(len(FEATURE_NAMES))
+            coef, intercept = np.array(current.scorer.weights), float(current.scorer.bias)
+
+        scaler = StandardScaler()
+        scaler.mean_ = mean
+        scaler.scale_ = scale
+        scaler.var_ = scale ** 2
+        scaler.n_samples_seen_ = np.int64(current.metadata.get('n_train', self.prior_samples))
+        scaler.n_features_in_ = len(mean)
+
+        model = SGDClassifier(loss='log_loss', alpha=self.alpha, learning_rate='constant',
+                              eta0=self.learning_rate, random_state=42)
+        # partial_fit continues from existing coefficients instead of allocating new ones
+        model.coef_ = coef.reshape(1, -1)
+        model.intercept_ = np.array([intercept])
+
+        self.scaler, self.model = scaler, model
+        self.base_version = current.version
+        self.rows_since_promotion = 0
+        self._classes = np.array(current.scorer.classes, dtype=int)
+
+    def _update(self, X, y):
+        """One partial_fit step of the scaler, then the model"""
+        # Remember the candidate's function in raw feature space...
+        raw_weights = self.model.coef_[0] / self.scaler.scale_
+        raw_bias = self.model.intercept_[0] - raw_weights @ self.scaler.mean_
+
+        self.scaler.partial_fit(X)
+
+        # ...and re-express it in the updated scaling, so moving the scaler
+        # does not change predictions before the model sees the new batch
+        self.model.coef_ = (raw_weights * self.scaler.scale_).reshape(1, -1)
+        self.model.intercept_ = np.array([raw_bias + raw_weights @ self.scaler.mean_])
+
+        first_call = not hasattr(self.model, 'classes_')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            self.model.partial_fit(self.scaler.transform(X), y,
+                                   classes=self._classes if first_call else None)
+
+    def _holdout_arrays(self):
+        with self._buffer_lock:
+            rows = list(self._holdout)
+        if not rows:
+            return np.empty((0, len(FEATURE_NAMES))), np.empty(0, dtype=int)
+        return np.array([r for r, _ in rows]), np.array([l for _, l in rows])
+
+    def check(self):
+        """Score candidate and served model on the holdout; returns the comparison"""
+        X, y = self._holdout_arrays()
+        current = self.registry.current
+        candidate = LinearScorer.from_sklearn(self.model, self.scaler)
+        served_labels, served_proba = current.scorer.score(X)
+        candidate_labels, candidate_proba = candidate.score(X)
+        result = {
+            'holdout_rows': int(len(y)),
+            'served_version': current.version,
+            'served_log_loss': log_loss(y, served_proba[:, 1]),
+            'served_accuracy': float(np.mean(served_labels == y)),
+            'candidate_log_loss': log_loss(y, candidate_proba[:, 1]),
+            'candidate_accuracy': float(np.mean(candidate_labels == y)),
+        }
+        result['passed'] = (
+            result['candidate_log_loss'] < result['served_log_loss']
+            and result['candidate_accuracy'] >= result['served_accuracy'] - self.max_accuracy_drop
+        )
+        return result
+
+    def _promote(self, result):
+        """
+        Write the candidate as the served artifact and swap it in. Returns
+        False without writing if the served or on-disk model is no longer the
+        candidate's base, e.g. a retrain written but not yet reloaded.
+        """
+        path = os.path.join(self.models_dir, os.path.basename(ARTIFACT_PATH))
+        parent = self.registry.current
+        on_disk = read_header(path)[0]['model_version'] if os.path.exists(path) else None
+        if parent.version != self.base_version or on_disk not in (None, self.base_version):
+            return False
+        metadata = {
+            'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'algorithm': 'SGDClassifier (online, log_loss)',
+            'parent_version': parent.version,
+            'n_train': int(self.scaler.n_samples_seen_),
+            'feedback_rows': int(parent.metadata.get('feedback_rows', 0)) + self.rows_since_promotion,
+            'holdout_rows': result['holdout_rows'],
+            'holdout_log_loss': result['candidate_log_loss'],
+            'holdout_accuracy': result['candidate_accuracy'],
+        }
+        self.promoted_version = save_artifact(path, self.model, self.scaler, FEATURE_NAMES, metadata)
+        self.registry.reload(force=True)
+        self.base_version = self.promoted_version
+        self.rows_since_promotion = 0
+        self.promotions += 1
+        return True
+
+    def step(self):
+        """
+        Train on everything buffered (in batch_size chunks), then run the
+        holdout check and promote the candidate if it passes.
+        Returns the check result, or None if nothing was checked.
+        """
+        with self._train_lock:
+            rows = self._drain()
+            if not rows:
+                return None
+            try:
+                if self._base_replaced:
+                    self._base_replaced = False
+                    self.model = None
+                    self.scaler = None
+                if self.model is None:
+                    self._start_candidate()
+                X = np.array([r for r, _ in rows])
+                y = np.array([l for _, l in rows])
+                for start in range(0, len(y), self.batch_size):
+                    self._update(X[start:start + self.batch_size], y[start:start + self.batch_size])
+                    self.batches += 1
+                self.trained_rows += len(y)
+                self.rows_since_promotion += len(y)
+
+                if len(self._holdout) < self.min_holdout:
+                    return None
+                result = self.check()
+                # If the served model changed during this step, never overwrite it
+                # with a candidate trained from its predecessor
+                result['superseded'] = self._base_replaced
+                promote = result['passed'] and not result['superseded']
+                if promote and not self._promote(result):
+                    result['superseded'] = True
+                    promote = False
+                if not promote:
+                    self.rejections += 1
+                result['promoted'] = promote
+                result['checked_at'] = time.time()
+                self.last_check = result
+                self.last_error = None
+                return result
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+    def start(self, interval):
+        """Run step() whenever a batch is ready, or every `interval` seconds"""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                try:
+                    result = self.step()
+                    if result and result['promoted']:
+                        print(f"Online learning promoted model {self.promoted_version}")
+                except Exception as e:
+                    print(f"Online learning step failed: {e}")
+
+        self._thread = threading.Thread(target=run, name='online-learner', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self):
+        """JSON-serialisable learner state for /api/info"""
+        return {
+            'received': self.received,
+            'pending': len(self._pending),
+            'holdout': len(self._holdout),
+            'dropped': self.dropped,
+            'trained_rows': self.trained_rows,
+            'batches': self.batches,
+            'promotions': self.promotions,
+            'rejections': self.rejections,
+            'candidate_base_version': self.base_version,
+            'last_promoted_version': self.promoted_version,
+            'last_check': self.last_check,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,163 @@
+"""
+On-Demand Request Profiling
+Opt-in cProfile + tracemalloc capture of individual requests, for looking
+inside latency spikes without redeploying. A request is profiled when it
+carries the profiling header (X-Profile: 1 by default) together with the
+admin token, or is picked by the sampling rate. Dumps go to a bounded
+directory where the oldest are deleted first, and /debug/profiles lists
+them. Without a configured admin token the header is ignored and the dump
+endpoints answer 403, so clients cannot force profiling or read dumps.
+
+Nothing is registered on the app unless PROFILING_ENABLED is set, so the
+disabled path costs nothing.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+
+from flask import Blueprint, abort, g, jsonify, request, send_from_directory
+
+PROFILE_SUFFIX = '.prof'
+MEMORY_SUFFIX = '.mem.txt'
+
+
+class RequestProfiler:
+    """Wraps selected requests in cProfile and tracemalloc"""
+
+    def __init__(self, directory='profiles', max_files=50, sample_rate=0.0,
+                 header='X-Profile', admin_token=None, top_allocations=25):
+        self.directory = directory
+        self.max_files = max_files
+        self.sample_rate = sample_rate
+        self.header = header
+        self.admin_token = admin_token
+        self.top_allocations = top_allocations
+        # cProfile and tracemalloc are process-wide, so profile one request at a time
+        self._busy = threading.Lock()
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            directory=config['PROFILING_DIR'],
+            max_files=config['PROFILING_MAX_FILES'],
+            sample_rate=config['PROFILING_SAMPLE_RATE'],
+            header=config['PROFILING_HEADER'],
+            admin_token=config['ADMIN_TOKEN'],
+        )
+
+    def init_app(self, app):
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+        app.register_blueprint(self._blueprint())
+
+    def _authorized(self):
+        return bool(self.admin_token) and request.headers.get('X-Admin-Token') == self.admin_token
+
+    def _wanted(self):
+        if request.headers.get(self.header) == '1' and self._authorized():
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if request.blueprint == 'profiling' or not self._wanted():
+            return
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return
+        g.profiler = cProfile.Profile()
+        g.profile_started = time.perf_counter()
+        tracemalloc.start()
+        g.memory_before = tracemalloc.take_snapshot()
+        g.profiler.enable()
+
+    def _stop(self, exc=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            elapsed = time.perf_counter() - g.pop('profile_started')
+            memory_after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._write(profiler, g.pop('memory_before'), memory_after, peak, elapsed)
+            self.profiled += 1
+        finally:
+            self._busy.release()
+
+    def _write(self, profiler, memory_before, memory_after, peak, elapsed):
+        endpoint = (request.endpoint or 'unknown').replace('.', '_')
+        stamp = time.strftime('%Y%m%dT%H%M%S') + f'-{time.time_ns() % 10 ** 9:09d}'
+        base = os.path.join(self.directory, f'{stamp}-{endpoint}')
+
+        profiler.dump_stats(base + PROFILE_SUFFIX)
+
+        out = io.StringIO()
+        out.write(f'{request.method} {request.path}\nelapsed: {elapsed * 1000:.3f} ms\n')
+        out.write(f'peak traced memory: {peak / 1024:.1f} KiB\n\nTop allocations during request:\n')
+        for stat in memory_after.compare_to(memory_before, 'lineno')[:self.top_allocations]:
+            out.write(f'{stat}\n')
+        out.write('\nTop functions by cumulative time:\n')
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(25)
+        with open(base + MEMORY_SUFFIX, 'w') as f:
+            f.write(out.getvalue())
+
+        self._rotate()
+
+    def _rotate(self):
+        """Delete the oldest dumps beyond max_files requests"""
+        bases = sorted({name[:-len(PROFILE_SUFFIX)] for name in os.listdir(self.directory)
+                        if name.endswith(PROFILE_SUFFIX)})
+        for base in bases[:max(0, len(bases) - self.max_files)]:
+            for suffix in (PROFILE_SUFFIX, MEMORY_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, base + suffix))
+                except OSError:
+                    pass
+
+    def list_dumps(self):
+        dumps = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            path = os.path.join(self.directory, name)
+            if name.endswith(PROFILE_SUFFIX) or name.endswith(MEMORY_SUFFIX):
+                stat = os.stat(path)
+                dumps.append({'name': name, 'bytes': stat.st_size, 'created': stat.st_mtime})
+        return dumps
+
+    def _check_token(self):
+        if not self._authorized():
+            abort(403)
+
+    def _blueprint(self):
+        blueprint = Blueprint('profiling', __name__)
+
+        @blueprint.route('/debug/profiles')
+        def index():
+            """List captured profile and memory dumps, newest first"""
+            self._check_token()
+            return jsonify({
+                'directory': self.directory,
+                'max_files': self.max_files,
+                'sample_rate': self.sample_rate,
+                'header': self.header,
+                'profiled': self.profiled,
+                'skipped_busy': self.skipped_busy,
+                'dumps': self.list_dumps(),
+            })
+
+        @blueprint.route('/debug/profiles/<path:name>')
+        def download(name):
+            """Download one dump (.prof opens with pstats/snakeviz)"""
+            self._check_token()
+            return send_from_directory(os.path.abspath(self.directory), name, as_attachment=True)
+
+        return blueprint
@@ -0,0 +1,119 @@
+"""
+Model Registry
+Holds the model currently being served and swaps in retrained models without
+a restart. New artifacts are loaded and verified off the request path (by a
+background watcher on models/ or an explicit reload call) and then published
+with a single reference assignment. Requests read `registry.current` once and
+keep using that model, so in-flight requests finish on the version they
+started with.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from model_artifact import ARTIFACT_PATH, MODEL_PATH, load_model
+from schema import schema
+
+
+class ModelRegistry:
+    """Current model plus reload/watch machinery"""
+
+    def __init__(self, models_dir='models'):
+        self.models_dir = models_dir
+        self.current = None
+        self.loaded_at = None
+        self.reload_count = 0
+        self.last_error = None
+        self._signature = None
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def on_swap(self, callback):
+        """Register callback(artifact) to run after a new model is published"""
+        self._listeners.append(callback)
+
+    def _source_signature(self):
+        """Identity of the files a reload would read (changes when they are replaced)"""
+        for name in (ARTIFACT_PATH, MODEL_PATH):
+            path = os.path.join(self.models_dir, os.path.basename(name))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            return (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return None
+
+    @staticmethod
+    def verify(artifact):
+        """Smoke-test a freshly loaded model before it is allowed to serve"""
+        labels, probabilities = artifact.scorer.score(schema.defaults)
+        if not np.isfinite(probabilities).all() or labels[0] not in artifact.scorer.classes:
+            raise ValueError(f'Model {artifact.version} produced invalid output on the smoke test')
+
+    def reload(self, force=False):
+        """
+        Load, verify and publish the model in models_dir.
+        Returns True if a new model was swapped in, False if nothing changed.
+        Raises on load or verification failure; the old model keeps serving.
+        """
+        with self._reload_lock:
+            signature = self._source_signature()
+            if signature is None:
+                raise FileNotFoundError(f'No model artifact found in {self.models_dir}')
+            if not force and signature == self._signature:
+                return False
+
+            try:
+                artifact = load_model(self.models_dir)
+                self.verify(artifact)
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+            previous = self.current
+            # Single reference assignment: readers see either the old or the new model
+            self.current = artifact
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.last_error = None
+            if previous is not None:
+                self.reload_count += 1
+            for callback in self._listeners:
+                callback(artifact)
+            return True
+
+    def start_watcher(self, interval):
+        """Poll models_dir every `interval` seconds and reload on change"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    if self.reload():
+                        print(f"Model hot-reloaded: version {self.current.version}")
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    print(f"Model reload failed, keeping version "
+                          f"{self.current.version if self.current else None}: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def status(self):
+        """JSON-serialisable registry state for /api/info"""
+        return {
+            'model_version': self.current.version if self.current else None,
+            'loaded_at': self.loaded_at,
+            'reload_count': self.reload_count,
+            'last_reload_error': self.last_error,
+        }
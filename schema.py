@@ -0,0 +1,199 @@
+"""
+Heart Disease Input Schema
+Single declarative description of the 13 model inputs (order, dtype, ranges
+and allowed categories). It is compiled once into NumPy bound and lookup
+arrays so one row or a million rows are validated with the same vectorized
+mask. Used by app.py (validation, /api/info) and streamlit_app.py (widgets).
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+# Feature order matters: it is the column order the scaler and model expect.
+# Numeric features carry min/max; categorical features carry choices.
+FEATURE_SCHEMA = [
+    {'name': 'age', 'label': 'Age', 'dtype': 'int',
+     'min': 20, 'max': 100, 'default': 50,
+     'message': 'Age must be between 20 and 100'},
+    {'name': 'sex', 'label': 'Sex', 'dtype': 'category',
+     'choices': {0: 'Female', 1: 'Male'}, 'default': 1,
+     'message': 'Sex must be 0 (Female) or 1 (Male)'},
+    {'name': 'cp', 'label': 'Chest Pain Type (cp)', 'dtype': 'category',
+     'choices': {0: 'Typical angina', 1: 'Atypical angina', 2: 'Non-anginal pain', 3: 'Asymptomatic'},
+     'default': 0, 'message': 'Chest pain type must be 0-3'},
+    {'name': 'trestbps', 'label': 'Resting Blood Pressure (trestbps)', 'dtype': 'int',
+     'min': 80, 'max': 200, 'default': 120,
+     'message': 'Resting blood pressure must be between 80 and 200'},
+    {'name': 'chol', 'label': 'Serum Cholesterol (chol)', 'dtype': 'int',
+     'min': 100, 'max': 600, 'default': 200,
+     'message': 'Cholesterol must be between 100 and 600'},
+    {'name': 'fbs', 'label': 'Fasting blood sugar > 120 mg/dl (fbs)', 'dtype': 'category',
+     'choices': {0: 'No', 1: 'Yes'}, 'default': 0,
+     'message': 'Fasting blood sugar must be 0 (No) or 1 (Yes)'},
+    {'name': 'restecg', 'label': 'Resting electrocardiographic results (restecg)', 'dtype': 'category',
+     'choices': {0: 'Normal', 1: 'ST-T wave abnormality', 2: 'Left ventricular hypertrophy'},
+     'default': 0, 'message': 'Resting ECG result must be 0-2'},
+    {'name': 'thalach', 'label': 'Maximum heart rate achieved (thalach)', 'dtype': 'int',
+     'min': 60, 'max': 220, 'default': 150,
+     'message': 'Max heart rate must be between 60 and 220'},
+    {'name': 'exang', 'label': 'Exercise induced angina (exang)', 'dtype': 'category',
+     'choices': {0: 'No', 1: 'Yes'}, 'default': 0,
+     'message': 'Exercise induced angina must be 0 (No) or 1 (Yes)'},
+    {'name': 'oldpeak', 'label': 'ST depression (oldpeak)', 'dtype': 'float',
+     'min': 0.0, 'max': 10.0, 'default': 1.0,
+     'message': 'ST depression must be between 0 and 10'},
+    {'name': 'slope', 'label': 'Slope of ST segment (slope)', 'dtype': 'category',
+     'choices': {0: 'Upsloping', 1: 'Flat', 2: 'Downsloping'}, 'default': 1,
+     'message': 'Slope of ST segment must be 0-2'},
+    {'name': 'ca', 'label': 'Number of major vessels colored by fluoroscopy (ca)', 'dtype': 'category',
+     'choices': {0: '0', 1: '1', 2: '2', 3: '3', 4: '4'}, 'default': 0,
+     'message': 'Major vessels must be 0-4'},
+    {'name': 'thal', 'label': 'Thalassemia (thal)', 'dtype': 'category',
+     'choices': {0: 'Unknown', 1: 'Normal', 2: 'Fixed defect', 3: 'Reversible defect'},
+     'default': 2, 'message': 'Thalassemia type must be 0-3'},
+]
+
+FEATURE_NAMES = [f['name'] for f in FEATURE_SCHEMA]
+
+
+def schema_hash(schema=FEATURE_SCHEMA):
+    """
+    Hash of the model-facing part of a schema (feature order and dtypes).
+    Validation ranges and labels are excluded: changing them does not
+    invalidate a trained model, reordering or retyping features does.
+    """
+    layout = [[f['name'], f['dtype']] for f in schema]
+    return hashlib.sha256(json.dumps(layout).encode('utf-8')).hexdigest()[:16]
+
+
+class CompiledSchema:
+    """Vectorized form of a feature schema"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.names = [f['name'] for f in schema]
+        self.messages = np.array([f['message'] for f in schema], dtype=object)
+        self.defaults = np.array([float(f['default']) for f in schema])
+
+        # Numeric bounds; categorical columns get +/-inf and are checked below
+        self.mins = np.array([float(f.get('min', -np.inf)) for f in schema])
+        self.maxs = np.array([float(f.get('max', np.inf)) for f in schema])
+        # 'int' features must also be whole numbers
+        self.integer = np.array([f['dtype'] == 'int' for f in schema])
+        self.format_messages = np.array([f"Invalid input format: {f['name']} must be a whole number"
+                                         for f in schema], dtype=object)
+
+        # Allowed category codes as a (n_categorical, max_code + 1) lookup table
+        self.categorical = np.array([i for i, f in enumerate(schema) if f['dtype'] == 'category'])
+        max_code = max(max(schema[i]['choices']) for i in self.categorical)
+        self.allowed = np.zeros((len(self.categorical), max_code + 1), dtype=bool)
+        for row, i in enumerate(self.categorical):
+            self.allowed[row, list(schema[i]['choices'])] = True
+
+    def parse_records(self, records):
+        """
+        Parse a list of JSON records into an (N, n_features) float matrix.
+        Missing fields default to 0 (which then fails validation where 0 is
+        out of range). Returns the matrix and an object array with a parse
+        error per bad row (None for rows that parsed cleanly).
+        """
+        features = np.zeros((len(records), len(self.names)))
+        errors = np.full(len(records), None, dtype=object)
+        names = self.names
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors[i] = 'Record must be a JSON object'
+                continue
+            try:
+                features[i] = [float(record.get(name, 0)) for name in names]
+            except (TypeError, ValueError):
+                errors[i] = 'Invalid input format'
+        return features, errors
+
+    def parse_columns(self, columns):
+        """
+        Column-oriented counterpart of parse_records: `columns` maps feature
+        names to equal-length sequences (lists or arrays). Each column is
+        converted in one call; a column with non-numeric entries falls back to
+        per-value parsing so only its bad rows get 'Invalid input format'.
+        Missing columns default to 0 and nulls become NaN (both then fail
+        validation). Raises ValueError on ragged columns.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('All columns must have the same length')
+        n_rows = lengths.pop() if lengths else 0
+        features = np.zeros((n_rows, len(self.names)))
+        errors = np.full(n_rows, None, dtype=object)
+        for j, name in enumerate(self.names):
+            values = columns.get(name)
+            if values is None:
+                continue
+            try:
+                column = np.asarray(values, dtype=np.float64)
+                if column.shape != (n_rows,):
+                    raise ValueError
+                features[:, j] = column
+            except (TypeError, ValueError):
+                for i, value in enumerate(values):
+                    try:
+                        features[i, j] = float(value)
+                    except (TypeError, ValueError):
+                        errors[i] = 'Invalid input format'
+        return features, errors
+
+    def invalid_mask(self, features):
+        """Boolean (N, n_features) mask of values that break the schema"""
+        features = np.atleast_2d(features)
+        # NaN compares False against both bounds, so it is caught here too
+        invalid = ~((features >= self.mins) & (features <= self.maxs))
+        whole = features[:, self.integer]
+        invalid[:, self.integer] |= whole != np.trunc(whole)
+
+        codes = features[:, self.categorical]
+        max_code = self.allowed.shape[1] - 1
+        usable = np.isfinite(codes) & (codes == np.round(codes)) & (codes >= 0) & (codes <= max_code)
+        lookup = np.where(usable, codes, 0).astype(np.intp)
+        allowed = usable & self.allowed[np.arange(len(self.categorical)), lookup]
+        invalid[:, self.categorical] = ~allowed
+        return invalid
+
+    def validate(self, features, errors=None):
+        """
+        Validate every row of a feature matrix at once.
+        Returns an object array with the message of the first failing feature
+        per row (None for valid rows). Existing parse errors are kept.
+        Fractional values of 'int' features get an 'Invalid input format'
+        message instead of the range message.
+        """
+        features = np.atleast_2d(features)
+        invalid = self.invalid_mask(features)
+        rows = np.flatnonzero(invalid.any(axis=1))
+        messages = np.full(invalid.shape[0], None, dtype=object)
+        first = invalid[rows].argmax(axis=1)
+        # In range but fractional: a format error rather than the range message
+        values = features[rows, first]
+        fractional = self.integer[first] & (values >= self.mins[first]) & (values <= self.maxs[first])
+        messages[rows] = np.where(fractional, self.format_messages[first], self.messages[first])
+        if errors is not None:
+            parse_failed = errors != None  # noqa: E711 - elementwise check on object array
+            messages[parse_failed] = errors[parse_failed]
+        return messages
+
+    def describe(self):
+        """JSON-serialisable description of the schema (used by /api/info)"""
+        described = []
+        for f in self.schema:
+            entry = {'name': f['name'], 'label': f['label'], 'dtype': f['dtype'], 'default': f['default']}
+            if f['dtype'] == 'category':
+                entry['choices'] = {str(k): v for k, v in f['choices'].items()}
+            else:
+                entry['min'] = f['min']
+                entry['max'] = f['max']
+            described.append(entry)
+        return described
+
+
+schema = CompiledSchema(FEATURE_SCHEMA)
@@ -0,0 +1,114 @@
+"""
+Fused Linear Scorer
+Folds the StandardScaler statistics into the logistic regression coefficients
+so scoring a patient (or a whole batch) is a single NumPy dot product instead
+of separate scaler.transform / model.predict / model.predict_proba calls.
+"""
+
+import hashlib
+import warnings
+
+import numpy as np
+
+
+class LinearScorer:
+    """
+    Compiled StandardScaler + binary LogisticRegression
+
+    logit = ((x - mean) / scale) . coef + intercept
+          = x . (coef / scale) + (intercept - (mean / scale) . coef)
+
+    Feature j contributes coef_j * (x_j - mean_j) / scale_j = weights_j * (x_j - center_j)
+    to the logit, where center is the training mean; the contributions plus the
+    logit of the average patient (baseline) add up to the logit.
+    """
+
+    def __init__(self, weights, bias, classes=(0, 1), center=None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.classes = np.asarray(classes)
+        self.center = np.zeros_like(self.weights) if center is None else np.asarray(center, dtype=np.float64)
+        self.baseline = self.bias + float(np.dot(self.center, self.weights))
+
+    @classmethod
+    def from_params(cls, coef, intercept, mean=None, scale=None, classes=(0, 1)):
+        """Build a scorer from raw scaler/model parameters (e.g. a model artifact)"""
+        coef = np.asarray(coef, dtype=np.float64).reshape(-1)
+        mean = np.zeros_like(coef) if mean is None else np.asarray(mean, dtype=np.float64)
+        scale = np.ones_like(coef) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        weights = coef / scale
+        bias = float(intercept) - float(np.dot(mean / scale, coef))
+        return cls(weights, bias, classes, center=mean)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler):
+        """Build a scorer from a fitted StandardScaler and LogisticRegression"""
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.shape[0] != 1 or len(model.classes_) != 2:
+            raise ValueError('LinearScorer only supports binary logistic regression')
+        return cls.from_params(coef[0], model.intercept_[0], getattr(scaler, 'mean_', None),
+                               getattr(scaler, 'scale_', None), model.classes_)
+
+    def fingerprint(self):
+        """Short hash of the fused parameters, identifying this model version"""
+        digest = hashlib.sha256(self.weights.tobytes())
+        digest.update(np.float64(self.bias).tobytes())
+        return digest.hexdigest()[:12]
+
+    def logits(self, features):
+        """Raw decision values for an (N, 13) matrix or a single row"""
+        # einsum rather than a BLAS matmul: a row's logit is then bit-identical
+        # whether it is scored alone or as part of a batch of any size
+        return np.einsum('ij,j->i', np.atleast_2d(features), self.weights) + self.bias
+
+    def score(self, features):
+        """
+        Score an (N, 13) matrix in one pass.
+        Returns (labels, probabilities) where probabilities is (N, 2) with
+        columns [P(no disease), P(disease)], matching predict_proba.
+        """
+        logits = self.logits(features)
+        # Numerically stable sigmoid: 1 / (1 + exp(-z))
+        disease = np.exp(-np.logaddexp(0.0, -logits))
+        probabilities = np.column_stack([1.0 - disease, disease])
+        labels = self.classes[(logits > 0).astype(int)]
+        return labels, probabilities
+
+    def score_explained(self, features):
+        """
+        score() plus each feature's contribution to the logit, as an (N, 13)
+        matrix in feature order. The logits come from the same einsum as
+        score(), so labels and probabilities are identical to it; the
+        contributions add one elementwise (N, 13) product.
+        """
+        features = np.atleast_2d(features)
+        labels, probabilities = self.score(features)
+        contributions = (features - self.center) * self.weights
+        return labels, probabilities, contributions
+
+    def verify(self, model, scaler, n_samples=256, atol=1e-9):
+        """
+        Check the fused scorer against the sklearn objects it was built from.
+        Raises ValueError if labels or probabilities disagree.
+        """
+        rng = np.random.default_rng(0)
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        mean = np.zeros(self.weights.shape) if mean is None else mean
+        scale = np.ones(self.weights.shape) if scale is None else scale
+        sample = mean + scale * rng.standard_normal((n_samples, self.weights.shape[0]))
+
+        with warnings.catch_warnings():
+            # The scaler may have been fitted on a DataFrame; plain arrays are fine here
+            warnings.simplefilter('ignore', UserWarning)
+            expected_scaled = scaler.transform(sample)
+            expected_labels = model.predict(expected_scaled)
+            expected_proba = model.predict_proba(expected_scaled)
+        labels, proba = self.score(sample)
+
+        if not np.array_equal(labels, expected_labels):
+            raise ValueError('Fused scorer labels do not match the sklearn model')
+        if not np.allclose(proba, expected_proba, rtol=0, atol=atol):
+            raise ValueError('Fused scorer probabilities do not match the sklearn model')
+        return True
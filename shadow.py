@@ -0,0 +1,217 @@
+"""
+Shadow Model Scoring
+Runs candidate models on live traffic next to the served (primary) model
+without affecting responses. Endpoints answer with the primary model as
+usual and then hand the scored rows to ShadowScorer.submit(), which only
+queues a task on a thread pool. Worker threads score the same rows with
+every shadow model and aggregate, per shadow:
+
+- agreement:   share of rows where the shadow predicts the same class
+- probability: mean and largest absolute difference in disease probability
+- positives:   positive rate of the shadow vs the primary on those rows
+- latency:     scoring time per batch and per row, and queueing lag
+
+At most max_pending_rows rows wait for the pool. Rows beyond that are shed
+(not scored by the shadows) and counted, so a traffic spike slows down
+shadow evaluation instead of primary requests. Statistics restart when the
+primary model is swapped, since agreement is measured against it.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import metrics
+from model_artifact import load_artifact, load_model
+from registry import ModelRegistry
+
+
+class ShadowModel:
+    """A loaded shadow artifact and its running comparison with the primary"""
+
+    def __init__(self, artifact, path=None):
+        self.artifact = artifact
+        self.name = artifact.version
+        self.path = path or artifact.path
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.agreements = 0
+            self.shadow_positives = 0
+            self.primary_positives = 0
+            self.abs_diff_sum = 0.0
+            self.max_abs_diff = 0.0
+            self.batches = 0
+            self.score_seconds = 0.0
+            self.max_batch_seconds = 0.0
+            self.errors = 0
+            self.last_error = None
+
+    def score(self, features, predictions, probabilities):
+        """Score rows the primary answered with `predictions` / `probabilities` (percent)"""
+        started = time.perf_counter()
+        try:
+            labels, shadow_probabilities = self.artifact.scorer.score(features)
+        except Exception as e:
+            with self._lock:
+                self.errors += len(features)
+                self.last_error = str(e)
+            return
+        elapsed = time.perf_counter() - started
+        metrics.SHADOW_SCORE_SECONDS.observe(elapsed, self.name)
+
+        diff = np.abs(shadow_probabilities[:, 1] * 100 - probabilities)
+        agreements = int((labels == predictions).sum())
+        with self._lock:
+            self.rows += len(features)
+            self.agreements += agreements
+            self.shadow_positives += int((labels == 1).sum())
+            self.primary_positives += int((predictions == 1).sum())
+            self.abs_diff_sum += float(diff.sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(diff.max()))
+            self.batches += 1
+            self.score_seconds += elapsed
+            self.max_batch_seconds = max(self.max_batch_seconds, elapsed)
+
+    def stats(self):
+        with self._lock:
+            rows, batches = self.rows, self.batches
+            return {
+                'model_version': self.name,
+                'path': self.path,
+                'rows': rows,
+                'agreement_rate': self.agreements / rows if rows else None,
+                'mean_abs_probability_diff': self.abs_diff_sum / rows if rows else None,
+                'max_abs_probability_diff': self.max_abs_diff if rows else None,
+                'shadow_positive_rate': self.shadow_positives / rows if rows else None,
+                'primary_positive_rate': self.primary_positives / rows if rows else None,
+                'batches': batches,
+                'mean_batch_ms': self.score_seconds / batches * 1000 if batches else None,
+                'max_batch_ms': self.max_batch_seconds * 1000 if batches else None,
+                'mean_row_us': self.score_seconds / rows * 1e6 if rows else None,
+                'errors': self.errors,
+                'last_error': self.last_error,
+            }
+
+
+def load_shadow(path):
+    """Load a shadow from an .hdp artifact or a models directory and smoke-test it"""
+    artifact = load_model(path) if os.path.isdir(path) else load_artifact(path)
+    ModelRegistry.verify(artifact)
+    return ShadowModel(artifact, path)
+
+
+class ShadowScorer:
+    """Thread pool scoring submitted rows with every shadow model, shedding past a row bound"""
+
+    def __init__(self, shadows, workers=1, max_pending_rows=10000):
+        self.shadows = list(shadows)
+        self.workers = workers
+        self.max_pending_rows = max_pending_rows
+        self.pending_rows = 0
+        self.submitted = 0
+        self.scored = 0
+        self.shed = 0
+        self.lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.since = time.time()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shadow')
+
+    def submit(self, features, predictions, probabilities):
+        """
+        Queue rows the primary has scored: an (N, 13) matrix with the primary's
+        predicted classes and disease probabilities in percent. The arrays are
+        not copied, so callers must not modify them afterwards.
+        Returns False if the rows were shed.
+        """
+        n = len(features)
+        if not n or not self.shadows:
+            return True
+        with self._lock:
+            if self.pending_rows + n > self.max_pending_rows:
+                self.shed += n
+                return False
+            self.pending_rows += n
+            self.submitted += n
+        try:
+            self._pool.submit(self._score, features, np.asarray(predictions),
+                              np.asarray(probabilities, dtype=np.float64), time.perf_counter())
+        except RuntimeError:
+            # Pool shut down
+            with self._lock:
+                self.pending_rows -= n
+                self.shed += n
+            return False
+        return True
+
+    def _score(self, features, predictions, probabilities, queued_at):
+        lag = time.perf_counter() - queued_at
+        try:
+            for shadow in self.shadows:
+                shadow.score(features, predictions, probabilities)
+        finally:
+            with self._lock:
+                self.pending_rows -= len(features)
+                self.scored += len(features)
+                self.lag_seconds += lag * len(features)
+                self.max_lag_seconds = max(self.max_lag_seconds, lag)
+
+    def reset(self):
+        """Restart the comparison, e.g. after the primary model changed"""
+        with self._lock:
+            self.submitted = 0
+            self.scored = 0
+            self.shed = 0
+            self.lag_seconds = 0.0
+            self.max_lag_seconds = 0.0
+            self.since = time.time()
+        for shadow in self.shadows:
+            shadow.reset()
+
+    def drain(self, timeout=10):
+        """Wait until every submitted row has been scored (for tests and shutdown)"""
+        deadline = time.monotonic() + timeout
+        while self.pending_rows:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self):
+        """JSON-serialisable pool counters and per-shadow comparison for /api/shadow"""
+        with self._lock:
+            scored = self.scored
+            pool = {
+                'workers': self.workers,
+                'max_pending_rows': self.max_pending_rows,
+                'pending_rows': self.pending_rows,
+                'submitted_rows': self.submitted,
+                'scored_rows': scored,
+                'shed_rows': self.shed,
+                'mean_lag_ms': self.lag_seconds / scored * 1000 if scored else None,
+                'max_lag_ms': self.max_lag_seconds * 1000,
+                'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.since)),
+            }
+        return dict(pool, shadows=[shadow.stats() for shadow in self.shadows])
+
+    @classmethod
+    def from_config(cls, config):
+        """Load every path in SHADOW_MODELS; shadows that fail to load are reported and skipped"""
+        shadows = []
+        for path in config['SHADOW_MODELS']:
+            try:
+                shadows.append(load_shadow(path))
+                print(f"Shadow model loaded: {shadows[-1].name} from {path}")
+            except Exception as e:
+                print(f"Error loading shadow model {path}: {e}")
+        return cls(shadows, workers=config['SHADOW_WORKERS'], max_pending_rows=config['SHADOW_MAX_PENDING_ROWS'])
@@ -0,0 +1,106 @@
+"""
+Streaming Input/Output Helpers
+Incremental NDJSON/CSV readers and writers used by /predict/stream. Input is
+read in fixed-size byte chunks and grouped into fixed-size record chunks, so
+memory use is bounded by the chunk sizes rather than the size of the upload.
+"""
+
+import csv
+import io
+
+import encoders
+
+CSV_COLUMNS = [
+    'index', 'success', 'prediction', 'disease_probability',
+    'no_disease_probability', 'diagnosis', 'confidence', 'error'
+]
+
+
+def iter_lines(stream, chunk_bytes=65536, max_line_bytes=1048576):
+    """
+    Yield complete lines (bytes, without newline) from a binary stream. A line
+    longer than max_line_bytes is skipped up to the next newline and yielded
+    as None, so callers can report it and carry on with the following lines.
+    """
+    buffer = b''
+    skipping = False
+    while True:
+        chunk = stream.read(chunk_bytes)
+        if not chunk:
+            break
+        if skipping:
+            end = chunk.find(b'\n')
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            skipping = False
+        buffer += chunk
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        for line in lines:
+            yield line.rstrip(b'\r') if len(line) <= max_line_bytes else None
+        if len(buffer) > max_line_bytes:
+            buffer = b''
+            skipping = True
+            yield None
+    if buffer.strip():
+        yield buffer.rstrip(b'\r')
+
+
+def iter_record_chunks(stream, fmt, chunk_bytes=65536, chunk_rows=1000, max_line_bytes=1048576):
+    """
+    Group an NDJSON or CSV stream into lists of at most `chunk_rows` records.
+    Yields (records, bad_rows) where bad_rows maps a position in `records` to
+    a parse error message for lines that could not be decoded or were longer
+    than max_line_bytes.
+    """
+    too_long = f'Line longer than {max_line_bytes} bytes'
+    lines = iter_lines(stream, chunk_bytes, max_line_bytes)
+    header = None
+    header_error = None
+    if fmt == 'csv':
+        for line in lines:
+            if line is None:
+                header_error = f'CSV header longer than {max_line_bytes} bytes'
+                break
+            if line.strip():
+                header = next(csv.reader([line.decode('utf-8-sig')]))
+                header = [name.strip() for name in header]
+                break
+
+    records, bad_rows = [], {}
+    for line in lines:
+        if line is not None and not line.strip():
+            continue
+        if line is None or header_error:
+            bad_rows[len(records)] = header_error or too_long
+            records.append(None)
+        else:
+            try:
+                text = line.decode('utf-8')
+                if fmt == 'csv':
+                    records.append(dict(zip(header, next(csv.reader([text])))))
+                else:
+                    records.append(encoders.loads(text))
+            except (UnicodeDecodeError, ValueError):
+                bad_rows[len(records)] = 'Invalid CSV row' if fmt == 'csv' else 'Invalid JSON'
+                records.append(None)
+
+        if len(records) >= chunk_rows:
+            yield records, bad_rows
+            records, bad_rows = [], {}
+
+    if records:
+        yield records, bad_rows
+
+
+def format_rows(rows, fmt, header=False):
+    """Encode a list of result dicts as NDJSON lines or CSV rows"""
+    if fmt != 'csv':
+        return b''.join(encoders.dumps(row) + b'\n' for row in rows).decode('utf-8')
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS, extrasaction='ignore', lineterminator='\n')
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
@@ -1,80 +1,92 @@
 import streamlit as st
-import pickle
-import numpy as np
+import io
 import os
+import pandas as pd
+from bulk_score import score_frame
+from model_artifact import load_model
+from schema import FEATURE_NAMES, FEATURE_SCHEMA, schema
 
-MODEL_PATH = 'models/heart_disease_model.pkl'
-SCALER_PATH = 'models/scaler.pkl'
-FEATURES_PATH = 'models/feature_names.pkl'
+MODELS_DIR = 'models'
+# Rows validated and scored per vectorized call when scoring an upload
+UPLOAD_CHUNK_ROWS = 20000
 
 
 @st.cache_resource
 def load_artifacts():
-    model = None
-    scaler = None
+    scorer = None
     feature_names = None
+    version = None
+    if not os.path.isdir(MODELS_DIR):
+        return scorer, feature_names, version
     try:
-        if os.path.exists(MODEL_PATH):
-            model = pickle.load(open(MODEL_PATH, 'rb'))
-        if os.path.exists(SCALER_PATH):
-            scaler = pickle.load(open(SCALER_PATH, 'rb'))
-        if os.path.exists(FEATURES_PATH):
-            feature_names = pickle.load(open(FEATURES_PATH, 'rb'))
+        artifact = load_model(MODELS_DIR)
+        scorer = artifact.scorer
+        feature_names = artifact.feature_names
+        version = artifact.version
+    except FileNotFoundError:
+        pass
     except Exception as e:
         st.error(f'Error loading model artifacts: {e}')
-    return model, scaler, feature_names
-
-
-def main():
-    st.set_page_config(page_title='Heart Disease Predictor', layout='centered')
-    st.title('Heart Disease Prediction')
-    st.markdown('Upload or use the form below to predict the presence of heart disease.')
-
-    model, scaler, feature_names = load_artifacts()
-
-    if model is None or scaler is None:
-        st.warning('Model or scaler not found. Please run `python train_model.py` to generate model artifacts.')
-        return
-
+    return scorer, feature_names, version
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def score_upload(content, model_version, _scorer, _progress=None):
+    """
+    Score an uploaded CSV in chunks of UPLOAD_CHUNK_ROWS with the same
+    validation and vectorized scorer as bulk_score.py. Memoized on the file
+    bytes and model version, so reruns and widget changes reuse the result.
+    Returns (results with the input columns, CSV bytes for download).
+    """
+    total_rows = max(content.count(b'\n') - 1, 1)
+    parts = []
+    done = 0
+    reader = pd.read_csv(io.BytesIO(content), dtype=str, chunksize=UPLOAD_CHUNK_ROWS,
+                         keep_default_na=False, skipinitialspace=True)
+    for chunk in reader:
+        scored = score_frame(chunk, _scorer)
+        parts.append(pd.concat([chunk.reset_index(drop=True), scored.drop(columns='index')], axis=1))
+        done += len(chunk)
+        if _progress is not None:
+            _progress.progress(min(done / total_rows, 1.0), text=f'Scored {done:,} rows')
+    results = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=FEATURE_NAMES)
+    return results, results.to_csv(index=False).encode('utf-8')
+
+
+def single_patient(scorer):
     with st.form('prediction_form'):
-        age = st.slider('Age', 20, 100, 50)
-        sex = st.selectbox('Sex', options={0: 'Female', 1: 'Male'}.items(), format_func=lambda x: x[1])
-        sex = list({0: 'Female', 1: 'Male'}.keys())[list({0: 'Female', 1: 'Male'}.values()).index(sex[1])]
-        cp = st.selectbox('Chest Pain Type (cp)', options=[0, 1, 2, 3])
-        trestbps = st.number_input('Resting Blood Pressure (trestbps)', min_value=80, max_value=250, value=120)
-        chol = st.number_input('Serum Cholesterol (chol)', min_value=100, max_value=700, value=200)
-        fbs = st.selectbox('Fasting blood sugar > 120 mg/dl (fbs)', options=[0, 1])
-        restecg = st.selectbox('Resting electrocardiographic results (restecg)', options=[0, 1, 2])
-        thalach = st.number_input('Maximum heart rate achieved (thalach)', min_value=60, max_value=250, value=150)
-        exang = st.selectbox('Exercise induced angina (exang)', options=[0, 1])
-        oldpeak = st.number_input('ST depression (oldpeak)', min_value=0.0, max_value=10.0, value=1.0, format="%f")
-        slope = st.selectbox('Slope of ST segment (slope)', options=[0, 1, 2])
-        ca = st.selectbox('Number of major vessels colored by fluoroscopy (ca)', options=[0, 1, 2, 3, 4])
-        thal = st.selectbox('Thalassemia (thal)', options=[0, 1, 2, 3])
+        values = {}
+        for feature in FEATURE_SCHEMA:
+            if feature['dtype'] == 'category':
+                choices = feature['choices']
+                values[feature['name']] = st.selectbox(
+                    feature['label'], options=list(choices),
+                    index=list(choices).index(feature['default']),
+                    format_func=lambda code, choices=choices: f'{code} - {choices[code]}'
+                )
+            elif feature['dtype'] == 'float':
+                values[feature['name']] = st.number_input(
+                    feature['label'], min_value=float(feature['min']), max_value=float(feature['max']),
+                    value=float(feature['default']), step=0.1, format="%f"
+                )
+            else:
+                values[feature['name']] = st.number_input(
+                    feature['label'], min_value=feature['min'], max_value=feature['max'],
+                    value=feature['default']
+                )
 
         submit = st.form_submit_button('Predict')
 
     if submit:
         try:
-            features = np.array([
-                float(age),
-                float(sex),
-                float(cp),
-                float(trestbps),
-                float(chol),
-                float(fbs),
-                float(restecg),
-                float(thalach),
-                float(exang),
-                float(oldpeak),
-                float(slope),
-                float(ca),
-                float(thal)
-            ]).reshape(1, -1)
-
-            features_scaled = scaler.transform(features)
-            pred = model.predict(features_scaled)[0]
-            proba = model.predict_proba(features_scaled)[0]
+            features, errors = schema.parse_records([values])
+            message = schema.validate(features, errors)[0]
+            if message is not None:
+                st.error(message)
+                return
+
+            preds, probas = scorer.score(features)
+            pred, proba = preds[0], probas[0]
 
             st.write('### Prediction')
             if pred == 1:
@@ -90,5 +102,51 @@ def main():
             st.exception(e)
 
 
+def batch_upload(scorer, version):
+    st.markdown(f"Upload a CSV with the columns `{', '.join(FEATURE_NAMES)}` (one patient per row).")
+    uploaded = st.file_uploader('Patient CSV', type=['csv'])
+    if uploaded is None:
+        return
+
+    progress = st.progress(0.0, text='Scoring...')
+    try:
+        results, csv_bytes = score_upload(uploaded.getvalue(), version, scorer, _progress=progress)
+    except Exception as e:
+        progress.empty()
+        st.error(f'Could not score {uploaded.name}: {e}')
+        return
+    progress.progress(1.0, text=f'Scored {len(results):,} rows')
+
+    valid = results['success'] if len(results) else pd.Series(dtype=bool)
+    cols = st.columns(3)
+    cols[0].metric('Patients', f'{len(results):,}')
+    cols[1].metric('Heart disease predicted', f"{int((results.loc[valid, 'prediction'] == 1).sum()):,}")
+    cols[2].metric('Invalid rows', f'{int((~valid).sum()):,}')
+
+    st.dataframe(results.head(1000))
+    if len(results) > 1000:
+        st.caption(f'Showing the first 1,000 of {len(results):,} rows; download for the full results.')
+    st.download_button('Download predictions (CSV)', data=csv_bytes,
+                       file_name=f'{os.path.splitext(uploaded.name)[0]}_predictions.csv', mime='text/csv')
+
+
+def main():
+    st.set_page_config(page_title='Heart Disease Predictor', layout='centered')
+    st.title('Heart Disease Prediction')
+    st.markdown('Upload a CSV of patients or use the form below to predict the presence of heart disease.')
+
+    scorer, feature_names, version = load_artifacts()
+
+    if scorer is None:
+        st.warning('Model or scaler not found. Please run `python train_model.py` to generate model artifacts.')
+        return
+
+    mode = st.radio('Input', ['Single patient', 'Upload CSV'], horizontal=True)
+    if mode == 'Upload CSV':
+        batch_upload(scorer, version)
+    else:
+        single_patient(scorer)
+
+
 if __name__ == '__main__':
     main()
@@ -19,6 +19,27 @@ def test_project_structure():
         'app.py',
         'train_model.py',
         'config.py',
+        'scorer.py',
+        'schema.py',
+        'streaming.py',
+        'bulk_score.py',
+        'prediction_cache.py',
+        'model_artifact.py',
+        'registry.py',
+        'batching.py',
+        'asgi_app.py',
+        'metrics.py',
+        'benchmarks.py',
+        'profiling.py',
+        'dataset_cache.py',
+        'online_learning.py',
+        'encoders.py',
+        'loadtest.py',
+        'gunicorn.conf.py',
+        'audit.py',
+        'drift.py',
+        'evaluation.py',
+        'shadow.py',
         'requirements.txt',
         'README.md',
         'QUICKSTART.md',
@@ -95,6 +116,7 @@ def test_model_files():
     print("=" * 60)
     
     model_files = [
+        'models/heart_disease_model.hdp',
         'models/heart_disease_model.pkl',
         'models/scaler.pkl',
         'models/feature_names.pkl'
@@ -123,15 +145,22 @@ def test_model_prediction():
     print("=" * 60)
     
     try:
+        from scorer import LinearScorer
         model = pickle.load(open('models/heart_disease_model.pkl', 'rb'))
         scaler = pickle.load(open('models/scaler.pkl', 'rb'))
+        scorer = LinearScorer.from_sklearn(model, scaler)
+        scorer.verify(model, scaler)
+        print("✓ Fused scorer matches sklearn scaler + model")
+        
+        from model_artifact import load_artifact
+        artifact = load_artifact('models/heart_disease_model.hdp')
+        artifact.scorer.verify(model, scaler)
+        print(f"✓ Model artifact {artifact.version} matches sklearn scaler + model")
         
         # Test data
         test_input = [[45, 1, 1, 130, 200, 0, 1, 150, 0, 1.5, 1, 0, 2]]
         
-        scaled = scaler.transform(test_input)
-        prediction = model.predict(scaled)
-        probability = model.predict_proba(scaled)
+        prediction, probability = scorer.score(test_input)
         
         print(f"✓ Test Input: {test_input[0]}")
         print(f"✓ Prediction: {prediction[0]}")
@@ -144,6 +173,1573 @@ def test_model_prediction():
         return False
 
 
+def test_batch_prediction():
+    """Test if the batch endpoint scores valid rows and reports bad ones"""
+    print("\n" + "=" * 60)
+    print("Testing Batch Prediction...")
+    print("=" * 60)
+    
+    try:
+        from app import app
+        client = app.test_client()
+        
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        bad = dict(good, age=150)
+        
+        single = client.post('/predict', json=good).get_json()
+        batch = client.post('/predict/batch', json=[good, bad, 'oops']).get_json()
+        
+        checks = {
+            'batch succeeded': batch['success'],
+            'row count': batch['count'] == 3 and batch['valid_count'] == 1,
+            'matches /predict': batch['results'][0]['disease_probability'] == single['disease_probability'],
+            'range error reported': batch['results'][1]['error'] == 'Age must be between 20 and 100',
+            'format error reported': not batch['results'][2]['success'],
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing batch prediction: {e}")
+        return False
+
+
+def test_stream_prediction():
+    """Test if the streaming endpoint scores NDJSON and CSV uploads"""
+    print("\n" + "=" * 60)
+    print("Testing Stream Prediction...")
+    print("=" * 60)
+    
+    try:
+        from app import app
+        client = app.test_client()
+        
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        
+        ndjson = '\n'.join([json.dumps(good)] * 2500 + ['{not json'])
+        response = client.post('/predict/stream', data=ndjson, content_type='application/x-ndjson')
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        
+        csv_body = ','.join(good) + '\n' + ','.join(str(v) for v in good.values()) + '\n'
+
+        # An overlong line becomes an error row and the stream resyncs at the next newline
+        import io
+        from streaming import iter_record_chunks
+        long_line = json.dumps(dict(good, note='x' * 1100000))
+        long_body = '\n'.join([json.dumps(good), long_line, json.dumps(good)])
+        long_rows = [json.loads(line) for line in client.post(
+            '/predict/stream', data=long_body, content_type='application/x-ndjson').data.decode().splitlines()]
+        small = b'\n'.join([json.dumps(good).encode(), b'{' + b' ' * 300 + b'}', json.dumps(good).encode()] * 3)
+        resynced = [(records, bad) for records, bad in
+                    iter_record_chunks(io.BytesIO(small), 'ndjson', chunk_bytes=64, chunk_rows=100, max_line_bytes=250)]
+        csv_response = client.post('/predict/stream', data=csv_body, content_type='text/csv')
+        csv_lines = csv_response.data.decode().splitlines()
+        
+        checks = {
+            'all NDJSON rows returned': len(rows) == 2501,
+            'rows indexed across chunks': rows[2499]['index'] == 2499 and rows[2499]['success'],
+            'bad line reported': rows[-1]['error'] == 'Invalid JSON',
+            'CSV scored': csv_response.mimetype == 'text/csv' and len(csv_lines) == 2,
+            'overlong line reported, later rows scored': [r['success'] for r in long_rows] == [True, False, True]
+                                                         and long_rows[1]['error'].startswith('Line longer than'),
+            'resync with small reads': len(resynced) == 1 and len(resynced[0][0]) == 9
+                                       and sorted(resynced[0][1]) == [1, 4, 7],
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing stream prediction: {e}")
+        return False
+
+
+def test_bulk_scoring():
+    """Test if the offline CLI scores match the online API"""
+    print("\n" + "=" * 60)
+    print("Testing Bulk Scoring CLI...")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        import pandas as pd
+        import bulk_score
+        from app import score_records
+        
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        records = [dict(good, age=30 + i % 50, chol=150 + i) for i in range(250)]
+        records[7]['chol'] = 'abc'
+        records[9]['thal'] = 7
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, 'patients.csv')
+            output_path = os.path.join(tmp, 'scores.csv')
+            pd.DataFrame(records).to_csv(input_path, index=False)
+            rows, _ = bulk_score.run(input_path, output_path, workers=2, chunk_size=64)
+            offline = pd.read_csv(output_path, float_precision='round_trip')
+
+            # Parquet: the first chunk is all valid, a later one has errors
+            parquet_ok = True
+            if bulk_score.pq is not None:
+                mixed = [dict(good) for _ in range(5)] + [dict(good, age='', chol='abc') for _ in range(5)]
+                pd.DataFrame(mixed).to_csv(input_path, index=False)
+                parquet_path = os.path.join(tmp, 'scores.parquet')
+                bulk_score.run(input_path, parquet_path, workers=1, chunk_size=5)
+                table = pd.read_parquet(parquet_path)
+                parquet_ok = (list(table['success']) == [True] * 5 + [False] * 5
+                              and table['error'][5] == 'Invalid input format'
+                              and table['prediction'].isna().sum() == 5)
+        
+        online = score_records(records)
+        checks = {
+            'all rows scored': rows == len(records) == len(offline),
+            'rows in input order': list(offline['index']) == list(range(len(records))),
+            'probabilities match API': all(
+                r['disease_probability'] == p for r, p in zip(online, offline['disease_probability']) if r['success']
+            ),
+            'errors match API': offline['error'][7] == online[7]['error'] and offline['error'][9] == online[9]['error'],
+            'parquet chunks with and without errors': parquet_ok,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing bulk scoring: {e}")
+        return False
+
+
+def test_prediction_cache():
+    """Test if the prediction cache serves repeats and evicts correctly"""
+    print("\n" + "=" * 60)
+    print("Testing Prediction Cache...")
+    print("=" * 60)
+    
+    try:
+        import time
+        from prediction_cache import PredictionCache
+        from app import app, prediction_cache
+        
+        cache = PredictionCache(maxsize=2, ttl=0.05)
+        cache.bind_model('v1')
+        cache.put(b'a', 1)
+        cache.put(b'b', 2)
+        cache.get(b'a')
+        cache.put(b'c', 3)
+        lru_ok = cache.get(b'b') is None and cache.get(b'a') == 1
+        time.sleep(0.06)
+        ttl_ok = cache.get(b'c') is None
+        cache.put(b'd', 4)
+        cache.bind_model('v2')
+        invalidated = cache.get(b'd') is None
+        
+        client = app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        first = client.post('/predict', json=good).get_json()
+        hits_before = prediction_cache.hits
+        second = client.post('/predict', json=dict(good, age='45')).get_json()
+        stats = client.get('/api/cache').get_json()
+        
+        checks = {
+            'LRU eviction': lru_ok and cache.evictions == 1,
+            'TTL expiry': ttl_ok and cache.expirations == 1,
+            'model change invalidates': invalidated,
+            'repeat form served from cache': stats['hits'] == hits_before + 1 or not stats['enabled'],
+            'cached result identical': first == second,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing prediction cache: {e}")
+        return False
+
+
+def test_model_artifact():
+    """Test if the artifact round-trips and rejects corrupt files"""
+    print("\n" + "=" * 60)
+    print("Testing Model Artifact...")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        import numpy as np
+        from model_artifact import save_artifact, load_artifact
+        from schema import FEATURE_NAMES
+        
+        model = pickle.load(open('models/heart_disease_model.pkl', 'rb'))
+        scaler = pickle.load(open('models/scaler.pkl', 'rb'))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.hdp')
+            version = save_artifact(path, model, scaler, FEATURE_NAMES, metadata={'note': 'test'})
+            artifact = load_artifact(path)
+            mapped = not artifact.arrays['weights'].flags.owndata
+            round_trip = (artifact.version == version and artifact.metadata == {'note': 'test'}
+                          and np.array_equal(artifact.arrays['coef'], model.coef_[0]))
+            del artifact  # release the mapping before the file is rewritten
+            
+            # Flip one byte in the parameter block
+            with open(path, 'r+b') as f:
+                f.seek(-8, os.SEEK_END)
+                f.write(b'\xff')
+            try:
+                load_artifact(path)
+                corrupt_rejected = False
+            except ValueError:
+                corrupt_rejected = True
+        
+        checks = {
+            'round trip': round_trip,
+            'parameters are mapped, not copied': mapped,
+            'corrupt artifact rejected': corrupt_rejected,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing model artifact: {e}")
+        return False
+
+
+def test_hot_reload():
+    """Test if a retrained artifact is swapped in without disturbing the old one"""
+    print("\n" + "=" * 60)
+    print("Testing Model Hot Reload...")
+    print("=" * 60)
+    
+    try:
+        import shutil
+        import tempfile
+        import numpy as np
+        from model_artifact import save_artifact
+        from registry import ModelRegistry
+        from schema import FEATURE_NAMES
+        from app import app, registry as app_registry
+        
+        model = pickle.load(open('models/heart_disease_model.pkl', 'rb'))
+        scaler = pickle.load(open('models/scaler.pkl', 'rb'))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy('models/heart_disease_model.hdp', tmp)
+            registry = ModelRegistry(tmp)
+            registry.reload()
+            old = registry.current
+            old_version = old.version
+            before = old.scorer.score(np.array([[45, 1, 1, 130, 200, 0, 1, 150, 0, 1.5, 1, 0, 2]]))[1]
+            
+            # "Retrain": same model with a shifted intercept
+            model.intercept_ = model.intercept_ + 1.0
+            save_artifact(os.path.join(tmp, 'heart_disease_model.hdp'), model, scaler, FEATURE_NAMES)
+            swapped = registry.reload()
+            unchanged = registry.reload()
+            
+            # A request that started on the old model still gets its answer
+            after_old = old.scorer.score(np.array([[45, 1, 1, 130, 200, 0, 1, 150, 0, 1.5, 1, 0, 2]]))[1]
+            new_version = registry.current.version
+            del old, registry
+        
+        client = app.test_client()
+        app.config['ADMIN_TOKEN'] = 'secret'
+        denied = client.post('/admin/reload').status_code == 403
+        allowed = client.post('/admin/reload', headers={'X-Admin-Token': 'secret'}).get_json()
+        info = client.get('/api/info').get_json()
+        
+        checks = {
+            'new artifact swapped in': swapped and new_version != old_version,
+            'unchanged file not reloaded': not unchanged,
+            'old model still usable in flight': np.array_equal(before, after_old),
+            'admin reload requires token': denied,
+            'admin reload works': allowed['success'] and allowed['model_version'] == app_registry.current.version,
+            '/api/info reports version': info['model_version'] == app_registry.current.version,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing hot reload: {e}")
+        return False
+
+
+def test_micro_batching():
+    """Test if concurrent async requests are coalesced into shared batches"""
+    print("\n" + "=" * 60)
+    print("Testing Async Micro-Batching...")
+    print("=" * 60)
+    
+    try:
+        import asyncio
+        import asgi_app
+        from batching import MicroBatcher
+        from app import app as flask_app, score_records
+        
+        flask_client = flask_app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        records = [dict(good, age=30 + i) for i in range(40)]
+        
+        async def call(record, body=None, query=b'', headers=()):
+            sent = []
+            
+            async def receive():
+                return {'type': 'http.request', 'body': body or json.dumps(record).encode(), 'more_body': False}
+            
+            async def send(message):
+                sent.append(message)
+            
+            await asgi_app.app({'type': 'http', 'path': '/predict', 'method': 'POST', 'query_string': query,
+                                'headers': list(headers)}, receive, send)
+            return sent[0]['status'], json.loads(sent[1]['body'])
+        
+        async def get(path):
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                sent.append(message)
+            await asgi_app.app({'type': 'http', 'path': path, 'method': 'GET'}, receive, send)
+            return sent[1]['body'].decode('utf-8')
+
+        async def run():
+            asgi_app.batcher = MicroBatcher(asgi_app.score_batch, max_batch_size=16, max_wait_us=2000)
+            return await asyncio.gather(*[call(r) for r in records], call(dict(good, age=5)))
+        
+        responses = asyncio.run(run())
+        stats = asgi_app.batcher.stats()
+        too_large = asyncio.run(call(None, b' ' * (asgi_app.MAX_BODY_BYTES + 1)))
+        explained = asyncio.run(call(good, query=b'explain=1&top=3'))[1]
+        flask_explained = flask_client.post('/predict?explain=1&top=3', json=good).get_json()
+
+        # Same metrics, audit request ids and shutdown as the Flask app
+        import tempfile
+        import app as app_module
+        from audit import AuditLog
+        from metrics import REQUESTS, STAGE_SECONDS
+        from shadow import ShadowScorer
+        requests_before = REQUESTS.value('predict', '200')
+        stages_before = STAGE_SECONDS.count('predict', 'score')
+        with tempfile.TemporaryDirectory() as tmp:
+            audit_log = AuditLog(os.path.join(tmp, 'predictions.jsonl'), flush_interval=60)
+            shadow_scorer = ShadowScorer([])
+            saved = app_module.audit_log, app_module.shadow_scorer, asgi_app.audit_log
+            app_module.audit_log, app_module.shadow_scorer, asgi_app.audit_log = audit_log, shadow_scorer, audit_log
+            try:
+                asyncio.run(call(good, headers=[(b'x-request-id', b'asgi-1')]))
+                lifespan = iter([{'type': 'lifespan.shutdown'}])
+
+                async def receive_lifespan():
+                    return next(lifespan)
+
+                async def ignore(message):
+                    pass
+                asyncio.run(asgi_app.app({'type': 'lifespan'}, receive_lifespan, ignore))
+            finally:
+                app_module.audit_log, app_module.shadow_scorer, asgi_app.audit_log = saved
+            with open(audit_log.path) as f:
+                audited = [json.loads(line) for line in f]
+        metrics_text = asyncio.run(get('/metrics'))
+        expected = score_records(records)
+        
+        checks = {
+            'every caller answered': all(status == 200 for status, _ in responses[:-1]),
+            'results match /predict/batch': all(
+                body['disease_probability'] == r['disease_probability']
+                for (_, body), r in zip(responses, expected)
+            ),
+            'requests coalesced': stats['batches'] == 3 and stats['full_flushes'] == 2,
+            'invalid request rejected before queueing': responses[-1][0] == 400,
+            'oversized body answers 413': too_large[0] == 413 and 'too large' in too_large[1]['error'],
+            'requests and stages measured': REQUESTS.value('predict', '200') > requests_before
+                                            and STAGE_SECONDS.count('predict', 'score') > stages_before,
+            'metrics served': 'heart_requests_total{endpoint="predict",status="200"}' in metrics_text,
+            'audit rows carry the request id': [r['request_id'] for r in audited] == ['asgi-1'],
+            'shutdown closes audit log and shadows': audit_log._closed and shadow_scorer._pool._shutdown,
+            'explain and top match Flask': explained.get('contributions') == flask_explained['contributions']
+                                           and explained['baseline_logit'] == flask_explained['baseline_logit'],
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing micro-batching: {e}")
+        return False
+
+
+def test_metrics_endpoint():
+    """Test if /metrics exposes counters and stage histograms"""
+    print("\n" + "=" * 60)
+    print("Testing Metrics Endpoint...")
+    print("=" * 60)
+    
+    try:
+        import metrics
+        from app import app
+        client = app.test_client()
+        
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        requests_before = metrics.REQUESTS.value('predict', '200')
+        failures_before = metrics.VALIDATION_FAILURES.value('predict')
+        client.post('/predict', json=dict(good, chol=321))
+        client.post('/predict', json=dict(good, age=5))
+        response = client.get('/metrics')
+        text = response.data.decode()
+        
+        checks = {
+            'Prometheus content type': response.mimetype == 'text/plain',
+            'request counted': metrics.REQUESTS.value('predict', '200') == requests_before + 1,
+            'validation failure counted': metrics.VALIDATION_FAILURES.value('predict') == failures_before + 1,
+            'stage histogram exported': 'heart_stage_duration_seconds_bucket{endpoint="predict",stage="validate",le="+Inf"}' in text,
+            'cache counters exported': 'heart_prediction_cache_events_total{event="hits"}' in text,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing metrics endpoint: {e}")
+        return False
+
+
+def test_benchmark_suite():
+    """Test if benchmark data is reproducible and regressions are detected"""
+    print("\n" + "=" * 60)
+    print("Testing Benchmark Suite...")
+    print("=" * 60)
+    
+    try:
+        import numpy as np
+        import benchmarks
+        from schema import schema
+        
+        features = benchmarks.synthetic_features(500)
+        baseline = {'predict': 0.001, 'score_1000': 0.002}
+        regressions = benchmarks.compare({'predict': 0.0014, 'score_1000': 0.0021, 'new': 1.0}, baseline, 0.25)
+        
+        checks = {
+            'synthetic data is seeded': np.array_equal(features, benchmarks.synthetic_features(500)),
+            'synthetic data passes validation': all(m is None for m in schema.validate(features)),
+            'regression beyond threshold flagged': [r[0] for r in regressions] == ['predict'],
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing benchmark suite: {e}")
+        return False
+
+
+def test_hyperparameter_search():
+    """Test if the cross-validated search covers every path and ranks results"""
+    print("\n" + "=" * 60)
+    print("Testing Hyperparameter Search...")
+    print("=" * 60)
+
+    try:
+        import numpy as np
+        import benchmarks
+        import train_model
+
+        rng = np.random.default_rng(0)
+        X = benchmarks.synthetic_features(200)
+        y = (X[:, 0] + rng.normal(scale=10, size=200) > 54).astype(int)
+        best, cv_results = train_model.search_hyperparameters(X, y, folds=3, n_jobs=1)
+        scores = [r['mean_score'] for r in cv_results]
+
+        checks = {
+            'every configuration scored': len(cv_results) == len(train_model.SEARCH_PATHS) * len(train_model.SEARCH_C_VALUES),
+            'results sorted best first': scores == sorted(scores, reverse=True),
+            'best params match top result': best == {k: cv_results[0][k] for k in ('solver', 'penalty', 'C')},
+            'search is reproducible': train_model.search_hyperparameters(X, y, folds=3, n_jobs=1)[0] == best,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing hyperparameter search: {e}")
+        return False
+
+
+def test_bootstrap_evaluation():
+    """Test if vectorized bootstrap metrics match sklearn and the intervals are reproducible"""
+    print("\n" + "=" * 60)
+    print("Testing Bootstrap Evaluation...")
+    print("=" * 60)
+
+    try:
+        import numpy as np
+        from sklearn.metrics import accuracy_score, roc_auc_score, precision_score, recall_score
+        from evaluation import batch_metrics, bootstrap, format_report
+
+        rng = np.random.default_rng(0)
+        y = rng.integers(0, 2, 80).astype(bool)
+        # Rounded scores so resamples contain ties
+        score = np.round(np.clip(0.3 * y + 0.7 * rng.random(80), 0, 1), 2)
+        _, ranks = np.unique(score, return_inverse=True)
+        idx = rng.integers(0, 80, size=(100, 80))
+        vectorized = batch_metrics(y, score >= 0.5, ranks, ranks.max() + 1, idx)
+        looped = np.array([[accuracy_score(y[i], score[i] >= 0.5), roc_auc_score(y[i], score[i]),
+                            precision_score(y[i], score[i] >= 0.5), recall_score(y[i], score[i] >= 0.5)]
+                           for i in idx])
+
+        report = bootstrap(y, score, n_resamples=1200)
+        parallel = bootstrap(y, score, n_resamples=1200, n_jobs=2)
+        auc = report['metrics']['roc_auc']
+        one_class_report = bootstrap(np.ones(5), score[:5], n_resamples=50)
+        one_class = one_class_report['metrics']['roc_auc']
+        try:
+            strict_json = json.loads(json.dumps(one_class_report, allow_nan=False))['metrics']['roc_auc']
+            printable = 'n/a' in format_report(one_class_report)
+        except ValueError:
+            strict_json, printable = None, False
+        import train_model
+        try:
+            train_model.main(['--stream', 'heart.csv', '--bootstrap', '100'])
+            stream_bootstrap_rejected = False
+        except SystemExit as e:
+            stream_bootstrap_rejected = e.code == 2
+
+        checks = {
+            'resample metrics match sklearn': np.allclose(vectorized, looped),
+            'point estimate matches sklearn': np.isclose(auc['estimate'], roc_auc_score(y, score)),
+            'interval contains estimate': auc['lower'] <= auc['estimate'] <= auc['upper'],
+            'same result with parallel jobs': report['metrics'] == parallel['metrics'],
+            'undefined metrics counted': one_class['undefined_resamples'] == 50,
+            'undefined metrics written as null': strict_json is not None and strict_json['estimate'] is None
+                                                 and printable,
+            '--bootstrap rejected with --stream': stream_bootstrap_rejected,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing bootstrap evaluation: {e}")
+        return False
+
+
+def test_dataset_cache():
+    """Test if the cleaned dataset cache round-trips and detects stale sources"""
+    print("\n" + "=" * 60)
+    print("Testing Dataset Cache...")
+    print("=" * 60)
+
+    try:
+        import tempfile
+        import time
+        import pandas as pd
+        import dataset_cache
+        from train_model import clean_dataset
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'heart.csv')
+            cache_dir = os.path.join(tmp, 'cache')
+            with open(source, 'w') as f:
+                f.write('age,sex,chol,target\n63,1,233,1\n41,?,204,0\n57,0,354.5,2\n')
+
+            key = dataset_cache.cache_key(source, clean_dataset, cache_dir)
+            miss = dataset_cache.load(key, cache_dir)
+            df = clean_dataset(pd.read_csv(source))
+            dataset_cache.save(key, df, cache_dir)
+            cached = dataset_cache.load(key, cache_dir)
+            same_key = dataset_cache.cache_key(source, clean_dataset, cache_dir)
+
+            time.sleep(0.01)
+            with open(source, 'a') as f:
+                f.write('50,1,200,0\n')
+            stale_key = dataset_cache.cache_key(source, clean_dataset, cache_dir)
+
+            checks = {
+                'empty cache misses': miss is None,
+                'cached frame matches cleaned frame': cached is not None and cached.equals(df.reset_index(drop=True)),
+                'column dtypes preserved': cached is not None and list(cached.dtypes) == list(df.dtypes),
+                'key is stable for unchanged source': same_key == key,
+                'edited source changes key': stale_key != key,
+                'cleaning logic is part of key': dataset_cache.cache_key(source, test_dataset_cache, cache_dir) != stale_key,
+            }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing dataset cache: {e}")
+        return False
+
+
+def test_online_learning():
+    """Test if feedback updates a candidate that is promoted only past the holdout check"""
+    print("\n" + "=" * 60)
+    print("Testing Online Learning...")
+    print("=" * 60)
+
+    try:
+        import shutil
+        import tempfile
+        import numpy as np
+        import benchmarks
+        from app import app
+        from registry import ModelRegistry
+        from online_learning import OnlineLearner
+
+        disabled = app.test_client().post('/feedback', json={'age': 45, 'target': 1})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            models_dir = os.path.join(tmp, 'models')
+            shutil.copytree('models', models_dir)
+            registry = ModelRegistry(models_dir)
+            registry.reload()
+            original = registry.current.version
+            learner = OnlineLearner(registry, models_dir, batch_size=32, min_holdout=40)
+
+            # Labels from a concept the served model has never seen
+            X = benchmarks.synthetic_features(600, seed=7)
+            y = (X[:, 0] > 55).astype(int)
+            learner.submit(X[:100], y[:100])
+            too_little_holdout = learner.step()
+            learner.submit(X[100:], y[100:])
+            result = learner.step()
+            stats = learner.stats()
+
+            # Noise labels must not displace the promoted model
+            promoted = registry.current.version
+            learner.submit(X[:300], 1 - y[:300])
+            noisy = learner.step()
+            noisy_kept_promoted = registry.current.version == promoted
+            lineage = registry.current.metadata['parent_version']
+
+            # A retrained model landing mid-step: the registry runs its callbacks holding the
+            # reload lock while the step holds the train lock and wants to promote
+            import threading
+            in_reload, step_locked, swapped = threading.Event(), threading.Event(), threading.Event()
+
+            def hold_reload(artifact):
+                in_reload.set()
+                step_locked.wait(2)
+            registry._listeners.insert(0, hold_reload)
+            registry.on_swap(lambda artifact: swapped.set())
+            original_check = learner.check
+
+            def check_during_reload():
+                in_reload.wait(2)
+                step_locked.set()
+                swapped.wait(2)
+                return original_check()
+            learner.check = check_during_reload
+            learner.submit(X[:300], y[:300])
+            outcome = {}
+            threads = [
+                threading.Thread(target=lambda: (shutil.copy(os.path.join('models', 'heart_disease_model.hdp'),
+                                                             models_dir), registry.reload()), daemon=True),
+                threading.Thread(target=lambda: outcome.update(result=learner.step()), daemon=True),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+            deadlocked = any(thread.is_alive() for thread in threads)
+            concurrent = outcome.get('result') or {}
+            served_after_swap = registry.current.version
+
+            # A retrain written to disk after the check but before the watcher reloads it
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.preprocessing import StandardScaler
+            from model_artifact import read_header, save_artifact
+            from schema import FEATURE_NAMES
+            registry._listeners.remove(hold_reload)
+            artifact_path = os.path.join(models_dir, 'heart_disease_model.hdp')
+            retrain_scaler = StandardScaler().fit(X)
+            retrain_model = LogisticRegression().fit(retrain_scaler.transform(X), y)
+
+            def check_then_retrain():
+                checked = original_check()
+                retrained.append(save_artifact(artifact_path, retrain_model, retrain_scaler, FEATURE_NAMES))
+                return checked
+            retrained = []
+            learner.check = check_then_retrain
+            learner.submit(X[:300], y[:300])
+            raced = learner.step()
+            learner.check = original_check
+            retrain_kept = read_header(artifact_path)[0]['model_version'] == retrained[0]
+
+            checks = {
+                'disabled endpoint answers 503': disabled.status_code == 503,
+                'holdout split off': stats['holdout'] == 120 and stats['trained_rows'] == 480,
+                'no check before enough holdout rows': too_little_holdout is None,
+                'improved candidate promoted': result['promoted'] and promoted != original,
+                'promotion lowered holdout log loss': result['candidate_log_loss'] < result['served_log_loss'],
+                'worse candidate rejected': not noisy['promoted'] and noisy_kept_promoted,
+                'promoted artifact records lineage': lineage == original,
+                'concurrent swap and step finish': not deadlocked,
+                'candidate not promoted over a newer swap': concurrent.get('superseded') is True
+                                                            and served_after_swap == original,
+                'retrain on disk not overwritten': raced['superseded'] and not raced['promoted']
+                                                   and raced['passed'] and retrain_kept,
+            }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing online learning: {e}")
+        return False
+
+
+def test_streaming_training():
+    """Test if out-of-core training matches in-memory statistics chunk by chunk"""
+    print("\n" + "=" * 60)
+    print("Testing Streaming Training...")
+    print("=" * 60)
+
+    try:
+        import tempfile
+        import numpy as np
+        import pandas as pd
+        import benchmarks
+        import train_model
+        from scorer import LinearScorer
+        from schema import FEATURE_NAMES
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'heart.csv')
+            benchmarks.write_training_csv(path, n=3000)
+            model, scaler, feature_names, stats = train_model.train_streaming(path, chunk_size=700, epochs=3)
+
+            df = pd.read_csv(path)
+            holdout = train_model.holdout_mask(np.arange(len(df)), 0.2)
+            train_rows = df.drop('target', axis=1).to_numpy(dtype=float)[~holdout]
+            small_chunks = sum(int(h.sum()) for _, _, h, _ in train_model.iter_training_chunks(path, 128, 0.2))
+            try:
+                train_model.train_streaming(path, chunk_size=700, epochs=0)
+                zero_epochs_rejected = False
+            except ValueError:
+                zero_epochs_rejected = True
+
+        checks = {
+            'feature order matches schema': feature_names == FEATURE_NAMES,
+            'holdout split is chunk-size independent': small_chunks == int(holdout.sum()),
+            'incremental scaler matches full fit': np.allclose(scaler.mean_, train_rows.mean(axis=0))
+                                                   and np.allclose(scaler.scale_, train_rows.std(axis=0)),
+            'holdout accuracy reasonable': stats['holdout']['accuracy'] > 0.75,
+            'best epoch kept': stats['holdout']['log_loss'] == min(h['log_loss'] for h in stats['history']),
+            'exports to the serving scorer': LinearScorer.from_sklearn(model, scaler).verify(model, scaler),
+            'zero epochs rejected': zero_epochs_rejected,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing streaming training: {e}")
+        return False
+
+
+def test_startup():
+    """Test if a fresh import stays within the startup budget and reports ready"""
+    print("\n" + "=" * 60)
+    print("Testing Startup...")
+    print("=" * 60)
+
+    try:
+        import subprocess
+        from app import app, registry
+
+        probe = ("import json, sys, app; print(json.dumps(dict(app.startup, "
+                 "heavy=[m for m in ('sklearn', 'pandas', 'pyarrow', 'msgpack', 'profiling', 'online_learning') if m in sys.modules])))")
+        output = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+        startup = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"  import {startup['import_seconds'] * 1000:.1f} ms, load {startup['load_seconds'] * 1000:.1f} ms, "
+              f"warmup {startup['warmup_seconds'] * 1000:.1f} ms (budget {startup['budget_seconds']} s)")
+
+        client = app.test_client()
+        ready = client.get('/readyz')
+        current, registry.current = registry.current, None
+        try:
+            not_ready = client.get('/readyz')
+        finally:
+            registry.current = current
+
+        checks = {
+            'startup within budget': startup['within_budget'],
+            'model warmed before serving': startup.get('warmed_version') is not None,
+            'heavy optional modules not imported': startup['heavy'] == [],
+            'liveness probe': client.get('/healthz').status_code == 200,
+            'ready once warmed': ready.status_code == 200 and ready.get_json()['ready'],
+            'not ready without a model': not_ready.status_code == 503,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing startup: {e}")
+        return False
+
+
+def test_explanations():
+    """Test if per-feature contributions add up to the logit and are sorted"""
+    print("\n" + "=" * 60)
+    print("Testing Prediction Explanations...")
+    print("=" * 60)
+
+    try:
+        import math
+        import numpy as np
+        import pandas as pd
+        import benchmarks
+        from app import app, registry
+        from bulk_score import score_frame, CONTRIBUTION_COLUMNS
+
+        client = app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+
+        plain = client.post('/predict', json=good).get_json()
+        explained = client.post('/predict?explain=1', json=good).get_json()
+        top = client.post('/predict?explain=1&top=3', json=good).get_json()
+        batch = client.post('/predict/batch?explain=1', json=[good, dict(good, age=150)]).get_json()
+
+        p = explained['disease_probability'] / 100
+        logit = math.log(p / (1 - p))
+        contributions = explained['contributions']
+        magnitudes = [abs(c) for _, c in contributions]
+
+        records = benchmarks.synthetic_records(200)
+        frame = score_frame(pd.DataFrame(records).astype(str), registry.current.scorer, explain=True)
+        scorer = registry.current.scorer
+        features = benchmarks.synthetic_features(200)
+        frame_logits = frame[CONTRIBUTION_COLUMNS].to_numpy().sum(axis=1) + scorer.baseline
+
+        checks = {
+            'prediction unchanged': explained['disease_probability'] == plain['disease_probability'],
+            'not added unless requested': 'contributions' not in plain,
+            'all features explained': sorted(f for f, _ in contributions) == sorted(good),
+            'contributions sum to logit': abs(explained['baseline_logit'] + sum(c for _, c in contributions) - logit) < 1e-9,
+            'sorted by magnitude': magnitudes == sorted(magnitudes, reverse=True),
+            'top limits features': top['contributions'] == contributions[:3],
+            'batch rows explained': batch['results'][0]['contributions'] == contributions,
+            'invalid rows not explained': 'contributions' not in batch['results'][1],
+            'bulk columns match logits': np.allclose(frame_logits, scorer.logits(features)),
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing explanations: {e}")
+        return False
+
+
+def test_response_formats():
+    """Test if batch results round-trip through columnar JSON, MessagePack and Arrow"""
+    print("\n" + "=" * 60)
+    print("Testing Response Formats...")
+    print("=" * 60)
+
+    try:
+        import encoders
+        from app import app
+
+        client = app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        records = [good, dict(good, age=150), dict(good, chol='high')]
+        columns = {name: [r[name] for r in records] for name in good}
+
+        rows = client.post('/predict/batch', json=records).get_json()
+        by_column = client.post('/predict/batch', json={'columns': columns}).get_json()
+        columnar = client.post('/predict/batch?orient=columns', json=records).get_json()
+        ragged = client.post('/predict/batch', json={'columns': {'age': [45, 50], 'sex': [1]}})
+        unsupported = client.post('/predict/batch', data='age\n45', content_type='text/csv')
+        probability = rows['results'][0]['disease_probability']
+
+        checks = {
+            'columnar input matches rows': by_column['results'] == rows['results'],
+            'columnar output matches rows': columnar['columns']['disease_probability'][0] == probability,
+            'errors kept per row': columnar['columns']['error'][1:] == [r['error'] for r in rows['results'][1:]],
+            'invalid rows null': columnar['columns']['disease_probability'][1] is None,
+            'ragged columns rejected': ragged.status_code == 400,
+            'unknown content type rejected': unsupported.status_code == 415,
+        }
+
+        if encoders.HAS_MSGPACK:
+            import msgpack
+            packed = client.post('/predict/batch', data=msgpack.packb(records),
+                                 content_type='application/msgpack', headers={'Accept': 'application/msgpack'})
+            unpacked = msgpack.unpackb(packed.data)
+            checks['msgpack negotiated'] = packed.mimetype == encoders.MSGPACK
+            checks['msgpack round-trip'] = unpacked['columns']['disease_probability'][0] == probability
+        else:
+            print("⚠ msgpack not installed, skipping MessagePack checks")
+
+        if encoders.HAS_PYARROW:
+            import pyarrow as pa
+            table = pa.table(dict(columns, chol=[200, 200, 200]))
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            arrow = client.post('/predict/batch', data=sink.getvalue().to_pybytes(),
+                                content_type=encoders.ARROW, headers={'Accept': encoders.ARROW})
+            result = pa.ipc.open_stream(arrow.data).read_all()
+            checks['arrow negotiated'] = arrow.mimetype == encoders.ARROW
+            checks['arrow round-trip'] = result.column('success').to_pylist() == [True, False, True]
+            checks['arrow metadata'] = result.schema.metadata[b'count'] == b'3'
+
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            arrow_file = client.post('/predict/batch', data=sink.getvalue().to_pybytes(),
+                                     content_type=encoders.ARROW_FILE, headers={'Accept': encoders.ARROW_FILE})
+            result = pa.ipc.open_file(pa.py_buffer(arrow_file.data)).read_all()
+            checks['arrow file format round-trip'] = (arrow_file.mimetype == encoders.ARROW_FILE and
+                                                      result.column('success').to_pylist() == [True, False, True])
+            garbled = client.post('/predict/batch', data=b'not arrow', content_type=encoders.ARROW_FILE)
+            checks['undecodable body reported'] = (garbled.status_code == 400 and
+                                                   garbled.get_json()['error'].startswith('Could not decode'))
+        else:
+            print("⚠ pyarrow not installed, skipping Arrow checks")
+
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing response formats: {e}")
+        return False
+
+
+def test_load_test():
+    """Test if the load-test harness launches a topology, measures it and recommends one"""
+    print("\n" + "=" * 60)
+    print("Testing Load Test Harness...")
+    print("=" * 60)
+
+    try:
+        import subprocess
+        import tempfile
+        import loadtest
+        from benchmarks import synthetic_records
+
+        combos = loadtest.topologies([1, 2], [1, 4], ['sync', 'gthread', 'uvicorn'])
+        rows = [
+            {'worker_class': 'sync', 'workers': 2, 'threads': 1, 'endpoint': 'predict', 'requests': 100,
+             'errors': 0, 'requests_per_second': 500, 'p99_ms': 30},
+            {'worker_class': 'sync', 'workers': 2, 'threads': 1, 'endpoint': 'batch_100', 'requests': 10,
+             'errors': 0, 'requests_per_second': 50, 'p99_ms': 60},
+            {'worker_class': 'gthread', 'workers': 1, 'threads': 4, 'endpoint': 'predict', 'requests': 100,
+             'errors': 0, 'requests_per_second': 400, 'p99_ms': 10},
+            {'worker_class': 'gthread', 'workers': 1, 'threads': 4, 'endpoint': 'batch_100', 'requests': 10,
+             'errors': 0, 'requests_per_second': 40, 'p99_ms': 60},
+            {'worker_class': 'uvicorn', 'workers': 1, 'threads': 1, 'endpoint': 'predict', 'requests': 100,
+             'errors': 0, 'requests_per_second': 900, 'p99_ms': 5},
+        ]
+
+        # gunicorn.conf.py takes its settings from the env file, unless set in the environment
+        with tempfile.TemporaryDirectory() as tmp:
+            env_file = os.path.join(tmp, 'server.env')
+            with open(env_file, 'w') as f:
+                f.write('\n'.join(loadtest.env_lines(rows[2])) + '\n')
+            probe = 'import runpy, json; c = runpy.run_path("gunicorn.conf.py"); ' \
+                    'print(json.dumps([c["worker_class"], c["workers"], c["threads"], c["wsgi_app"]]))'
+            env = {k: v for k, v in os.environ.items() if not k.startswith('SERVER_') and k != 'WEB_CONCURRENCY'}
+            loaded = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True,
+                                    env=dict(env, SERVER_ENV_FILE=env_file, SERVER_WORKERS='3'))
+            settings = json.loads(loaded.stdout.strip().splitlines()[-1])
+            defaults = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True,
+                                      env=dict(env, SERVER_ENV_FILE=''))
+            default_workers = json.loads(defaults.stdout.strip().splitlines()[-1])[1]
+            from_file = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True,
+                                       env=dict(env, SERVER_ENV_FILE=env_file))
+            file_workers = json.loads(from_file.stdout.strip().splitlines()[-1])[1]
+
+        port = loadtest.free_port()
+        server = loadtest.launch('gthread', 1, 2, port)
+        try:
+            bodies = [json.dumps(record).encode() for record in synthetic_records(10)]
+            measured = loadtest.drive(port, '/predict', bodies, concurrency=2, duration=0.5)
+        finally:
+            loadtest.stop(server)
+
+        checks = {
+            'threads only swept for gthread': len(combos) == 2 + 4 + 2,
+            'fastest full-API topology': loadtest.recommend(rows)['worker_class'] == 'sync',
+            'p99 budget respected': loadtest.recommend(rows, max_p99_ms=20)['worker_class'] == 'gthread',
+            'uvicorn when swept alone': loadtest.recommend(rows[4:])['worker_class'] == 'uvicorn',
+            'env file applied': settings[0] == 'gthread' and settings[2] == 4,
+            'environment wins': settings[1] == 3,
+            'four workers by default': default_workers == 4,
+            'env file overrides default workers': file_workers == rows[2]['workers'],
+            'server measured': measured['requests'] > 0 and measured['errors'] == 0,
+            'percentiles ordered': measured['p50_ms'] <= measured['p95_ms'] <= measured['p99_ms'],
+            'table rendered': 'p99 ms' in loadtest.format_table([dict(rows[0], **measured)]),
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing load test harness: {e}")
+        return False
+
+
+def test_audit_log():
+    """Test if predictions are audited off the request path with bounded, counted overflow"""
+    print("\n" + "=" * 60)
+    print("Testing Audit Log...")
+    print("=" * 60)
+
+    try:
+        import sqlite3
+        import subprocess
+        import tempfile
+        import numpy as np
+        import app as app_module
+        from audit import AuditLog
+
+        client = app_module.app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        features = np.zeros((4, 13))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'audit', 'predictions.jsonl')
+            audit_log = AuditLog(path, flush_interval=60)
+            previous, app_module.audit_log = app_module.audit_log, audit_log
+            try:
+                single = client.post('/predict', json=good).get_json()
+                client.post('/predict', json=dict(good, age=150))
+                client.post('/predict/batch', json=[good, dict(good, chol='high')],
+                            headers={'X-Request-ID': 'batch-1'})
+                queued_before_flush = audit_log.stats()['queued']
+                flushed = audit_log.flush()
+            finally:
+                app_module.audit_log = previous
+                audit_log.close()
+            with open(audit_log.path) as f:
+                rows = [json.loads(line) for line in f]
+
+            # Overflow: 5 records of 4 rows into a 10-row queue the writer has not drained yet
+            counts = {}
+            for policy in ('drop_newest', 'drop_oldest'):
+                db = os.path.join(tmp, f'{policy}.db')
+                log = AuditLog(db, backend='sqlite', queue_size=10, overflow=policy, flush_interval=60)
+                accepted = [log.record('test', 'v1', features, [1] * 4, [50.0] * 4, [None] * 4) for _ in range(5)]
+                log.close()
+                stored = sqlite3.connect(db).execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+                counts[policy] = (accepted, log.stats()['dropped'], stored)
+
+            rotating = AuditLog(os.path.join(tmp, 'rotate.jsonl'), max_bytes=2000, backup_count=2, batch_size=5)
+            for _ in range(10):
+                rotating.record('test', 'v1', features, [1] * 4, [50.0] * 4, [None] * 4)
+                rotating.flush()
+            rotating.close()
+            rotate_name = os.path.basename(rotating.path)
+            rotated = sorted(name for name in os.listdir(tmp) if name.startswith('rotate'))
+
+            # Two processes writing the same configured path, rotating often
+            shared = os.path.join(tmp, 'shared', 'predictions.jsonl')
+            writer = ('import numpy as np, sys; from audit import AuditLog; '
+                      'log = AuditLog(sys.argv[1], max_bytes=3000, backup_count=1000, batch_size=4); '
+                      '[(log.record("test", "v1", np.zeros((4, 13)), [1] * 4, [50.0] * 4, [None] * 4), log.flush()) '
+                      'for _ in range(50)]; log.close()')
+            processes = [subprocess.Popen([sys.executable, '-c', writer, shared]) for _ in range(2)]
+            for process in processes:
+                process.wait(60)
+            shared_files = os.listdir(os.path.dirname(shared))
+            shared_rows = 0
+            for name in shared_files:
+                with open(os.path.join(os.path.dirname(shared), name)) as f:
+                    shared_rows += sum(1 for _ in f)
+            shared_pids = {name.split('.')[1] for name in shared_files}
+
+        checks = {
+            'queued, not written inline': queued_before_flush == 4,
+            'flush drains queue': flushed and len(rows) == 4,
+            'inputs and model recorded': rows[0]['inputs']['chol'] == 200 and rows[0]['model_version'] == single['model_version'],
+            'outputs match response': rows[0]['disease_probability'] == single['disease_probability'],
+            'rejected request audited': rows[1]['error'] == 'Age must be between 20 and 100',
+            'request id propagated': [r['request_id'] for r in rows[2:]] == ['batch-1', 'batch-1'],
+            'bad row audited': rows[3]['row'] == 1 and rows[3]['prediction'] is None,
+            'drop_newest counts drops': counts['drop_newest'] == ([True, True, False, False, False], 12, 8),
+            'drop_oldest keeps newest': counts['drop_oldest'] == ([True] * 5, 12, 8),
+            'close writes queued rows': counts['drop_newest'][2] == 8,
+            'rotation bounded': rotated == [rotate_name, rotate_name + '.1', rotate_name + '.2'],
+            'file per process': audit_log.path == os.path.join(tmp, 'audit', f'predictions.{os.getpid()}.jsonl')
+                                and shared_pids == {str(p.pid) for p in processes},
+            'concurrent rotation loses nothing': shared_rows == 2 * 50 * 4,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing audit log: {e}")
+        return False
+
+
+def test_drift_monitor():
+    """Test if scored rows are profiled incrementally and compared with the training reference"""
+    print("\n" + "=" * 60)
+    print("Testing Drift Monitor...")
+    print("=" * 60)
+
+    try:
+        import tempfile
+        import numpy as np
+        import app as app_module
+        from benchmarks import synthetic_features
+        from drift import DriftMonitor, FeatureProfile, load_reference, save_reference
+        from schema import FEATURE_NAMES
+
+        X = synthetic_features(2000, seed=1)
+        whole = FeatureProfile()
+        whole.update(X)
+        pieces = FeatureProfile()
+        for i in range(50):
+            pieces.update(X[i:i + 1])
+        pieces.update(X[50:700])
+        pieces.update(X[700:])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            save_reference(whole, os.path.join(tmp, 'drift_reference.json'), {'model_version': 'test'})
+            restored, info = load_reference(os.path.join(tmp, 'drift_reference.json'))
+
+            monitor = DriftMonitor(tmp, min_rows=100)
+            monitor.load()
+            monitor.update(X[:50])
+            early = monitor.report()['status']
+            monitor.update(synthetic_features(1000, seed=2))
+            same = monitor.report()
+            monitor.load()
+            kept = monitor.report()['rows'] == 1050
+
+            shifted = synthetic_features(1000, seed=3)
+            age = monitor.live.names.index('age')
+            shifted[:, age] = np.clip(shifted[:, age] + 25, 20, 100)
+            monitor.reset()
+            monitor.update(shifted)
+            drifted = monitor.report()
+
+            # A retrain publishes its artifact only after the matching drift reference
+            import train_model
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.preprocessing import StandardScaler
+            from model_artifact import read_header
+            y = (X[:, 0] > 55).astype(int)
+            scaler = StandardScaler().fit(X)
+            model = LogisticRegression().fit(scaler.transform(X), y)
+            artifact_seen = []
+            original_save_reference = train_model.save_reference
+
+            def save_reference_checked(*args, **kwargs):
+                artifact_seen.append(os.path.exists(train_model.ARTIFACT_PATH))
+                return original_save_reference(*args, **kwargs)
+            cwd = os.getcwd()
+            os.makedirs(os.path.join(tmp, 'train', 'models'))
+            os.chdir(os.path.join(tmp, 'train'))
+            train_model.save_reference = save_reference_checked
+            try:
+                version = train_model.save_outputs(model, scaler, FEATURE_NAMES, {}, {}, reference=whole)
+                published = read_header(train_model.ARTIFACT_PATH)[0]['model_version']
+                _, trained_info = load_reference(train_model.REFERENCE_PATH)
+                staged_left = os.path.exists(train_model.ARTIFACT_PATH + '.staged')
+            finally:
+                train_model.save_reference = original_save_reference
+                os.chdir(cwd)
+
+        client = app_module.app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        live = app_module.drift_monitor
+        if live is not None:
+            before = live.report().get('rows', 0)
+            client.post('/predict', json=good)
+            client.post('/predict/batch', json=[good, dict(good, age=150)])
+            counted = live.report().get('rows', 0) - before == 2
+        response = client.get('/api/drift')
+        body = response.get_json()
+
+        checks = {
+            'reference written before the artifact': artifact_seen == [False] and not staged_left
+                                                     and published == version == trained_info['model_version'],
+            'moments match numpy': np.allclose(pieces.mean, X.mean(axis=0)) and np.allclose(pieces.std, X.std(axis=0)),
+            'bin counts order-independent': (pieces.counts == whole.counts).all(),
+            'reference round-trips': (restored.counts == whole.counts).all() and info['model_version'] == 'test',
+            'too few rows not judged': early == 'insufficient_data',
+            'same distribution ok': same['status'] == 'ok' and not same['drifting_features'],
+            'reload keeps live stats': kept,
+            'shift flagged': drifted['status'] == 'alert' and drifted['drifting_features'][0] == 'age',
+            'mean shift reported': drifted['features']['age']['mean_shift'] > 0.5,
+            'valid scored rows counted': live is None or counted,
+            '/api/drift served': live is None or (response.status_code == 200 and set(body['features']) == set(whole.names)),
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing drift monitor: {e}")
+        return False
+
+
+def test_shadow_models():
+    """Test if shadow models score live traffic off the request path and shed past their bound"""
+    print("\n" + "=" * 60)
+    print("Testing Shadow Models...")
+    print("=" * 60)
+
+    try:
+        import tempfile
+        import threading
+        import numpy as np
+        import app as app_module
+        from model_artifact import save_artifact
+        from shadow import ShadowScorer, ShadowModel, load_shadow
+
+        client = app_module.app.test_client()
+        good = {'age': 45, 'sex': 1, 'cp': 1, 'trestbps': 130, 'chol': 200,
+                'fbs': 0, 'restecg': 1, 'thalach': 150, 'exang': 0,
+                'oldpeak': 1.5, 'slope': 1, 'ca': 0, 'thal': 2}
+        records = [dict(good, age=age, chol=chol) for age in range(30, 80, 5) for chol in (180, 240, 300)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # A candidate that always predicts disease, and a copy of the served model
+            with open('models/heart_disease_model.pkl', 'rb') as f:
+                model = pickle.load(f)
+            with open('models/scaler.pkl', 'rb') as f:
+                scaler = pickle.load(f)
+            model.coef_ = model.coef_ * 0
+            model.intercept_ = model.intercept_ * 0 + 10
+            save_artifact(os.path.join(tmp, 'always.hdp'), model, scaler, app_module.FEATURE_NAMES)
+            always = load_shadow(os.path.join(tmp, 'always.hdp'))
+            same = ShadowModel(app_module.registry.current)
+
+            scorer = ShadowScorer([same, always])
+            baseline = client.post('/predict', json=good).get_json()
+            previous, app_module.shadow_scorer = app_module.shadow_scorer, scorer
+            try:
+                single = client.post('/predict', json=good).get_json()
+                batch = client.post('/predict/batch', json=records + [dict(good, age=150)]).get_json()
+                client.post('/predict/batch?orient=columns', json=records)
+                drained = scorer.drain()
+                report = client.get('/api/shadow').get_json()
+            finally:
+                app_module.shadow_scorer = previous
+                scorer.close()
+
+        # Shedding: a shadow blocked until released accepts only max_pending_rows
+        release = threading.Event()
+
+        class Blocked:
+            version = 'blocked'
+            path = None
+
+            class scorer:
+                @staticmethod
+                def score(features):
+                    release.wait(5)
+                    return app_module.registry.current.scorer.score(features)
+
+        blocked = ShadowScorer([ShadowModel(Blocked)], max_pending_rows=3)
+        accepted = [blocked.submit(np.zeros((1, 13)), [0], [10.0]) for _ in range(5)]
+        release.set()
+        blocked.drain()
+        shed = blocked.stats()
+        blocked.close()
+
+        stats = {s['model_version']: s for s in report['shadows']}
+        same_stats = stats[app_module.registry.current.version]
+        always_stats = stats[always.name]
+        primary_positives = sum(r['prediction'] for r in batch['results'][:-1]) * 2 + single['prediction']
+        rows = 1 + 2 * len(records)
+
+        checks = {
+            'primary answer unchanged': single == baseline,
+            'all valid rows shadowed': drained and report['scored_rows'] == rows and report['shed_rows'] == 0,
+            'identical shadow agrees': same_stats['agreement_rate'] == 1.0 and same_stats['max_abs_probability_diff'] < 1e-9,
+            'disagreement measured': abs(always_stats['agreement_rate'] - primary_positives / rows) < 1e-9,
+            'positive rates reported': always_stats['shadow_positive_rate'] == 1.0,
+            'latency reported': always_stats['batches'] == 3 and always_stats['mean_batch_ms'] > 0,
+            'excess rows shed': accepted == [True, True, True, False, False] and shed['shed_rows'] == 2,
+            'accepted rows scored': shed['scored_rows'] == 3 and shed['pending_rows'] == 0,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing shadow models: {e}")
+        return False
+
+
+def test_request_profiling():
+    """Test if opted-in requests are profiled into a bounded directory"""
+    print("\n" + "=" * 60)
+    print("Testing Request Profiling...")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        from flask import Flask
+        from profiling import RequestProfiler
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            demo = Flask('profiling_demo')
+            demo.add_url_rule('/work', 'work', lambda: str(sum(range(10000))))
+            profiler = RequestProfiler(directory=tmp, max_files=2, admin_token='secret')
+            profiler.init_app(demo)
+            client = demo.test_client()
+            admin = {'X-Profile': '1', 'X-Admin-Token': 'secret'}
+            
+            client.get('/work')
+            client.get('/work', headers={'X-Profile': '1'})
+            unprofiled = profiler.profiled == 0
+            for _ in range(3):
+                client.get('/work', headers=admin)
+            forbidden = client.get('/debug/profiles').status_code
+            index = client.get('/debug/profiles', headers=admin).get_json()
+            names = [d['name'] for d in index['dumps']]
+
+            # No admin token configured: header ignored, dumps not served
+            open_demo = Flask('profiling_open')
+            open_demo.add_url_rule('/work', 'work', lambda: 'ok')
+            tokenless = RequestProfiler(directory=os.path.join(tmp, 'open'))
+            tokenless.init_app(open_demo)
+            open_client = open_demo.test_client()
+            open_client.get('/work', headers={'X-Profile': '1'})
+            tokenless_listing = open_client.get('/debug/profiles').status_code
+        
+        checks = {
+            'requests without header and token are not profiled': unprofiled,
+            'header with admin token triggers profiling': profiler.profiled == 3,
+            'dump listing requires the token': forbidden == 403,
+            'header ignored without a configured token': tokenless.profiled == 0 and tokenless_listing == 403,
+            'directory bounded to max_files': sum(n.endswith('.prof') for n in names) == 2,
+            'memory report written alongside': sum(n.endswith('.mem.txt') for n in names) == 2,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing request profiling: {e}")
+        return False
+
+
+def test_input_schema():
+    """Test if the compiled schema validates rows like /predict does"""
+    print("\n" + "=" * 60)
+    print("Testing Input Schema...")
+    print("=" * 60)
+    
+    try:
+        import numpy as np
+        from schema import FEATURE_NAMES, schema
+        from app import validate_inputs
+        
+        row = [45, 1, 1, 130, 200, 0, 1, 150, 0, 1.5, 1, 0, 2]
+        features = np.array([row] * 6, dtype=float)
+        features[1, FEATURE_NAMES.index('fbs')] = 2
+        features[2, FEATURE_NAMES.index('oldpeak')] = np.nan
+        features[3, FEATURE_NAMES.index('slope')] = 1.5
+        features[4, FEATURE_NAMES.index('age')] = 45.5
+        features[5, FEATURE_NAMES.index('age')] = 10.5
+        messages = schema.validate(features)
+        
+        checks = {
+            'valid row accepted': messages[0] is None,
+            'fbs checked': messages[1] == 'Fasting blood sugar must be 0 (No) or 1 (Yes)',
+            'oldpeak checked': messages[2] == 'ST depression must be between 0 and 10',
+            'non-integer category rejected': messages[3] == 'Slope of ST segment must be 0-2',
+            'fractional int rejected': messages[4] == 'Invalid input format: age must be a whole number',
+            'out-of-range fraction reports range': messages[5] == 'Age must be between 20 and 100',
+            'fractional /predict rejected': not validate_inputs(dict(zip(FEATURE_NAMES, row), sex=0.5))['valid'],
+            'validate_inputs agrees': validate_inputs(dict(zip(FEATURE_NAMES, row)))['valid'],
+            'bad format rejected': not validate_inputs({'age': 'abc'})['valid'],
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing input schema: {e}")
+        return False
+
+
+def test_streamlit_upload():
+    """Test if Streamlit CSV uploads are scored like the bulk scoring CLI"""
+    print("\n" + "=" * 60)
+    print("Testing Streamlit Upload Scoring...")
+    print("=" * 60)
+
+    try:
+        import io
+        import tempfile
+        import pandas as pd
+        import bulk_score
+        import streamlit_app
+
+        content = (
+            b'age,sex,cp,trestbps,chol,fbs,restecg,thalach,exang,oldpeak,slope,ca,thal\n'
+            b'45,1,1,130,200,0,1,150,0,1.5,1,0,2\n'
+            b'50,1,1,130,,0,1,150,0,1.5,1,0,2\n'
+            b'55,1,1,130,NA,0,1,150,0,1.5,1,0,2\n'
+            b'60, 1, 1, 130, 240, 0, 1, 150, 0, 1.5, 1, 0, 2\n'
+            b'65,1,1,130,200,0,1,150,0,1.5,1,0,7\n'
+        )
+        scorer = bulk_score.load_scorer()
+        chunk_rows = streamlit_app.UPLOAD_CHUNK_ROWS
+        streamlit_app.UPLOAD_CHUNK_ROWS = 2
+        try:
+            results, csv_bytes = streamlit_app.score_upload(content, 'test-upload', scorer)
+        finally:
+            streamlit_app.UPLOAD_CHUNK_ROWS = chunk_rows
+
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, 'patients.csv')
+            output_path = os.path.join(tmp, 'scores.csv')
+            with open(input_path, 'wb') as f:
+                f.write(content)
+            bulk_score.run(input_path, output_path, workers=1)
+            offline = pd.read_csv(output_path, keep_default_na=False)
+
+        downloaded = pd.read_csv(io.BytesIO(csv_bytes))
+        checks = {
+            'every row scored': len(results) == 5 and len(downloaded) == 5,
+            'blank cell is invalid format': results['error'][1] == 'Invalid input format',
+            'NA cell is invalid format': results['error'][2] == 'Invalid input format',
+            'spaces after commas accepted': bool(results['success'][3]),
+            'out-of-range value reported': results['error'][4] == 'Thalassemia type must be 0-3',
+            'errors match bulk scoring': list(results['error'].fillna('')) == list(offline['error']),
+            'input columns kept': list(results.columns[:13]) == bulk_score.FEATURE_NAMES,
+        }
+        all_ok = True
+        for check, result in checks.items():
+            status = "✓" if result else "✗"
+            print(f"{status} {check}")
+            if not result:
+                all_ok = False
+        print("\nResult: " + ("PASSED" if all_ok else "FAILED"))
+        return all_ok
+    except Exception as e:
+        print(f"✗ Error testing Streamlit upload scoring: {e}")
+        return False
+
+
 def test_html_structure():
     """Test if HTML file is properly structured"""
     print("\n" + "=" * 60)
@@ -210,7 +1806,31 @@ def main():
     
     if results['Model Files']:
         results['Model Prediction'] = test_model_prediction()
+        results['Batch Prediction'] = test_batch_prediction()
+        results['Stream Prediction'] = test_stream_prediction()
+        results['Bulk Scoring'] = test_bulk_scoring()
+        results['Prediction Cache'] = test_prediction_cache()
+        results['Model Artifact'] = test_model_artifact()
+        results['Hot Reload'] = test_hot_reload()
+        results['Micro-Batching'] = test_micro_batching()
+        results['Metrics'] = test_metrics_endpoint()
+        results['Benchmark Suite'] = test_benchmark_suite()
+        results['Request Profiling'] = test_request_profiling()
+        results['Hyperparameter Search'] = test_hyperparameter_search()
+        results['Bootstrap Evaluation'] = test_bootstrap_evaluation()
+        results['Dataset Cache'] = test_dataset_cache()
+        results['Online Learning'] = test_online_learning()
+        results['Streaming Training'] = test_streaming_training()
+        results['Startup'] = test_startup()
+        results['Explanations'] = test_explanations()
+        results['Response Formats'] = test_response_formats()
+        results['Load Test'] = test_load_test()
+        results['Audit Log'] = test_audit_log()
+        results['Drift Monitor'] = test_drift_monitor()
+        results['Shadow Models'] = test_shadow_models()
+        results['Streamlit Upload'] = test_streamlit_upload()
     
+    results['Input Schema'] = test_input_schema()
     results['Streamlit App'] = test_html_structure()
     
     # Print summary
@@ -2,173 +2,606 @@
 Heart Disease Prediction Model Training Script
 This script loads the UCI Heart Disease Dataset, trains a logistic regression model,
 and saves it for use in the Flask application.
+
+Usage:
+    python train_model.py                      # single fit, as before
+    python train_model.py --search             # parallel cross-validated hyperparameter search
+    python train_model.py --search --folds 10 --n-jobs 8 --scoring accuracy
+    python train_model.py --stream registry.csv --chunk-size 200000 --epochs 5   # out-of-core
+    python train_model.py --bootstrap 10000 --bootstrap-jobs 4   # tighter CI estimates, in parallel
 """
 
+import argparse
+import json
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, get_scorer
+from joblib import Parallel, delayed
 import pickle
 import os
+import time
 import warnings
+import sklearn
+from model_artifact import ARTIFACT_PATH, save_artifact
+from drift import REFERENCE_PATH, FeatureProfile, save_reference
+from evaluation import EVALUATION_PATH, bootstrap, format_report
+import dataset_cache
 warnings.filterwarnings('ignore')
 
-# Create models directory if it doesn't exist
-if not os.path.exists('models'):
-    os.makedirs('models')
-
-# Load the dataset
-print("Loading dataset...")
+REPORT_PATH = 'models/training_report.json'
 
-# Prefer a local `heart.csv` (repo root or common locations) if available
-local_paths = [
-    'heart.csv',
-    os.path.join('data', 'heart.csv'),
-    os.path.join('datasets', 'heart.csv'),
-    r'c:\Users\User\Downloads\archive\heart.csv'
+# Hyperparameter grid for --search. Each (solver, penalty) pair is one
+# regularization path; C values are fitted in ascending order so solvers
+# that support warm starts begin from the previous (more regularized) fit.
+SEARCH_C_VALUES = [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0]
+SEARCH_PATHS = [
+    ('lbfgs', 'l2'),
+    ('liblinear', 'l1'),
+    ('liblinear', 'l2'),
+    ('saga', 'l1'),
+    ('saga', 'l2'),
 ]
+WARM_START_SOLVERS = {'lbfgs', 'saga'}
+
+
+def find_local_dataset():
+    """Return the first local heart.csv that exists, or None"""
+    # Prefer a local `heart.csv` (repo root or common locations) if available
+    local_paths = [
+        'heart.csv',
+        os.path.join('data', 'heart.csv'),
+        os.path.join('datasets', 'heart.csv'),
+        r'c:\Users\User\Downloads\archive\heart.csv'
+    ]
+    for p in local_paths:
+        if os.path.exists(p):
+            return p
+    return None
+
 
-df = None
-for p in local_paths:
-    if os.path.exists(p):
-        print(f"Found local dataset at: {p}")
+def load_dataset(path=None):
+    """Load heart.csv from a local path, the UCI URL, or a synthetic fallback"""
+    print("Loading dataset...")
+
+    df = None
+    if path is not None:
+        print(f"Found local dataset at: {path}")
         try:
-            df = pd.read_csv(p)
-            break
+            df = pd.read_csv(path)
         except Exception as e:
-            print(f"Failed to read {p}: {e}")
-
-if df is None:
-    # Fallback to UCI dataset URL
-    url = 'https://archive.ics.uci.edu/ml/machine-learning-databases/heart-disease/processed.cleveland.data'
-    column_names = [
-        'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 
-        'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'target'
-    ]
-    try:
-        df = pd.read_csv(url, names=column_names)
-    except Exception:
-        # Fallback: create a sample dataset if URL fails
-        print("Could not load from URL, creating sample dataset for demonstration...")
-        np.random.seed(42)
-        n_samples = 303
-        df = pd.DataFrame({
-            'age': np.random.randint(29, 77, n_samples),
-            'sex': np.random.randint(0, 2, n_samples),
-            'cp': np.random.randint(0, 4, n_samples),
-            'trestbps': np.random.randint(94, 200, n_samples),
-            'chol': np.random.randint(126, 564, n_samples),
-            'fbs': np.random.randint(0, 2, n_samples),
-            'restecg': np.random.randint(0, 3, n_samples),
-            'thalach': np.random.randint(60, 203, n_samples),
-            'exang': np.random.randint(0, 2, n_samples),
-            'oldpeak': np.random.uniform(0, 6.2, n_samples),
-            'slope': np.random.randint(0, 3, n_samples),
-            'ca': np.random.randint(0, 5, n_samples),
-            'thal': np.random.randint(0, 4, n_samples),
-            'target': np.random.randint(0, 2, n_samples)
+            print(f"Failed to read {path}: {e}")
+
+    if df is None:
+        # Fallback to UCI dataset URL
+        url = 'https://archive.ics.uci.edu/ml/machine-learning-databases/heart-disease/processed.cleveland.data'
+        column_names = [
+            'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+            'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'target'
+        ]
+        try:
+            df = pd.read_csv(url, names=column_names)
+        except Exception:
+            # Fallback: create a sample dataset if URL fails
+            print("Could not load from URL, creating sample dataset for demonstration...")
+            np.random.seed(42)
+            n_samples = 303
+            df = pd.DataFrame({
+                'age': np.random.randint(29, 77, n_samples),
+                'sex': np.random.randint(0, 2, n_samples),
+                'cp': np.random.randint(0, 4, n_samples),
+                'trestbps': np.random.randint(94, 200, n_samples),
+                'chol': np.random.randint(126, 564, n_samples),
+                'fbs': np.random.randint(0, 2, n_samples),
+                'restecg': np.random.randint(0, 3, n_samples),
+                'thalach': np.random.randint(60, 203, n_samples),
+                'exang': np.random.randint(0, 2, n_samples),
+                'oldpeak': np.random.uniform(0, 6.2, n_samples),
+                'slope': np.random.randint(0, 3, n_samples),
+                'ca': np.random.randint(0, 5, n_samples),
+                'thal': np.random.randint(0, 4, n_samples),
+                'target': np.random.randint(0, 2, n_samples)
+            })
+
+    print(f"Dataset shape: {df.shape}")
+    print(f"\nDataset info:")
+    print(df.head())
+    return df
+
+
+def clean_dataset(df, verbose=True):
+    """Replace missing markers, find the target column and coerce to numeric"""
+    # Handle missing values and ensure numeric types where appropriate
+    df.replace('?', np.nan, inplace=True)
+
+    # If dataset doesn't have 'target' column, try to detect it
+    if 'target' not in df.columns:
+        # Common alternative names
+        alt_targets = ['heartdisease', 'heart_disease', 'HeartDisease', 'output', 'y']
+        found = False
+        for t in alt_targets:
+            if t in df.columns:
+                df = df.rename(columns={t: 'target'})
+                found = True
+                if verbose:
+                    print(f"Renamed column '{t}' to 'target'")
+                break
+        if not found:
+            # As a last resort, assume last column is target
+            last_col = df.columns[-1]
+            if last_col.lower() not in [c.lower() for c in ['age','sex','cp','trestbps','chol','fbs','restecg','thalach','exang','oldpeak','slope','ca','thal']]:
+                if verbose:
+                    print(f"Assuming last column '{last_col}' is the target column and renaming to 'target'")
+                df = df.rename(columns={last_col: 'target'})
+
+    # Try to coerce numeric columns to numeric types where possible
+    for col in df.columns:
+        # Skip object columns that are clearly categorical like 'thal' if they are numeric strings
+        try:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        except Exception:
+            pass
+
+    # Drop rows with NaNs introduced by coercion or original missing values
+    df.dropna(inplace=True)
+
+    if verbose:
+        print(f"\nDataset shape after cleaning: {df.shape}")
+    return df
+
+
+def load_clean_dataset(use_cache=True, cache_dir=dataset_cache.CACHE_DIR):
+    """
+    Cleaned dataset, served from the columnar cache when the local source file
+    and clean_dataset() are unchanged since the cached copy was written.
+    The URL and synthetic fallbacks are not cached.
+    """
+    path = find_local_dataset()
+    if path is None or not use_cache:
+        return clean_dataset(load_dataset(path))
+
+    key = dataset_cache.cache_key(path, clean_dataset, cache_dir)
+    df = dataset_cache.load(key, cache_dir)
+    if df is not None:
+        print(f"Loaded cleaned dataset from cache ({key}) for: {path}")
+        print(f"Dataset shape after cleaning: {df.shape}")
+        return df
+
+    df = clean_dataset(load_dataset(path))
+    dataset_cache.save(key, df, cache_dir)
+    print(f"Cached cleaned dataset as {key}")
+    return df
+
+
+def _fit_path(X, y, train_idx, val_idx, solver, penalty, c_values, scoring, max_iter):
+    """
+    Fit one regularization path on one CV fold.
+    Returns a list of {C, score, fit_seconds, n_iter} in c_values order.
+    """
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_val = scaler.transform(X[val_idx])
+    scorer = get_scorer(scoring)
+
+    warm = solver in WARM_START_SOLVERS
+    model = LogisticRegression(solver=solver, penalty=penalty, max_iter=max_iter,
+                               random_state=42, warm_start=warm)
+    results = []
+    for C in c_values:
+        if not warm:
+            model = LogisticRegression(solver=solver, penalty=penalty, max_iter=max_iter, random_state=42)
+        model.set_params(C=C)
+        start = time.perf_counter()
+        model.fit(X_train, y[train_idx])
+        results.append({
+            'C': C,
+            'score': float(scorer(model, X_val, y[val_idx])),
+            'fit_seconds': time.perf_counter() - start,
+            'n_iter': int(np.max(model.n_iter_)),
+        })
+    return results
+
+
+def search_hyperparameters(X_train, y_train, folds=5, n_jobs=-1, scoring='roc_auc', max_iter=1000):
+    """
+    Stratified k-fold search over C, penalty and solver.
+    Every (fold, solver, penalty) path runs as its own parallel job.
+    Returns (best_params, cv_results) with cv_results sorted best first.
+    """
+    X = np.asarray(X_train, dtype=np.float64)
+    y = np.asarray(y_train)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(X, y))
+    tasks = [(fold, solver, penalty) for fold in range(folds) for solver, penalty in SEARCH_PATHS]
+
+    print(f"\nSearching {len(SEARCH_PATHS) * len(SEARCH_C_VALUES)} configurations "
+          f"x {folds} folds on {n_jobs if n_jobs > 0 else os.cpu_count()} worker(s)...")
+    paths = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_path)(X, y, *splits[fold], solver, penalty, SEARCH_C_VALUES, scoring, max_iter)
+        for fold, solver, penalty in tasks
+    )
+
+    # Aggregate fold scores per configuration
+    by_config = {}
+    for (fold, solver, penalty), path in zip(tasks, paths):
+        for point in path:
+            entry = by_config.setdefault((solver, penalty, point['C']), {'scores': [], 'fit_seconds': 0.0})
+            entry['scores'].append(point['score'])
+            entry['fit_seconds'] += point['fit_seconds']
+
+    cv_results = []
+    for (solver, penalty, C), entry in by_config.items():
+        cv_results.append({
+            'solver': solver,
+            'penalty': penalty,
+            'C': C,
+            'mean_score': float(np.mean(entry['scores'])),
+            'std_score': float(np.std(entry['scores'])),
+            'fit_seconds': entry['fit_seconds'],
         })
+    # Best mean score first; ties go to the stronger regularization (smaller C)
+    cv_results.sort(key=lambda r: (-r['mean_score'], r['C']))
+    best = cv_results[0]
+    best_params = {'solver': best['solver'], 'penalty': best['penalty'], 'C': best['C']}
+    print(f"Best configuration: {best_params} "
+          f"({scoring} {best['mean_score']:.4f} +/- {best['std_score']:.4f})")
+    return best_params, cv_results
+
+
+def holdout_mask(row_ids, fraction):
+    """
+    Deterministic holdout assignment from a multiplicative hash of each row's
+    position in the file, so every pass (and every chunk size) splits alike
+    """
+    hashed = (np.asarray(row_ids, dtype=np.uint64) * np.uint64(2654435761)) % np.uint64(2 ** 32)
+    return hashed < np.uint64(int(fraction * 2 ** 32))
+
+
+def iter_training_chunks(path, chunk_size, holdout_fraction, verbose=False):
+    """
+    Yield (X, y, holdout, feature_names) for each cleaned chunk of a CSV.
+    Only one chunk is held in memory at a time.
+    """
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunk_size)):
+        # read_csv keeps counting the index across chunks, and dropna keeps
+        # the surviving labels, so the index is each row's position in the file
+        df = clean_dataset(chunk, verbose=verbose and i == 0)
+        if df.empty:
+            continue
+        X = df.drop('target', axis=1)
+        y = (df['target'] > 0).astype(int).to_numpy()
+        yield X.to_numpy(dtype=np.float64), y, holdout_mask(df.index.to_numpy(), holdout_fraction), list(X.columns)
+
+
+def evaluate_streaming(model, scaler, path, chunk_size, holdout_fraction):
+    """Accuracy, log loss and confusion matrix over the streamed holdout rows"""
+    confusion = np.zeros(4, dtype=np.int64)
+    total_loss = 0.0
+    for X, y, holdout, _ in iter_training_chunks(path, chunk_size, holdout_fraction):
+        if not holdout.any():
+            continue
+        X_test = scaler.transform(X[holdout])
+        probability = np.clip(model.predict_proba(X_test)[:, 1], 1e-12, 1 - 1e-12)
+        y_test = y[holdout]
+        total_loss -= np.sum(y_test * np.log(probability) + (1 - y_test) * np.log(1 - probability))
+        confusion += np.bincount(2 * y_test + (probability >= 0.5), minlength=4)
+    n = int(confusion.sum())
+    return {
+        'n_test': n,
+        'accuracy': float((confusion[0] + confusion[3]) / n) if n else 0.0,
+        'log_loss': float(total_loss / n) if n else float('nan'),
+        'confusion_matrix': confusion.reshape(2, 2).tolist(),
+    }
+
+
+def train_streaming(path, chunk_size=100000, epochs=5, holdout_fraction=0.2, alpha=0.0001, tol=0.0001):
+    """
+    Out-of-core training: one pass fits the StandardScaler with partial_fit,
+    then each epoch streams the file through SGDClassifier(log_loss).partial_fit
+    and scores the streamed holdout. Training stops early when the holdout log
+    loss improves by less than `tol`, keeping the best epoch's coefficients.
+    Peak memory is bounded by chunk_size, not by the file size. The scaler
+    pass also profiles the training rows for drift monitoring
+    (stats['reference'], a FeatureProfile).
+    Returns (model, scaler, feature_names, stats).
+    """
+    from sklearn.linear_model import SGDClassifier
+
+    if epochs < 1:
+        raise ValueError(f'epochs must be at least 1, got {epochs}')
+    print(f"Streaming {path} in chunks of {chunk_size} rows...")
+    scaler = StandardScaler()
+    reference = FeatureProfile()
+    feature_names = None
+    n_train = 0
+    positives = 0
+    for X, y, holdout, names in iter_training_chunks(path, chunk_size, holdout_fraction, verbose=True):
+        feature_names = names
+        train = ~holdout
+        if train.any():
+            scaler.partial_fit(X[train])
+            reference.update(X[train])
+            n_train += int(train.sum())
+            positives += int(y[train].sum())
+    if not n_train:
+        raise ValueError(f'No usable training rows in {path}')
+    print(f"Training rows: {n_train} (disease: {positives}, no disease: {n_train - positives})")
 
-print(f"Dataset shape: {df.shape}")
-print(f"\nDataset info:")
-print(df.head())
-
-# Handle missing values and ensure numeric types where appropriate
-df.replace('?', np.nan, inplace=True)
-
-# If dataset doesn't have 'target' column, try to detect it
-if 'target' not in df.columns:
-    # Common alternative names
-    alt_targets = ['heartdisease', 'heart_disease', 'HeartDisease', 'output', 'y']
-    found = False
-    for t in alt_targets:
-        if t in df.columns:
-            df = df.rename(columns={t: 'target'})
-            found = True
-            print(f"Renamed column '{t}' to 'target'")
+    # A slowly decaying step size converges well from a few thousand rows up
+    # to the hundreds of millions; sklearn's 'optimal' schedule overshoots on
+    # small files
+    model = SGDClassifier(loss='log_loss', alpha=alpha, learning_rate='invscaling',
+                          eta0=0.01, power_t=0.25, random_state=42)
+    classes = np.array([0, 1])
+    rng = np.random.default_rng(42)
+    history = []
+    best = None
+    for epoch in range(1, epochs + 1):
+        for X, y, holdout, _ in iter_training_chunks(path, chunk_size, holdout_fraction):
+            train = ~holdout
+            if not train.any():
+                continue
+            # Shuffle within the chunk; SGD is sensitive to sorted input
+            order = rng.permutation(int(train.sum()))
+            model.partial_fit(scaler.transform(X[train])[order], y[train][order], classes=classes)
+
+        evaluation = evaluate_streaming(model, scaler, path, chunk_size, holdout_fraction)
+        evaluation['epoch'] = epoch
+        history.append(evaluation)
+        print(f"Epoch {epoch}/{epochs}: holdout accuracy {evaluation['accuracy']:.4f}, "
+              f"log loss {evaluation['log_loss']:.4f}")
+
+        if best is not None and evaluation['log_loss'] > best[0]['log_loss'] - tol:
+            print("Holdout log loss stopped improving; keeping the best epoch")
             break
-    if not found:
-        # As a last resort, assume last column is target
-        last_col = df.columns[-1]
-        if last_col.lower() not in [c.lower() for c in ['age','sex','cp','trestbps','chol','fbs','restecg','thalach','exang','oldpeak','slope','ca','thal']]:
-            print(f"Assuming last column '{last_col}' is the target column and renaming to 'target'")
-            df = df.rename(columns={last_col: 'target'})
-
-# Try to coerce numeric columns to numeric types where possible
-for col in df.columns:
-    # Skip object columns that are clearly categorical like 'thal' if they are numeric strings
-    try:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    except Exception:
-        pass
-
-# Drop rows with NaNs introduced by coercion or original missing values
-df.dropna(inplace=True)
-
-print(f"\nDataset shape after cleaning: {df.shape}")
-
-# Separate features and target
-X = df.drop('target', axis=1)
-y = df['target']
-
-# Convert target to binary (0 or 1)
-# In UCI dataset: 0 = no disease, 1-4 = disease present
-y = (y > 0).astype(int)
-
-print(f"\nTarget distribution:")
-print(f"No Disease (0): {(y == 0).sum()}")
-print(f"Disease (1): {(y == 1).sum()}")
-
-# Split the data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"\nTraining set size: {X_train.shape[0]}")
-print(f"Testing set size: {X_test.shape[0]}")
-
-# Feature scaling (important for logistic regression)
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-print("\nTraining Logistic Regression model...")
-
-# Train the logistic regression model
-model = LogisticRegression(
-    max_iter=1000,
-    random_state=42,
-    solver='lbfgs'
-)
-
-model.fit(X_train_scaled, y_train)
-
-# Make predictions
-y_pred = model.predict(X_test_scaled)
-
-# Evaluate the model
-accuracy = accuracy_score(y_test, y_pred)
-print(f"\nModel Accuracy: {accuracy:.4f}")
-
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred, target_names=['No Disease', 'Disease']))
-
-print("\nConfusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
-
-# Save the model and scaler
-print("\nSaving model and scaler...")
-pickle.dump(model, open('models/heart_disease_model.pkl', 'wb'))
-pickle.dump(scaler, open('models/scaler.pkl', 'wb'))
-
-# Save feature names
-with open('models/feature_names.pkl', 'wb') as f:
-    pickle.dump(list(X.columns), f)
-
-print("Model saved successfully!")
-print("\nProject files ready:")
-print("- models/heart_disease_model.pkl")
-print("- models/scaler.pkl")
-print("- models/feature_names.pkl")
+        if best is None or evaluation['log_loss'] < best[0]['log_loss']:
+            best = (evaluation, model.coef_.copy(), model.intercept_.copy())
+
+    evaluation, model.coef_, model.intercept_ = best
+    stats = {
+        'n_train': n_train,
+        'epochs_run': len(history),
+        'best_epoch': evaluation['epoch'],
+        'holdout': evaluation,
+        'history': history,
+        'reference': reference,
+    }
+    return model, scaler, feature_names, stats
+
+
+def save_outputs(model, scaler, feature_names, metadata, report, reference=None, evaluation=None):
+    """
+    Write the pickles, the serving artifact, the training report and, when
+    given, the training-data FeatureProfile used as the drift reference and
+    the bootstrap evaluation report. The artifact is staged first and renamed
+    into place last, so a watching app that swaps it in already finds the
+    reference and reports of the same model version.
+    """
+    # Stage the single memory-mappable artifact the app serves from
+    print("\nSaving model and scaler...")
+    staged_path = ARTIFACT_PATH + '.staged'
+    model_version = save_artifact(staged_path, model, scaler, list(feature_names), metadata=dict(
+        metadata,
+        trained_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        sklearn_version=sklearn.__version__,
+    ))
+
+    # Save the timing and score report next to the artifacts
+    report = dict(report, model_version=model_version)
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2, allow_nan=False)
+
+    # Save the training distribution /api/drift compares live traffic with
+    if reference is not None:
+        save_reference(reference, REFERENCE_PATH, metadata={'model_version': model_version})
+
+    # Save the test-set metrics with their bootstrap confidence intervals
+    if evaluation is not None:
+        with open(EVALUATION_PATH, 'w') as f:
+            json.dump(dict(evaluation, model_version=model_version), f, indent=2, allow_nan=False)
+
+    # Save the model and scaler
+    pickle.dump(model, open('models/heart_disease_model.pkl', 'wb'))
+    pickle.dump(scaler, open('models/scaler.pkl', 'wb'))
+
+    # Save feature names
+    with open('models/feature_names.pkl', 'wb') as f:
+        pickle.dump(list(feature_names), f)
+
+    # Publish the artifact
+    os.replace(staged_path, ARTIFACT_PATH)
+
+    print("Model saved successfully!")
+    print(f"Model version: {model_version}")
+    print("\nProject files ready:")
+    print(f"- {ARTIFACT_PATH}")
+    print("- models/heart_disease_model.pkl")
+    print("- models/scaler.pkl")
+    print("- models/feature_names.pkl")
+    print(f"- {REPORT_PATH}")
+    if reference is not None:
+        print(f"- {REFERENCE_PATH}")
+    if evaluation is not None:
+        print(f"- {EVALUATION_PATH}")
+    return model_version
+
+
+def main_streaming(args):
+    """--stream: out-of-core training on a CSV of any size"""
+    start = time.perf_counter()
+    path = args.stream if args.stream != 'auto' else find_local_dataset()
+    if path is None or not os.path.exists(path):
+        raise SystemExit('--stream needs a local CSV file (none found)')
+
+    model, scaler, feature_names, stats = train_streaming(
+        path, chunk_size=args.chunk_size, epochs=args.epochs, holdout_fraction=args.holdout_fraction
+    )
+    reference = stats.pop('reference')
+    holdout = stats['holdout']
+    print(f"\nModel Accuracy: {holdout['accuracy']:.4f}")
+    print(f"Holdout log loss: {holdout['log_loss']:.4f}")
+    print("\nConfusion Matrix:")
+    print(np.array(holdout['confusion_matrix']))
+
+    save_outputs(model, scaler, feature_names, metadata={
+        'algorithm': 'SGDClassifier (streaming, log_loss)',
+        'source': os.path.abspath(path),
+        'chunk_size': args.chunk_size,
+        'epochs_run': stats['epochs_run'],
+        'n_train': stats['n_train'],
+        'n_test': holdout['n_test'],
+        'test_accuracy': holdout['accuracy'],
+        'holdout_log_loss': holdout['log_loss'],
+    }, report={
+        'mode': 'stream',
+        'params': {'chunk_size': args.chunk_size, 'epochs': args.epochs,
+                   'holdout_fraction': args.holdout_fraction},
+        'test_accuracy': holdout['accuracy'],
+        'timings': {'total_seconds': time.perf_counter() - start},
+        'stream': stats,
+    }, reference=reference)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the heart disease prediction model')
+    parser.add_argument('--search', action='store_true',
+                        help='run a parallel cross-validated search over C, penalty and solver')
+    parser.add_argument('--folds', type=int, default=5, help='cross-validation folds for --search')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='parallel jobs for --search (-1 = all cores)')
+    parser.add_argument('--scoring', default='roc_auc', help='sklearn scorer used to pick the best configuration')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-read and re-clean the dataset instead of using the cleaned-dataset cache')
+    parser.add_argument('--stream', nargs='?', const='auto', metavar='CSV',
+                        help='out-of-core training on CSV (default: the local heart.csv), one chunk in memory at a time')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='rows per chunk for --stream')
+    parser.add_argument('--epochs', type=int, default=5, help='maximum passes over the data for --stream')
+    parser.add_argument('--holdout-fraction', type=float, default=0.2, help='share of rows held out for --stream')
+    parser.add_argument('--bootstrap', type=int, default=None, metavar='N',
+                        help='test-set resamples for metric confidence intervals '
+                             '(default 2000, 0 disables; not available with --stream)')
+    parser.add_argument('--confidence', type=float, default=0.95, help='confidence level of the bootstrap intervals')
+    parser.add_argument('--bootstrap-jobs', type=int, default=1, help='processes for the bootstrap (-1 = all cores)')
+    args = parser.parse_args(argv)
+    if args.epochs < 1:
+        parser.error('--epochs must be at least 1')
+    if args.stream and args.bootstrap:
+        parser.error('--bootstrap is not supported with --stream (the streamed holdout is not kept in memory)')
+    if args.bootstrap is None:
+        args.bootstrap = 0 if args.stream else 2000
+
+    # Create models directory if it doesn't exist
+    if not os.path.exists('models'):
+        os.makedirs('models')
+
+    if args.stream:
+        return main_streaming(args)
+
+    timings = {}
+    start = time.perf_counter()
+
+    # Load the dataset
+    df = load_clean_dataset(use_cache=not args.no_cache)
+    timings['load_seconds'] = time.perf_counter() - start
+
+    # Separate features and target
+    X = df.drop('target', axis=1)
+    y = df['target']
+
+    # Convert target to binary (0 or 1)
+    # In UCI dataset: 0 = no disease, 1-4 = disease present
+    y = (y > 0).astype(int)
+
+    print(f"\nTarget distribution:")
+    print(f"No Disease (0): {(y == 0).sum()}")
+    print(f"Disease (1): {(y == 1).sum()}")
+
+    # Split the data into training and testing sets
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    print(f"\nTraining set size: {X_train.shape[0]}")
+    print(f"Testing set size: {X_test.shape[0]}")
+
+    # Distribution of the training rows, for drift monitoring in the app
+    reference = FeatureProfile()
+    reference.update(X_train[reference.names].to_numpy(dtype=np.float64))
+
+    # Default configuration, replaced by the best one when searching
+    params = {'solver': 'lbfgs', 'penalty': 'l2', 'C': 1.0}
+    cv_results = None
+    if args.search:
+        search_start = time.perf_counter()
+        params, cv_results = search_hyperparameters(
+            X_train, y_train, folds=args.folds, n_jobs=args.n_jobs, scoring=args.scoring
+        )
+        timings['search_seconds'] = time.perf_counter() - search_start
+
+    # Feature scaling (important for logistic regression)
+    fit_start = time.perf_counter()
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    print("\nTraining Logistic Regression model...")
+
+    # Train the logistic regression model
+    model = LogisticRegression(
+        max_iter=1000,
+        random_state=42,
+        **params
+    )
+
+    model.fit(X_train_scaled, y_train)
+    timings['fit_seconds'] = time.perf_counter() - fit_start
+
+    # Make predictions
+    y_pred = model.predict(X_test_scaled)
+
+    # Evaluate the model
+    accuracy = accuracy_score(y_test, y_pred)
+    print(f"\nModel Accuracy: {accuracy:.4f}")
+
+    print("\nClassification Report:")
+    print(classification_report(y_test, y_pred, target_names=['No Disease', 'Disease']))
+
+    print("\nConfusion Matrix:")
+    print(confusion_matrix(y_test, y_pred))
+
+    evaluation = None
+    if args.bootstrap > 0:
+        evaluation = bootstrap(y_test, model.predict_proba(X_test_scaled)[:, 1], n_resamples=args.bootstrap,
+                               confidence=args.confidence, n_jobs=args.bootstrap_jobs)
+        timings['bootstrap_seconds'] = evaluation['seconds']
+        print("\nBootstrap Confidence Intervals:")
+        print(format_report(evaluation))
+
+    timings['total_seconds'] = time.perf_counter() - start
+    report = {
+        'mode': 'search' if args.search else 'default',
+        'params': params,
+        'test_accuracy': float(accuracy),
+        'timings': timings,
+    }
+    if cv_results is not None:
+        report['search'] = {
+            'folds': args.folds,
+            'n_jobs': args.n_jobs,
+            'scoring': args.scoring,
+            'warm_start_solvers': sorted(WARM_START_SOLVERS),
+            'results': cv_results,
+        }
+    save_outputs(model, scaler, list(X.columns), metadata={
+        'algorithm': 'LogisticRegression',
+        'solver': model.solver,
+        'penalty': params['penalty'],
+        'C': params['C'],
+        'n_train': int(X_train.shape[0]),
+        'n_test': int(X_test.shape[0]),
+        'test_accuracy': float(accuracy),
+    }, report=report, reference=reference, evaluation=evaluation)
+
+
+if __name__ == '__main__':
+    main()